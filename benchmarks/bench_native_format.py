@@ -0,0 +1,81 @@
+"""Benchmark for the native audio format (core.transcoder NATIVE_REMUX) against re-encoding.
+
+Runs offline: ffmpeg synthesizes a YouTube-like source (opus in webm, a tone plus
+noise so flac cannot compress it away), then each song is put through the same
+core.transcoder.transcode call the download pipeline uses: a stream-copy remux
+for 'native', a full re-encode for mp3 and flac. Prints the wall time and the
+bytes left on disk for each path.
+
+    python benchmarks/bench_native_format.py [seconds] [songs] [--ffmpeg PATH]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.library import NATIVE_FORMAT
+from core.transcoder import transcode, find_ffmpeg
+
+FORMATS = [NATIVE_FORMAT, 'mp3', 'flac']
+
+def make_source(ffmpeg, path, seconds):
+    # ~160 kbit/s opus in webm, close to YouTube's usual best audio stream
+    subprocess.run([
+        ffmpeg, '-y', '-nostdin', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=48000:duration={seconds}',
+        '-f', 'lavfi', '-i', f'anoisesrc=sample_rate=48000:amplitude=0.1:duration={seconds}',
+        '-filter_complex', 'amix=inputs=2,aformat=channel_layouts=stereo',
+        '-c:a', 'libopus', '-b:a', '160k', '-f', 'webm', path,
+    ], check=True)
+
+def run_format(ffmpeg, source, workdir, audio_format, songs):
+    """Converts `songs` copies of source one after another; returns (seconds, bytes on disk)"""
+    copies = []
+    for i in range(songs):
+        copy = os.path.join(workdir, f'song{i}.webm')
+        shutil.copyfile(source, copy)
+        copies.append(copy)
+
+    start = time.perf_counter()
+    outputs = [transcode(copy, audio_format, ffmpeg=ffmpeg) for copy in copies]
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(p) for p in outputs)
+    for p in outputs:
+        os.remove(p)
+    return elapsed, size
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('seconds', nargs='?', type=int, default=240)
+    parser.add_argument('songs', nargs='?', type=int, default=5)
+    parser.add_argument('--ffmpeg', default=None)
+    args = parser.parse_args()
+
+    ffmpeg = args.ffmpeg or find_ffmpeg()
+    if not ffmpeg:
+        sys.exit("ffmpeg not found; pass --ffmpeg PATH")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'source.webm')
+        make_source(ffmpeg, source, args.seconds)
+        source_size = os.path.getsize(source)
+
+        print(f"{args.songs} songs of {args.seconds} s, source {source_size / 1024:.0f} KiB opus/webm each")
+        results = {}
+        for audio_format in FORMATS:
+            results[audio_format] = run_format(ffmpeg, source, tmp, audio_format, args.songs)
+
+    native_time = results[NATIVE_FORMAT][0]
+    for audio_format in FORMATS:
+        elapsed, size = results[audio_format]
+        print(f"  {audio_format:<7} {elapsed:7.3f} s  {size / (1024 * 1024):8.2f} MiB"
+              f"  ({elapsed / native_time:5.1f}x native time)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark for the __NEXT_DATA__ fast path (core.spotify.find_next_data).
+
+Compares byte slicing with the previous BeautifulSoup parse + script lookup and checks
+that both return the same payload. Without arguments the captured embed pages in
+benchmarks/fixtures/ are measured, plus a deterministic synthetic page with a large DOM
+(no network needed); pass other saved embed pages
+(e.g. `curl -o page.html https://open.spotify.com/embed/playlist/...`) to measure those.
+Exits with status 1 if any page yields a different payload.
+
+    python benchmarks/bench_next_data.py [page.html ...]
+"""
+import os
+import sys
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+from bs4 import BeautifulSoup
+from core.spotify import find_next_data
+
+def make_page(tracks=800, nodes=3000, seed=1):
+    """Embed-like page: a large DOM plus a __NEXT_DATA__ payload with a track list"""
+    rng = random.Random(seed)
+    track_list = [{'title': f"Song {i} 夜曲", 'subtitle': f"Artist{rng.randint(1, 300)}",
+                   'uri': f"spotify:track:{rng.getrandbits(64):016x}", 'duration': rng.randint(90000, 400000)}
+                  for i in range(tracks)]
+    data = {'props': {'pageProps': {'state': {'data': {'entity': {'name': 'Benchmark Playlist', 'trackList': track_list}}}}}}
+    body = ''.join(f'<div class="TracklistRow_{i % 7}"><span>Row {i}</span><a href="/t/{i}">link</a></div>'
+                   for i in range(nodes))
+    return (f'<!DOCTYPE html><html><head><meta property="og:title" content="Benchmark Playlist">'
+            f'<script src="/static/app.js"></script></head><body>{body}'
+            f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data, ensure_ascii=False)}</script>'
+            f'</body></html>').encode('utf-8')
+
+def soup_extract(page):
+    # The previous code path
+    soup = BeautifulSoup(page.decode('utf-8', errors='replace'), 'html.parser')
+    tag = soup.find("script", {"id": "__NEXT_DATA__"})
+    return json.loads(tag.string) if tag else None
+
+def fast_extract(page):
+    payload = find_next_data(page)
+    return json.loads(payload) if payload else None
+
+def bench(func, page, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(page)
+    return (time.perf_counter() - start) / repeat, result
+
+def main():
+    if len(sys.argv) > 1:
+        paths = sys.argv[1:]
+    else:
+        paths = [os.path.join(FIXTURES, name) for name in sorted(os.listdir(FIXTURES)) if name.endswith('.html')]
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages.append((os.path.basename(path), f.read()))
+    if len(sys.argv) == 1:
+        pages.append(('synthetic', make_page()))
+
+    mismatches = 0
+    for label, page in pages:
+        soup_time, soup_data = bench(soup_extract, page, 5)
+        fast_time, fast_data = bench(fast_extract, page, 50)
+        print(f"{label}: {len(page) / 1024:.0f} KiB")
+        print(f"  soup parse   {soup_time * 1000:8.2f} ms")
+        print(f"  byte slicing {fast_time * 1000:8.2f} ms  x{soup_time / fast_time:.0f}")
+        print(f"  identical payload: {soup_data == fast_data}")
+        if soup_data is None or soup_data != fast_data:
+            mismatches += 1
+    return 1 if mismatches else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Benchmark for pooled YoutubeDL instances (core.downloader.YdlEngine).
+
+Simulates the YoutubeDL set-up work of an update run without network access:
+the previous code built one YoutubeDL per search and per download attempt, the
+engine pool builds one per worker thread and only swaps per-job settings.
+A synthetic cookies.txt is used so cookie parsing is part of the cost.
+
+    python benchmarks/bench_ydl_engine.py [songs] [workers]
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import yt_dlp
+from core.downloader import YdlEngine, get_ydl_engine, release_ydl_engines
+
+def write_cookies(path, count=400):
+    with open(path, 'w') as f:
+        f.write("# Netscape HTTP Cookie File\n")
+        for i in range(count):
+            f.write(f".youtube.com\tTRUE\t/\tTRUE\t2000000000\tcookie{i}\tvalue{i:064d}\n")
+
+def legacy_run(songs, attempts_per_song):
+    # One throwaway instance per search and per download attempt, as before
+    for _ in range(songs * attempts_per_song):
+        engine = YdlEngine('mp3')
+        engine.close()
+
+def pooled_run(songs, workers, attempts_per_song):
+    per_worker = [songs // workers + (1 if i < songs % workers else 0) for i in range(workers)]
+
+    def worker(count):
+        for _ in range(count * attempts_per_song):
+            engine = get_ydl_engine('mp3')
+            with engine.job('%(title)s.%(ext)s', lambda msg: None, None, None):
+                pass
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in per_worker]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return release_ydl_engines()
+
+def main():
+    songs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    attempts_per_song = 2  # one search + one download
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # YdlEngine picks up ./cookies.txt
+        write_cookies('cookies.txt')
+        YdlEngine('mp3').close()  # warm up extractor imports so neither side pays them
+
+        start = time.perf_counter()
+        legacy_run(songs, attempts_per_song)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = pooled_run(songs, workers, attempts_per_song)
+        pooled = time.perf_counter() - start
+        os.chdir(ROOT)
+
+    print(f"{songs} songs, {workers} workers, yt-dlp {yt_dlp.version.__version__}")
+    print(f"  per-attempt instances {legacy:7.3f} s")
+    print(f"  pooled engines        {pooled:7.3f} s  ({stats['engines']} engines, {stats['jobs']} jobs)")
+    print(f"  saved                 {legacy - pooled:7.3f} s  (engine estimate: {stats['saved_seconds']:.3f} s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Local lrclib stand-in for exercising the lyrics lookup without the network.
+
+Serves /api/get (exact artist/title match, duration within 2 s like lrclib) and
+/api/search from a small track list and counts the requests per endpoint.
+
+    python benchmarks/lrclib_stub.py --serve [--port 8765] [--get-status 500]
+        Runs the stub; point config 'lrclib_base_url' at http://127.0.0.1:8765
+
+    python benchmarks/lrclib_stub.py
+        Self-check: runs download_lyrics and ThreadedLyricsFetcher against the stub
+        (exact hit, get miss -> search, failing get -> search, no duration -> search)
+        and prints the requests each song needed.
+"""
+import os
+import re
+import sys
+import json
+import wave
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TRACKS = [
+    {'artistName': 'Jay Chou', 'trackName': 'Nocturne', 'albumName': 'November', 'duration': 3,
+     'syncedLyrics': '[00:01.00] exact', 'plainLyrics': 'exact'},
+    {'artistName': 'Jay Chou', 'trackName': 'Mojito', 'albumName': 'Mojito', 'duration': 185,
+     'syncedLyrics': '[00:01.00] from search', 'plainLyrics': 'from search'},
+    {'artistName': 'Eason Chan', 'trackName': 'Ten Years', 'albumName': 'Black White Grey', 'duration': 205,
+     'syncedLyrics': None, 'plainLyrics': 'plain only'},
+]
+
+class StubHandler(BaseHTTPRequestHandler):
+    tracks = TRACKS
+    get_status = None  # forced status code for /api/get, e.g. 500
+    counts = None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with self.server.lock:
+            self.counts[url.path] = self.counts.get(url.path, 0) + 1
+
+        if url.path == '/api/get':
+            if self.get_status:
+                return self._send(self.get_status, {'message': 'stub failure'})
+            for track in self.tracks:
+                if (track['artistName'].lower() == params.get('artist_name', '').lower()
+                        and track['trackName'].lower() == params.get('track_name', '').lower()
+                        and abs(track['duration'] - float(params.get('duration') or -99)) <= 2):
+                    return self._send(200, track)
+            return self._send(404, {'code': 404, 'name': 'TrackNotFound'})
+
+        if url.path == '/api/search':
+            words = re.findall(r'\w+', params.get('q', '').lower())
+            hits = [t for t in self.tracks
+                    if words and all(w in re.findall(r'\w+', f"{t['artistName']} {t['trackName']}".lower())
+                                     for w in words)]
+            return self._send(200, hits)
+
+        self._send(404, {'code': 404})
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub(port=0, get_status=None):
+    """Starts the stub on a background thread; returns (server, base_url, counts)"""
+    counts = {}
+    handler = type('Handler', (StubHandler,), {'get_status': get_status, 'counts': counts})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", counts
+
+def write_silence(path, seconds):
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(b'\0\0' * 8000 * seconds)
+
+def self_check():
+    import core.lyrics as lyrics
+    import core.lyrics_store as lyrics_store
+    from core.downloader import download_lyrics
+
+    tmp = tempfile.mkdtemp(prefix='lrclib_stub_')
+    lyrics_store.DB_FILE = os.path.join(tmp, 'lyrics.db')
+    audio = os.path.join(tmp, 'song.wav')
+    write_silence(audio, 3)
+
+    # (label, song name, audio file, forced get status, expected lyrics, expected requests)
+    cases = [
+        ('exact hit', 'Jay Chou - Nocturne', audio, None, '[00:01.00] exact', {'/api/get': 1}),
+        ('get miss -> search', 'Jay Chou - Mojito', audio, None, '[00:01.00] from search',
+         {'/api/get': 1, '/api/search': 1}),
+        ('get 500 -> search', 'Jay Chou - Nocturne', audio, 500, '[00:01.00] exact',
+         {'/api/get': 1, '/api/search': 1}),
+        ('no duration', 'Eason Chan - Ten Years', None, None, 'plain only', {'/api/search': 1}),
+    ]
+    failures = 0
+    for label, song, audio_path, get_status, expected, expected_counts in cases:
+        for mode in ('download_lyrics', 'ThreadedLyricsFetcher'):
+            server, base_url, counts = start_stub(get_status=get_status)
+            lyrics.configure({'lrclib_base_url': base_url})
+            lrc_path = os.path.join(tmp, 'out.lrc')
+            if os.path.exists(lrc_path):
+                os.remove(lrc_path)
+            try:
+                if mode == 'download_lyrics':
+                    download_lyrics(song, lrc_path, lambda msg: None, audio_path=audio_path)
+                else:
+                    lyrics.ThreadedLyricsFetcher(rate_per_second=50).run(
+                        [(0, song, lrc_path, audio_path)], lambda *args: None)
+            finally:
+                server.shutdown()
+                server.server_close()
+            text = open(lrc_path, encoding='utf-8').read() if os.path.exists(lrc_path) else None
+            ok = text == expected and counts == expected_counts
+            failures += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {mode:<21} {label:<20} requests={counts} lyrics={text!r}")
+    print(f"{failures} failure(s)")
+    return 1 if failures else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--serve', action='store_true', help='run the stub until interrupted')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--get-status', type=int, help='answer every /api/get with this status')
+    args = parser.parse_args()
+    if not args.serve:
+        return self_check()
+
+    server, base_url, counts = start_stub(args.port, args.get_status)
+    print(f"lrclib stub on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+    print(f"requests: {counts}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import os
+import glob
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Bytes read from each end of a file for the partial hash. Two different songs of
+# identical size almost never share both ends, so most collisions stop there.
+PARTIAL_CHUNK = 64 * 1024
+FULL_CHUNK = 1024 * 1024
+
+def partial_hash(path, size):
+    """Hash of the size plus the first and last PARTIAL_CHUNK bytes"""
+    h = hashlib.sha1(str(size).encode())
+    with open(path, 'rb') as f:
+        h.update(f.read(PARTIAL_CHUNK))
+        if size > PARTIAL_CHUNK:
+            f.seek(max(PARTIAL_CHUNK, size - PARTIAL_CHUNK))
+            h.update(f.read(PARTIAL_CHUNK))
+    return h.hexdigest()
+
+def full_hash(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(FULL_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _refine(groups, hash_func, executor, stop_event):
+    """Splits every group of paths by hash_func(path), keeping only sub-groups with
+    more than one member. Unreadable files drop out."""
+    refined = []
+    for paths in groups:
+        if stop_event and stop_event.is_set():
+            return []
+        buckets = {}
+        results = executor.map(lambda p: (p, _safe(hash_func, p)), paths)
+        for path, digest in results:
+            if digest is not None:
+                buckets.setdefault(digest, []).append(path)
+        refined.extend(b for b in buckets.values() if len(b) > 1)
+    return refined
+
+def _safe(func, path):
+    try:
+        return func(path)
+    except OSError:
+        return None
+
+def find_duplicates(audio_files, max_workers=4, stop_event=None):
+    """Groups byte-identical files: by size, then partial hash, then full hash.
+
+    Only files sharing a size are ever read, and only partial-hash collisions are
+    read in full. Hashing runs on a thread pool (hashlib releases the GIL on large
+    buffers). Returns a list of path lists, each with two or more identical files.
+    """
+    sizes = {}
+    by_size = {}
+    for path in audio_files:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        if size:
+            sizes[path] = size
+            by_size.setdefault(size, []).append(path)
+
+    groups = [group for group in by_size.values() if len(group) > 1]
+    if not groups:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+        groups = _refine(groups, lambda p: partial_hash(p, sizes[p]), executor, stop_event)
+        groups = _refine(groups, full_hash, executor, stop_event)
+    return [sorted(g) for g in groups]
+
+def _playlist_files(playlists_path):
+    return glob.glob(os.path.join(playlists_path, "*.m3u8")) + \
+           glob.glob(os.path.join(playlists_path, "*.m3u"))
+
+def _playlist_refs(playlists_path):
+    """Counts how many playlist entries point at each file (by normalized absolute path)"""
+    counts = {}
+    for pl_file in _playlist_files(playlists_path):
+        base = os.path.dirname(os.path.abspath(pl_file))
+        for path in _m3u_paths(pl_file):
+            key = os.path.normcase(os.path.normpath(os.path.join(base, path)))
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+def _m3u_paths(pl_file):
+    try:
+        with open(pl_file, 'r', encoding='utf-8-sig') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    except (OSError, UnicodeDecodeError):
+        return []
+
+def pick_keeper(group, playlist_refs=None):
+    """The copy to keep: the one most playlists point at, then the oldest download, then the shortest path"""
+    playlist_refs = playlist_refs or {}
+
+    def rank(path):
+        refs = playlist_refs.get(os.path.normcase(os.path.normpath(os.path.abspath(path))), 0)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = float('inf')
+        return (-refs, mtime, len(path), path)
+
+    return min(group, key=rank)
+
+def plan_merge(groups, playlists_path):
+    """Returns [(keeper, [duplicates])] for the given duplicate groups"""
+    refs = _playlist_refs(playlists_path)
+    plan = []
+    for group in groups:
+        keeper = pick_keeper(group, refs)
+        plan.append((keeper, [p for p in group if p != keeper]))
+    return plan
+
+def rewrite_playlists(playlists_path, replacements):
+    """Points M3U/M3U8 entries at removed duplicates to their keeper.
+
+    replacements maps normalized absolute duplicate paths to the keeper path. The
+    #EXTINF title is left alone so the playlist still shows the original name.
+    Returns the number of rewritten playlist files.
+    """
+    from utils.helpers import write_file_if_changed
+    rewritten = 0
+    for pl_file in _playlist_files(playlists_path):
+        base = os.path.dirname(os.path.abspath(pl_file))
+        try:
+            with open(pl_file, 'r', encoding='utf-8-sig', newline='') as f:
+                lines = f.read().splitlines()
+        except (OSError, UnicodeDecodeError):
+            continue
+
+        changed = False
+        for i, line in enumerate(lines):
+            entry = line.strip()
+            if not entry or entry.startswith('#'):
+                continue
+            key = os.path.normcase(os.path.normpath(os.path.join(base, entry)))
+            keeper = replacements.get(key)
+            if keeper:
+                lines[i] = os.path.relpath(os.path.abspath(keeper), start=base).replace('\\', '/')
+                changed = True
+
+        if changed and write_file_if_changed(pl_file, "\r\n".join(lines) + "\r\n", encoding='utf-8-sig'):
+            rewritten += 1
+    return rewritten
+
+def merge_duplicates(plan, playlists_path):
+    """Deletes the duplicates in plan, keeping lyrics and playlist references.
+
+    A duplicate's .lrc is moved next to the keeper if the keeper has none. Returns
+    (removed_files, freed_bytes, rewritten_playlists, aliases) where aliases maps
+    each removed song name to its keeper path, so name lookups keep resolving.
+    """
+    replacements = {}
+    aliases = {}
+    removed = 0
+    freed = 0
+    for keeper, duplicates in plan:
+        keeper_lrc = os.path.splitext(keeper)[0] + '.lrc'
+        for dup in duplicates:
+            try:
+                size = os.path.getsize(dup)
+                os.remove(dup)
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+            replacements[os.path.normcase(os.path.normpath(os.path.abspath(dup)))] = keeper
+            aliases[os.path.splitext(os.path.basename(dup))[0]] = keeper
+
+            dup_lrc = os.path.splitext(dup)[0] + '.lrc'
+            if os.path.exists(dup_lrc):
+                try:
+                    if os.path.exists(keeper_lrc):
+                        os.remove(dup_lrc)
+                    else:
+                        os.replace(dup_lrc, keeper_lrc)
+                except OSError:
+                    pass
+
+    rewritten = rewrite_playlists(playlists_path, replacements) if replacements else 0
+    return removed, freed, rewritten, aliases
@@ -1,8 +1,11 @@
 import os
 import re
+import time
+import threading
+from contextlib import contextmanager
 import yt_dlp
 from utils.helpers import sanitize_filename
-from core.library import find_song_in_library
+from core.library import find_song_in_library, NATIVE_FORMAT
 
 def strip_ansi(text):
     """Removes ANSI escape sequences from strings"""
@@ -41,70 +44,252 @@ class YdlLogger:
 class TaskAbortedException(Exception):
     pass
 
-def download_lyrics(song_name, output_path, log_func):
-    """Downloads synced lyrics (.lrc) for a song using direct Lrclib API with Traditional Chinese conversion"""
+class YdlEngine:
+    """Long-lived yt_dlp.YoutubeDL owned by a single worker thread.
+
+    Creating a YoutubeDL initializes every extractor and parses the cookie file,
+    so instead of one instance per candidate/retry each worker keeps one and only
+    swaps in the per-job output template, logger target and progress hook.
+    audio_format=None builds a search-only instance (flat extraction, no downloads);
+    postprocess=False only fetches the best audio stream and leaves conversion to
+    a core.transcoder.TranscodePool.
+    """
+    def __init__(self, audio_format, postprocess=True):
+        self.audio_format = audio_format
+        self.postprocess = postprocess
+        self.logger = YdlLogger(lambda msg: None)
+        self.progress_hook = None
+        self.jobs = 0
+        self.closed = False
+
+        ydl_opts = {
+            # Native mode prefers opus, which the player can open once remuxed to .opus
+            'format': 'bestaudio[acodec=opus]/bestaudio/best' if audio_format == NATIVE_FORMAT else 'bestaudio/best',
+            'outtmpl': '%(title)s.%(ext)s',
+            'quiet': True,
+            'no_warnings': True,
+            'extract_audio': True,
+            'postprocessors': [{
+                'key': 'FFmpegExtractAudio',
+                # 'best' only remuxes the stream into an audio container, no re-encode
+                'preferredcodec': 'best' if audio_format == NATIVE_FORMAT else audio_format,
+                'preferredquality': '0' if audio_format == 'flac' else '320',
+            }],
+            'logger': self.logger,
+            'progress_hooks': [self._dispatch_progress],
+            'keepvideo': False,
+            'windowsfilenames': True,
+            'restrictfilenames': False,
+        }
+        if not postprocess:
+            ydl_opts['postprocessors'] = []
+            ydl_opts.pop('extract_audio')
+        if audio_format is None:
+            ydl_opts = {
+                'quiet': True,
+                'no_warnings': True,
+                'extract_flat': 'in_playlist',
+                'skip_download': True,
+                'logger': self.logger,
+            }
+
+        # Add cookies if available
+        cookies_path = 'cookies.txt'
+        if os.path.exists(cookies_path):
+            ydl_opts['cookiefile'] = cookies_path
+
+        # CPU time of this thread: workers construct their engines concurrently, and wall
+        # time would count GIL waits on other workers' construction as this one's cost
+        start = time.thread_time()
+        self.ydl = yt_dlp.YoutubeDL(ydl_opts)
+        self.init_seconds = time.thread_time() - start
+
+    def _dispatch_progress(self, d):
+        if self.progress_hook:
+            self.progress_hook(d)
+
+    @contextmanager
+    def job(self, out_template, log_func, stats, progress_hook):
+        """Points the shared instance at one download and resets it afterwards"""
+        if out_template:
+            self.ydl.params['outtmpl']['default'] = out_template
+        self.logger.log_func = log_func
+        self.logger.stats = stats
+        self.progress_hook = progress_hook
+        self.jobs += 1
+        try:
+            yield self.ydl
+        finally:
+            self.progress_hook = None
+            self.logger.stats = None
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                self.ydl.close()
+            except Exception:
+                pass
+
+_engine_local = threading.local()
+_engine_registry = []
+_engine_lock = threading.Lock()
+
+def get_ydl_engine(audio_format, postprocess=True):
+    """Returns this thread's YdlEngine for audio_format, creating it on first use"""
+    engines = getattr(_engine_local, 'engines', None)
+    if engines is None:
+        engines = _engine_local.engines = {}
+    key = (audio_format, postprocess)
+    engine = engines.get(key)
+    if engine is None or engine.closed:
+        engine = engines[key] = YdlEngine(audio_format, postprocess)
+        with _engine_lock:
+            _engine_registry.append(engine)
+    return engine
+
+def release_ydl_engines():
+    """Closes every engine created since the last call (saves cookies) and returns timing stats:
+    {'engines', 'jobs', 'init_seconds', 'saved_seconds'}. saved_seconds estimates the
+    construction time avoided by reusing instances instead of building one per job."""
+    with _engine_lock:
+        engines = list(_engine_registry)
+        _engine_registry.clear()
+    for engine in engines:
+        engine.close()
+
+    jobs = sum(e.jobs for e in engines)
+    init_seconds = sum(e.init_seconds for e in engines)
+    avg_init = init_seconds / len(engines) if engines else 0.0
+    return {
+        'engines': len(engines),
+        'jobs': jobs,
+        'init_seconds': init_seconds,
+        'saved_seconds': max(0.0, (jobs - len(engines)) * avg_init),
+    }
+
+# Number of results fetched per candidate query, and how many queries are resolved at once
+SEARCH_RESULTS = 5
+MAX_DOWNLOAD_ATTEMPTS = 3
+SEARCH_WORKERS = 4
+# A hit scoring at least this well ends the search early; later candidates are not resolved
+SEARCH_GOOD_SCORE = 0.8
+# Words that usually mark an unwanted version unless the song name itself contains them
+SEARCH_PENALTY_WORDS = ('live', 'cover', 'reaction', 'karaoke', 'instrumental', 'remix',
+                        'sped', 'slowed', 'nightcore', '8d', 'tutorial', 'dance practice', 'fancam')
+
+_search_executor = None
+_search_executor_lock = threading.Lock()
+
+def _get_search_executor():
+    # Long-lived pool, so each search thread keeps its own YdlEngine between songs
+    global _search_executor
+    with _search_executor_lock:
+        if _search_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix='yt-search')
+        return _search_executor
+
+def resolve_query(query, log_func, stats=None):
+    """Returns the hit dicts for one search query, served from the on-disk cache when possible"""
+    from utils.i18n import _
+    from core.search_cache import get_cached_hits, store_hits
+
+    hits = get_cached_hits(query, SEARCH_RESULTS)
+    if hits is not None:
+        return hits
+
+    log_func(_('searching', query))
+    with get_ydl_engine(None).job(None, log_func, stats, None) as ydl:
+        info = ydl.extract_info(f"ytsearch{SEARCH_RESULTS}:{query}", download=False)
+
+    hits = []
+    for entry in (info or {}).get('entries') or []:
+        if not entry or not entry.get('id'):
+            continue
+        hits.append({
+            'id': entry['id'],
+            'url': entry.get('url') or f"https://www.youtube.com/watch?v={entry['id']}",
+            'title': entry.get('title') or '',
+            'channel': entry.get('channel') or entry.get('uploader') or '',
+            'duration': entry.get('duration'),
+        })
+    store_hits(query, SEARCH_RESULTS, hits)
+    return hits
+
+def score_hit(song_tokens, song_lower, hit, query_idx, position):
+    """Scores a search hit against the wanted song name; higher is better"""
+    from core.library import get_normalized_tokens
+    title = hit.get('title') or ''
+    channel = hit.get('channel') or ''
+    hit_tokens = set(get_normalized_tokens(f"{channel} {title}"))
+    if not song_tokens:
+        return 0.0
+
+    score = len(song_tokens & hit_tokens) / len(song_tokens)
+
+    title_lower = title.lower()
+    for word in SEARCH_PENALTY_WORDS:
+        if re.search(rf'\b{re.escape(word)}\b', title_lower) and word not in song_lower:
+            score -= 0.3
+    if channel.endswith(' - Topic') or 'official' in title_lower:
+        score += 0.1
+
+    duration = hit.get('duration')
+    if duration and (duration < 60 or duration > 15 * 60):
+        score -= 0.3
+
+    # Keep the original preference for earlier candidates and higher-ranked results as a tie-break
+    return score - 0.02 * position - 0.01 * query_idx
+
+def search_best_hits(song_name, candidates, log_func, stats=None):
+    """Resolves candidate queries in parallel waves and returns hits ranked best-first.
+
+    Queries are resolved SEARCH_WORKERS at a time; once a hit reaches SEARCH_GOOD_SCORE
+    the remaining candidates are not searched at all.
+    """
+    from core.library import get_normalized_tokens
+    song_tokens = set(get_normalized_tokens(song_name))
+    song_lower = song_name.lower()
+    executor = _get_search_executor()
+
+    scored = {}
+    for start in range(0, len(candidates), SEARCH_WORKERS):
+        wave = list(enumerate(candidates))[start:start + SEARCH_WORKERS]
+        futures = [(idx, executor.submit(resolve_query, query, log_func, stats)) for idx, query in wave]
+        for idx, future in futures:
+            try:
+                hits = future.result()
+            except TaskAbortedException:
+                raise
+            except Exception:
+                continue
+            for position, hit in enumerate(hits):
+                score = score_hit(song_tokens, song_lower, hit, idx, position)
+                if hit['id'] not in scored or scored[hit['id']][0] < score:
+                    scored[hit['id']] = (score, hit)
+
+        if stats and getattr(stats, 'stop_event', None) and stats.stop_event.is_set():
+            raise TaskAbortedException("Task aborted by user")
+        if scored and max(v[0] for v in scored.values()) >= SEARCH_GOOD_SCORE:
+            break
+
+    ranked = sorted(scored.values(), key=lambda v: v[0], reverse=True)
+    return [hit for score, hit in ranked]
+
+def download_lyrics(song_name, output_path, log_func, audio_path=None):
+    """Downloads synced lyrics (.lrc) for a song using direct Lrclib API with Traditional Chinese conversion.
+    With audio_path, its tags and duration drive an exact lookup before falling back to search."""
+    import random
+    from core.lyrics import (build_queries, search_lyrics, get_lyrics, read_track_info,
+                             is_network_error, save_lrc, MAX_RETRIES)
+    from core.lyrics_store import store_found, store_miss, STATUS_ERROR
+
     try:
-        import urllib.request
-        import urllib.parse
-        import json
-        import time
-        import random
-        import re
-        from zhconv import convert
-        import ssl
-        
-        # Advanced cleaning: Remove common suffixes that confuse lyrics search
-        clean_query = song_name
-        suffixes = [
-            r'\s*\(.*?\)', r'\s*\[.*?\]', r'\s*【.*?】', 
-            r'\s*-?\s*Official\s*Video', r'\s*-?\s*Music\s*Video', 
-            r'\s*-?\s*TV\s*Version', r'\s*-?\s*MV', r'\s*-?\s*Lyrics',
-            r'\s*-?\s*HD', r'\s*-?\s*4K'
-        ]
-        for s in suffixes:
-            clean_query = re.sub(s, '', clean_query, flags=re.IGNORECASE)
-        clean_query = clean_query.strip()
-        
-        # Generate multiple search queries for better coverage
-        search_queries = [clean_query]
-        
-        # REMOVED: Splitting by ' - ' and searching for parts caused incorrect matches 
-        # (e.g. searching for title only can return a completely different song)
-        
-        alt_query = re.sub(r'[^\w\s]', ' ', clean_query)
-        alt_query = re.sub(r'\s+', ' ', alt_query).strip()
-        if alt_query != clean_query:
-            search_queries.append(alt_query)
-        
-        # Direct API function
-        def fetch_lrc(query, timeout=10):
-            url = f"https://lrclib.net/api/search?q={urllib.parse.quote(query)}"
-            req = urllib.request.Request(url, headers={'User-Agent': 'PlaylistAdministrator/2.0'})
-            
-            # Create a custom context to ignore SSL verification if needed (though API usually fine)
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            
-            with urllib.request.urlopen(req, timeout=timeout, context=ctx) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                if not isinstance(data, list):
-                    return None
-                    
-                # Pick best match: prefer synced lyrics
-                best_match = None
-                for track in data:
-                    if track.get('syncedLyrics'):
-                        best_match = track['syncedLyrics']
-                        break
-                    if not best_match and track.get('plainLyrics'):
-                        best_match = track['plainLyrics']
-                        
-                return best_match
+        search_queries = build_queries(song_name)
+        track_info = read_track_info(song_name, audio_path)
 
-        max_retries = 3
-        
-        for attempt in range(max_retries):
+        for attempt in range(MAX_RETRIES):
             try:
                 # Progressive delay
                 if attempt > 0:
@@ -112,46 +297,50 @@ def download_lyrics(song_name, output_path, log_func):
                     log_func(f"  ⚠️ [Network] {song_name} - Retrying in {backoff:.1f}s...")
                     time.sleep(backoff)
 
-                for idx, query in enumerate(search_queries):
-                    # Reduce timeout slightly on retries to fail fast and try next
-                    lrc_text = fetch_lrc(query, timeout=10 + attempt * 5)
-                    
+                if track_info:
+                    lrc_text = get_lyrics(track_info, timeout=10 + attempt * 5)
                     if lrc_text:
-                        # CONVERT TO TRADITIONAL CHINESE
-                        lrc_text = convert(lrc_text, 'zh-tw')
-                        
-                        with open(output_path, "w", encoding="utf-8") as f:
-                            f.write(lrc_text)
+                        store_found(song_name, save_lrc(lrc_text, output_path), 'get')
                         return True
-                    
-                    # Small delay between query variations to be nice to API
-                    time.sleep(0.5)
-                
-                # If we get here, no lyrics found for any query in this attempt
-                # If it's the last attempt, we failed
-                if attempt == max_retries - 1:
-                    log_func(f"  ℹ️ [Lrclib Not Found] {song_name}")
-                    return False
-                    
+                    track_info = None  # Missed or failed, go straight to search on retries
+
+                for query in search_queries:
+                    # Allow more time on retries
+                    lrc_text = search_lyrics(query, timeout=10 + attempt * 5)
+                    if lrc_text:
+                        store_found(song_name, save_lrc(lrc_text, output_path), 'search', query)
+                        return True
+
+                # No lyrics found for any query variant
+                log_func(f"  ℹ️ [Lrclib Not Found] {song_name}")
+                store_miss(song_name, query=search_queries[0])
+                return False
+
             except Exception as e:
-                error_msg = str(e).lower()
-                is_net_error = any(k in error_msg for k in ['timeout', 'timed out', 'reset', 'aborted', 'eof', 'ssl'])
-                
-                if is_net_error:
-                    if attempt == max_retries - 1:
-                        log_func(f"  🔌 [Network Failed] {song_name}: {error_msg[:50]}")
+                if is_network_error(e):
+                    if attempt == MAX_RETRIES - 1:
+                        log_func(f"  🔌 [Network Failed] {song_name}: {str(e)[:50]}")
+                        store_miss(song_name, STATUS_ERROR, search_queries[0])
                     continue
-                else:
-                    log_func(f"  ❌ [Lyrics Error] {song_name}: {str(e)[:50]}")
-                    return False
+                log_func(f"  ❌ [Lyrics Error] {song_name}: {str(e)[:50]}")
+                return False
 
     except Exception as e:
         log_func(f"  ❌ [Lyrics Critical] {song_name}: {str(e)[:100]}")
         return False
     return False
 
-def download_song(song_name, library_path, audio_format, log_func, file_list, stats=None, speed_display_callback=None, progress_callback=None, current_dl=0):
-    """Downloads song in specified format (mp3 or flac)"""
+def _lyrics_after_conversion(converted_path, song_name, lrc_path, log_func):
+    """Runs on the transcode pool's I/O executor: fetches lyrics using the converted file's tags"""
+    download_lyrics(song_name, lrc_path, log_func, audio_path=converted_path)
+
+def download_song(song_name, library_path, audio_format, log_func, library_index, stats=None, speed_display_callback=None, progress_callback=None, current_dl=0, transcoder=None):
+    """Downloads song in specified format (mp3 or flac). library_index is a core.library.LibraryIndex
+
+    With a core.transcoder.TranscodePool as transcoder, only the best audio stream is
+    fetched here; the conversion is queued on the pool and a Future resolving to the
+    final path is returned instead of the path itself.
+    """
     
     # Progress tracking state
     import time
@@ -179,6 +368,7 @@ def download_song(song_name, library_path, audio_format, log_func, file_list, st
             current_time = time.time()
             
             # Get progress data
+            eta_seconds = 0
             downloaded = d.get('downloaded_bytes', 0)
             total = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
             speed = d.get('speed', 0)
@@ -258,44 +448,23 @@ def download_song(song_name, library_path, audio_format, log_func, file_list, st
                 
                 # Call progress callback if provided
                 if progress_callback:
-                    progress_callback(current_dl, total, eta_seconds if eta_seconds > 0 else None)
+                    progress_callback(downloaded, total, eta_seconds if eta_seconds > 0 else None)
                 
         elif d['status'] == 'finished':
-            log_func("  ✅ Download complete, converting...")
+            log_func("  ✅ Download complete, converting..." if not transcoder else "  ✅ Download complete, queued for conversion")
     
     # Check if we already have it
-    existing = find_song_in_library(song_name, file_list)
+    existing = find_song_in_library(song_name, library_index)
     if existing:
         ext = os.path.splitext(existing)[1].lower().replace('.', '')
-        if ext == audio_format:
+        if ext == audio_format or audio_format == NATIVE_FORMAT:
             return existing
 
     clean_name = sanitize_filename(song_name)
     out_template = os.path.join(library_path, f"{clean_name}.%(ext)s")
 
-    # Configure yt-dlp options
-    ydl_opts = {
-        'format': 'bestaudio/best',
-        'outtmpl': out_template,
-        'quiet': True,
-        'no_warnings': True,
-        'extract_audio': True,
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': audio_format,
-            'preferredquality': '0' if audio_format == 'flac' else '320',
-        }],
-        'logger': YdlLogger(log_func, stats),
-        'progress_hooks': [progress_hook],
-        'keepvideo': False,
-        'windowsfilenames': True,
-        'restrictfilenames': False,
-    }
-    
-    # Add cookies if available
-    cookies_path = 'cookies.txt'
-    if os.path.exists(cookies_path):
-        ydl_opts['cookiefile'] = cookies_path
+    # yt-dlp instance reused across candidates, retries and songs handled by this worker
+    engine = get_ydl_engine(audio_format, postprocess=transcoder is None)
 
     # Generate search candidates
     candidates = []
@@ -387,11 +556,22 @@ def download_song(song_name, library_path, audio_format, log_func, file_list, st
             candidates.append(base_no_jp + ' jp ver')
 
     from utils.i18n import _
-    
+    from core.search_cache import forget_video
+
     all_candidates_failed = True  # Track if all candidates fail
-    
-    for idx, current_query in enumerate(candidates):
-        is_last_candidate = (idx == len(candidates) - 1)
+
+    # Phase 1: resolve all candidate queries (cached on disk) and rank the hits
+    try:
+        hits = search_best_hits(song_name, candidates, log_func, stats)
+    except TaskAbortedException:
+        return None
+    except Exception as e:
+        log_func(_('dl_fail', strip_ansi(str(e))))
+        return None
+
+    # Phase 2: download only the best hit, falling back to the next one if it fails
+    for idx, hit in enumerate(hits[:MAX_DOWNLOAD_ATTEMPTS]):
+        is_last_candidate = (idx == min(len(hits), MAX_DOWNLOAD_ATTEMPTS) - 1)
         
         # Check for cancellation before each candidate
         check_stop()
@@ -401,56 +581,62 @@ def download_song(song_name, library_path, audio_format, log_func, file_list, st
             try:
                 # Check for cancellation before each attempt
                 check_stop()
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                with engine.job(out_template, log_func, stats, progress_hook) as ydl:
                     if attempt == 0:
-                        if idx == 0:
-                            log_func(_('searching', current_query))
-                        else:
-                            # Only show "No results" warning if this is the last attempt of all candidates
-                            if is_last_candidate and attempt == max_retries - 1:
-                                log_func(f"⚠️ {_('dl_fail', 'No results')}. Trying: {current_query}...")
-                            else:
-                                log_func(_('searching', current_query))
+                        log_func(_('search_pick', hit['title'] or hit['id']))
                     
                     check_stop()
-                    # Use 'detailed' to catch 416 better? No, standard is fine.
-                    try:
-                        info = ydl.extract_info(f"ytsearch1:{current_query}", download=True)
-                    except yt_dlp.utils.DownloadError as de:
-                         # Re-raise if it's 416 or other critical errors to be caught below
-                         raise de
-                    except Exception as e:
-                         # Fallback for generic
-                         raise e
+                    info = ydl.extract_info(hit['url'], download=True)
 
                     if 'entries' in info and info['entries']:
                         info = info['entries'][0]
                     elif 'entries' in info:
-                        # Empty entries = No results
-                        # Break inner retry loop to try next candidate
-                        break 
-                    else:
-                        pass
+                        break
 
                     filename = ydl.prepare_filename(info)
                     base, ext = os.path.splitext(filename)
-                    final_path = base + "." + audio_format
-                    
-                    if os.path.exists(final_path):
+                    if audio_format == NATIVE_FORMAT:
+                        # Extension depends on the source codec; yt-dlp records where the file ended up
+                        downloads = info.get('requested_downloads') or [{}]
+                        final_path = downloads[-1].get('filepath') or filename
+                    else:
+                        final_path = base + "." + audio_format
+
+                    native_raw = transcoder is not None and audio_format == NATIVE_FORMAT
+                    if native_raw:
+                        # Without postprocessors the recorded file is still the raw stream;
+                        # hand it to the pool below so it gets remuxed like mp3/flac get converted
+                        filename = final_path
+
+                    if not native_raw and os.path.exists(final_path):
                         log_func(f" -> {os.path.basename(final_path)}")
+                        if transcoder and filename != final_path and os.path.exists(filename):
+                            # Nothing left to convert: drop the raw stream so it is not indexed as a duplicate
+                            try:
+                                os.remove(filename)
+                            except OSError:
+                                pass
                         # Download lyrics
                         lrc_path = os.path.splitext(final_path)[0] + ".lrc"
                         if not os.path.exists(lrc_path):
-                            download_lyrics(song_name, lrc_path, log_func)
+                            download_lyrics(song_name, lrc_path, log_func, audio_path=final_path)
                         return final_path
                     
                     if os.path.exists(filename):
                         log_func(f" -> {os.path.basename(filename)}")
-                        # Download lyrics
+                        # Download lyrics (after conversion when the pool converts it)
                         lrc_path = os.path.splitext(filename)[0] + ".lrc"
-                        if not os.path.exists(lrc_path):
-                            download_lyrics(song_name, lrc_path, log_func)
                         all_candidates_failed = False  # Mark as successful
+                        if transcoder:
+                            # Hand the raw stream to the CPU stage and free this worker for the next fetch
+                            future = transcoder.submit(filename, audio_format)
+                            if future is not None and not os.path.exists(lrc_path):
+                                # Tags and duration are only readable once the file is converted;
+                                # the lookup itself runs off the ffmpeg threads
+                                transcoder.after(future, _lyrics_after_conversion, song_name, lrc_path, log_func)
+                            return future
+                        if not os.path.exists(lrc_path):
+                            download_lyrics(song_name, lrc_path, log_func, audio_path=filename)
                         return filename
                     
                     # Download lyrics for final_path even if it doesn't exist yet (it will be created by PP)
@@ -485,6 +671,10 @@ def download_song(song_name, library_path, audio_format, log_func, file_list, st
                         # If 416 persists, maybe try next candidate? 
                         # Unlikely to help if it's the same video, but if next candidate finds diff video it might.
                         break 
+                elif "unavailable" in error_msg or "private video" in error_msg or "removed" in error_msg:
+                    # Stale search result: make sure the next run searches again
+                    forget_video(hit['id'])
+                    break
                 elif "403" in error_msg or "forbidden" in error_msg:
                     log_func(_('dl_fail', "HTTP 403: Access forbidden. Trying next search..."))
                     # Add a small delay before trying next candidate
@@ -502,8 +692,8 @@ def download_song(song_name, library_path, audio_format, log_func, file_list, st
                     # Otherwise silently fail to let next candidate try
                     break 
         
-        # If we reached here, it means this candidate failed (break or exhausted retries)
-        # Loop continues to next candidate
+        # If we reached here, it means this hit failed (break or exhausted retries)
+        # Loop continues to the next-best hit
         
     # If all candidates failed, show final warning
     if all_candidates_failed:
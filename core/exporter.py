@@ -0,0 +1,344 @@
+import os
+import json
+import errno
+import time
+import shutil
+import hashlib
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# One planned copy: src in the library -> dst in the export tree
+ExportTask = namedtuple('ExportTask', ['src', 'dst', 'size', 'mtime'])
+
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Present in the export folder while an export is running; if it survives
+# (cancel, crash, unplugged drive) the next export resumes instead of starting over
+IN_PROGRESS_MARKER = '.export_in_progress'
+
+# Lists every file the previous export wrote (relative to the export root), so a sync
+# only ever deletes files it created itself, even when the target is a whole USB drive
+MANIFEST_FILE = '.export_manifest.json'
+
+# Linux FICLONE ioctl: share extents copy-on-write (btrfs, XFS, bcachefs...)
+FICLONE = 0x40049409
+
+EXPORT_MODE_COPY = 'copy'
+EXPORT_MODE_LINK = 'link'
+
+class ExportCancelled(Exception):
+    pass
+
+def plan_export(selected_playlists, library_index, export_path):
+    """Resolves every selected playlist against the library before anything is copied.
+
+    Returns (tasks, summary) where summary is a list of (pl_name, found, total).
+    """
+    from core.library import parse_playlist, find_song_in_library
+    tasks = []
+    summary = []
+    for pl_file in selected_playlists:
+        if not os.path.exists(pl_file):
+            continue
+        pl_name = os.path.splitext(os.path.basename(pl_file))[0]
+        dest_folder = os.path.join(export_path, pl_name)
+        songs = parse_playlist(pl_file)
+        found = 0
+        seen = set()
+        for song_name in songs:
+            src = find_song_in_library(song_name, library_index)
+            if not src:
+                continue
+            try:
+                st = os.stat(src)
+            except OSError:
+                continue
+            dst = os.path.join(dest_folder, os.path.basename(src))
+            found += 1
+            # The same file listed twice in one playlist is copied once
+            if dst in seen:
+                continue
+            seen.add(dst)
+            tasks.append(ExportTask(src, dst, st.st_size, st.st_mtime))
+        summary.append((pl_name, found, len(songs)))
+    return tasks, summary
+
+def is_up_to_date(task):
+    """True if dst already holds this exact file (same size and mtime, as left by copystat)"""
+    try:
+        st = os.stat(task.dst)
+    except OSError:
+        return False
+    # FAT/exFAT USB sticks only keep 2-second mtime resolution
+    return st.st_size == task.size and abs(st.st_mtime - task.mtime) <= 2
+
+def _file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            h.update(chunk)
+    return h.digest()
+
+def needs_transfer(task, verify_hash=False):
+    """False if dst already matches src. Size/mtime decide; with verify_hash a size match
+    with a different mtime (e.g. a drive that shifted timestamps) is settled by content,
+    and a dst with identical content only gets its timestamps fixed."""
+    if is_up_to_date(task):
+        return False
+    if not verify_hash:
+        return True
+    try:
+        if os.path.getsize(task.dst) != task.size:
+            return True
+        if _file_digest(task.src) != _file_digest(task.dst):
+            return True
+        if not os.path.samefile(task.src, task.dst):
+            # A hardlinked dst is the library file itself: leave its timestamps alone
+            shutil.copystat(task.src, task.dst)
+        return False
+    except OSError:
+        return True
+
+def load_manifest(root):
+    """Relative paths written by the previous export into root"""
+    try:
+        with open(os.path.join(root, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return set(json.load(f))
+    except (OSError, ValueError, TypeError):
+        return set()
+
+def save_manifest(root, rel_paths):
+    from utils.helpers import write_file_atomic
+    write_file_atomic(os.path.join(root, MANIFEST_FILE), json.dumps(sorted(rel_paths), ensure_ascii=False))
+
+def adopt_existing_files(root):
+    """Seeds a missing manifest with every file already in root, so the next remove_stale
+    also cleans up an export written before manifests existed. Only meant for folders
+    the app owns entirely (the default export folder), never for a custom target.
+    Returns the number of adopted files, 0 if a manifest already exists."""
+    if os.path.exists(os.path.join(root, MANIFEST_FILE)):
+        return 0
+    rel_paths = []
+    for folder, _dirs, files in os.walk(root):
+        for name in files:
+            if name in (MANIFEST_FILE, IN_PROGRESS_MARKER):
+                continue
+            rel_paths.append(os.path.relpath(os.path.join(folder, name), root))
+    save_manifest(root, rel_paths)
+    return len(rel_paths)
+
+def remove_stale(root, planned_rel_paths):
+    """Deletes files from the previous export that are no longer planned and prunes
+    folders left empty. Returns the number of removed files."""
+    removed = 0
+    folders = set()
+    for rel in load_manifest(root) - set(planned_rel_paths):
+        path = os.path.join(root, rel)
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError:
+            continue
+        folders.add(os.path.dirname(path))
+    # Deepest first, never the export root itself
+    for folder in sorted(folders, key=len, reverse=True):
+        if os.path.normpath(folder) != os.path.normpath(root):
+            try:
+                os.rmdir(folder)
+            except OSError:
+                pass
+    return removed
+
+def copy_file(src, dst, stop_event=None, on_bytes=None):
+    """Copies src to dst through a temporary file, so a cancelled copy never leaves a
+    truncated file under the final name. Uses sendfile where available (zero-copy on
+    Linux) and large buffered reads elsewhere; checks stop_event between chunks."""
+    tmp = dst + '.part'
+    try:
+        with open(src, 'rb') as fsrc, open(tmp, 'wb') as fdst:
+            use_sendfile = hasattr(os, 'sendfile') and os.name != 'nt'
+            offset = 0
+            buf = None
+            while True:
+                if stop_event and stop_event.is_set():
+                    raise ExportCancelled()
+                n = 0
+                if use_sendfile:
+                    try:
+                        n = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, COPY_BUFFER_SIZE)
+                    except OSError:
+                        # Filesystem without sendfile support: continue with plain reads
+                        use_sendfile = False
+                        fsrc.seek(offset)
+                        continue
+                else:
+                    if buf is None:
+                        buf = bytearray(COPY_BUFFER_SIZE)
+                    n = fsrc.readinto(buf)
+                    if n:
+                        fdst.write(memoryview(buf)[:n])
+                if not n:
+                    break
+                offset += n
+                if on_bytes:
+                    on_bytes(n)
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+def reflink_file(src, dst):
+    """Clones src to dst without copying data. Raises OSError where unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.ENOTSUP, "reflink not supported on this platform")
+    tmp = dst + '.part'
+    try:
+        with open(src, 'rb') as fsrc, open(tmp, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+def hardlink_file(src, dst):
+    """Hardlinks dst to src, replacing an existing dst. Raises OSError across volumes
+    or on filesystems without hardlinks (FAT/exFAT USB sticks)."""
+    tmp = dst + '.part'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    os.link(src, tmp)
+    os.replace(tmp, dst)
+
+# Errors that mean a link method does not work on a volume at all (ENOTTY: no FICLONE ioctl)
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL, errno.ENOTTY}
+
+class LinkTransfer:
+    """Transfer for EXPORT_MODE_LINK: reflink, else hardlink, else a regular copy.
+
+    Both link kinds are near-instant and take no extra space; a reflink stays an
+    independent file, a hardlink shares the library file. Once a method fails for a
+    destination folder it is not retried there, so a USB stick on another volume costs
+    one failed attempt instead of one per file. Only errors meaning "not supported
+    here" are remembered that way; anything else (a full disk, a locked file) falls back
+    to copying this one file. `counts` tallies the method used.
+    """
+    def __init__(self, stop_event=None, on_bytes=None):
+        self.stop_event = stop_event
+        self.on_bytes = on_bytes
+        self.counts = {'reflink': 0, 'hardlink': 0, 'copy': 0}
+        self.unsupported = set()  # (method, dst folder)
+        self.lock = threading.Lock()
+
+    def _try(self, method, func, task):
+        key = (method, os.path.dirname(task.dst))
+        if key in self.unsupported:
+            return False
+        try:
+            func(task.src, task.dst)
+        except OSError as e:
+            if e.errno in UNSUPPORTED_ERRNOS:
+                with self.lock:
+                    self.unsupported.add(key)
+            return False
+        with self.lock:
+            self.counts[method] += 1
+        return True
+
+    def __call__(self, task):
+        if self._try('reflink', reflink_file, task) or self._try('hardlink', hardlink_file, task):
+            if self.on_bytes:
+                self.on_bytes(task.size)
+            return
+        copy_file(task.src, task.dst, self.stop_event, self.on_bytes)
+        with self.lock:
+            self.counts['copy'] += 1
+
+class ExportEngine:
+    """Copies a planned export with a bounded thread pool and byte-level progress.
+
+    progress_func(done_bytes, total_bytes, bytes_per_second) is called at most every
+    `progress_interval` seconds from the worker threads.
+    """
+    def __init__(self, max_workers=4, stop_event=None, progress_func=None, progress_interval=0.5, verify_hash=False):
+        self.max_workers = max(1, int(max_workers))
+        self.verify_hash = verify_hash
+        self.stop_event = stop_event
+        self.progress_func = progress_func
+        self.progress_interval = progress_interval
+        self.lock = threading.Lock()
+        self.done_bytes = 0
+        self.total_bytes = 0
+        self.start_time = 0.0
+        self.last_report = time.monotonic()
+
+    def add_bytes(self, n):
+        with self.lock:
+            self.done_bytes += n
+            now = time.monotonic()
+            if now - self.last_report < self.progress_interval:
+                return
+            self.last_report = now
+            done, total = self.done_bytes, self.total_bytes
+            elapsed = now - self.start_time
+        if self.progress_func:
+            self.progress_func(done, total, done / elapsed if elapsed > 0 else 0)
+
+    def run(self, tasks, transfer=None):
+        """Runs transfer(task) (default: copy) for every task not already up to date.
+
+        Returns (copied, skipped, errors) where errors is a list of (task, exception).
+        Raises ExportCancelled if stop_event fired.
+        """
+        transfer = transfer or (lambda task: copy_file(task.src, task.dst, self.stop_event, self.add_bytes))
+        pending = []
+        skipped = 0
+        for task in tasks:
+            if not needs_transfer(task, self.verify_hash):
+                skipped += 1
+            else:
+                pending.append(task)
+
+        self.total_bytes = sum(t.size for t in pending)
+        self.start_time = self.last_report = time.monotonic()
+        for folder in {os.path.dirname(t.dst) for t in pending}:
+            os.makedirs(folder, exist_ok=True)
+
+        errors = []
+        copied = 0
+
+        def job(task):
+            if self.stop_event and self.stop_event.is_set():
+                raise ExportCancelled()
+            transfer(task)
+            return task
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(job, task) for task in pending]
+            for future, task in zip(futures, pending):
+                try:
+                    future.result()
+                    copied += 1
+                except ExportCancelled:
+                    pass
+                except Exception as e:
+                    errors.append((task, e))
+
+        if self.stop_event and self.stop_event.is_set():
+            raise ExportCancelled()
+        if self.progress_func:
+            elapsed = time.monotonic() - self.start_time
+            self.progress_func(self.done_bytes, self.total_bytes, self.done_bytes / elapsed if elapsed > 0 else 0)
+        return copied, skipped, errors
@@ -0,0 +1,315 @@
+import os
+import sys
+import json
+import heapq
+import shutil
+import operator
+import subprocess
+from array import array
+from collections import namedtuple
+
+# Acoustic fingerprints of library files, used to spot the same recording saved under
+# different names (or with a different encoding), which content hashes cannot see.
+#
+# Chromaprint (fpcalc) is used when available. Otherwise ffmpeg decodes the audio to
+# PCM and a coarse energy/zero-crossing fingerprint is computed in pure Python; both
+# produce a sequence of 32-bit sub-fingerprints compared by bit error rate.
+
+METHOD_CHROMAPRINT = 'chromaprint'
+METHOD_ENERGY = 'energy'
+
+# Only the start of each song is fingerprinted, enough to identify a recording
+FINGERPRINT_SECONDS = 120
+
+# Energy fallback: mono 5512 Hz PCM cut into ~0.1 s frames
+SAMPLE_RATE = 5512
+FRAME_SAMPLES = 551
+
+# Files per task handed to a worker process; amortizes process round trips
+BATCH_SIZE = 16
+
+DEFAULT_THRESHOLD = 0.85
+
+# Candidate search: each fingerprint is reduced to its SKETCH_SIZE smallest
+# sub-fingerprint values and files sharing MIN_SHARED of them are compared in full.
+# Sketch values shared by more than MAX_POSTINGS files (silence, noise) are ignored.
+SKETCH_SIZE = 48
+MIN_SHARED = 2
+MAX_POSTINGS = 64
+
+# Offsets (in sub-fingerprints) tried when aligning two fingerprints
+MAX_ALIGN_CANDIDATES = 3
+
+Fingerprint = namedtuple('Fingerprint', ['path', 'method', 'duration', 'values'])
+
+def _find_tool(names):
+    base_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.getcwd()
+    for name in names:
+        candidate = os.path.join(base_dir, name)
+        if os.path.isfile(candidate):
+            return candidate
+    return shutil.which(names[-1])
+
+def find_fpcalc():
+    """Returns the Chromaprint fpcalc executable next to the app or on PATH, or None"""
+    return _find_tool(('fpcalc.exe', 'fpcalc'))
+
+def available_method():
+    """The fingerprint method this machine can run, or None"""
+    from core.transcoder import find_ffmpeg
+    if find_fpcalc():
+        return METHOD_CHROMAPRINT
+    if find_ffmpeg():
+        return METHOD_ENERGY
+    return None
+
+def _subprocess_kwargs():
+    if os.name == 'nt':
+        return {'creationflags': subprocess.CREATE_NO_WINDOW}
+    return {}
+
+def _fpcalc_fingerprint(path, fpcalc):
+    proc = subprocess.run([fpcalc, '-raw', '-json', '-length', str(FINGERPRINT_SECONDS), path],
+                          capture_output=True, timeout=120, **_subprocess_kwargs())
+    if proc.returncode != 0:
+        return None
+    data = json.loads(proc.stdout.decode('utf-8', 'replace'))
+    values = array('I', (v & 0xFFFFFFFF for v in data.get('fingerprint') or []))
+    return float(data.get('duration') or 0), values
+
+def _decode_pcm(path, ffmpeg):
+    cmd = [ffmpeg, '-nostdin', '-loglevel', 'error', '-i', path, '-t', str(FINGERPRINT_SECONDS),
+           '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 's16le', '-']
+    proc = subprocess.run(cmd, capture_output=True, timeout=120, **_subprocess_kwargs())
+    if proc.returncode != 0:
+        return None
+    data = proc.stdout
+    samples = array('h')
+    samples.frombytes(data[:len(data) - len(data) % 2])
+    if sys.byteorder != 'little':
+        samples.byteswap()
+    return samples
+
+def energy_fingerprint(samples):
+    """Sub-fingerprints from per-frame energy and zero-crossing rate.
+
+    Bit k of value i says whether energy (bits 0-15) or zero-crossing rate, a rough
+    brightness measure (bits 16-31), rose from frame i+k to i+k+1. Only the direction
+    of change is kept, so the result does not depend on volume or codec.
+    """
+    energies = []
+    crossings = []
+    for start in range(0, len(samples) - FRAME_SAMPLES + 1, FRAME_SAMPLES):
+        frame = samples[start:start + FRAME_SAMPLES]
+        energies.append(sum(map(operator.mul, frame, frame)))
+        crossings.append(sum(map(operator.xor, map((0).__gt__, frame), map((0).__gt__, frame[1:]))))
+
+    values = array('I')
+    for i in range(len(energies) - 16):
+        value = 0
+        for k in range(16):
+            if energies[i + k + 1] > energies[i + k]:
+                value |= 1 << k
+            if crossings[i + k + 1] > crossings[i + k]:
+                value |= 1 << (k + 16)
+        values.append(value)
+    return values
+
+def compute_fingerprint(path, fpcalc=None, ffmpeg=None):
+    """Returns (method, duration, values) for one file, or None if it cannot be decoded"""
+    try:
+        if fpcalc:
+            result = _fpcalc_fingerprint(path, fpcalc)
+            if result and result[1]:
+                return METHOD_CHROMAPRINT, result[0], result[1]
+        if ffmpeg:
+            samples = _decode_pcm(path, ffmpeg)
+            if samples:
+                values = energy_fingerprint(samples)
+                if values:
+                    return METHOD_ENERGY, len(samples) / SAMPLE_RATE, values
+    except (OSError, ValueError, subprocess.SubprocessError):
+        pass
+    return None
+
+def _compute_batch(paths):
+    """Worker entry point: fingerprints a batch of files. Runs in a child process."""
+    from core.transcoder import find_ffmpeg
+    fpcalc = find_fpcalc()
+    ffmpeg = None if fpcalc else find_ffmpeg()
+    results = []
+    for path in paths:
+        result = compute_fingerprint(path, fpcalc, ffmpeg)
+        if result is None and fpcalc:
+            # fpcalc cannot read every container; retry through ffmpeg PCM
+            ffmpeg = ffmpeg or find_ffmpeg()
+            result = compute_fingerprint(path, None, ffmpeg)
+        if result:
+            method, duration, values = result
+            results.append((path, method, duration, values.tobytes()))
+        else:
+            results.append((path, None, 0.0, b''))
+    return results
+
+def update_fingerprints(library_path, entries, max_workers=None, stop_event=None, progress_func=None):
+    """Fingerprints library entries that are new or changed since their stored fingerprint.
+
+    Work is split into batches of BATCH_SIZE files spread over worker processes (the
+    energy fallback is CPU-bound Python); every finished batch is stored right away,
+    so a cancelled run keeps its progress. Returns the number of processed files,
+    or None if neither fpcalc nor ffmpeg is available.
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+    from core.library_db import get_fingerprint_stats, store_fingerprints, prune_fingerprints
+
+    if available_method() is None:
+        return None
+
+    stored = get_fingerprint_stats(library_path)
+    prune_fingerprints(library_path, [e.path for e in entries])
+    todo = [e for e in entries if stored.get(e.path) != (e.size, int(round(e.mtime * 1e9)))]
+    if not todo:
+        return 0
+
+    stat_by_path = {e.path: (e.size, int(round(e.mtime * 1e9))) for e in todo}
+    batches = [[e.path for e in todo[i:i + BATCH_SIZE]] for i in range(0, len(todo), BATCH_SIZE)]
+    workers = max(1, int(max_workers or os.cpu_count() or 2))
+    done = 0
+
+    def run(executor):
+        nonlocal done
+        futures = [executor.submit(_compute_batch, batch) for batch in batches]
+        try:
+            for future in as_completed(futures):
+                if stop_event and stop_event.is_set():
+                    break
+                rows = [(path,) + stat_by_path[path] + (method, duration, blob)
+                        for path, method, duration, blob in future.result()]
+                store_fingerprints(library_path, rows)
+                done += len(rows)
+                if progress_func:
+                    progress_func(done, len(todo))
+        finally:
+            for future in futures:
+                future.cancel()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            run(executor)
+    except (BrokenProcessPool, OSError, RuntimeError):
+        # No usable process pool (restricted environment, frozen build without
+        # freeze_support): fall back to threads, already stored batches are skipped
+        stored = get_fingerprint_stats(library_path)
+        batches = [[p for p in batch if stored.get(p) != stat_by_path[p]] for batch in batches]
+        batches = [b for b in batches if b]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            run(executor)
+    return done
+
+def _popcount(value):
+    return bin(value).count('1')
+
+def _bit_similarity(a, b, offset):
+    """Fraction of equal bits between a[i + offset] and b[i] over their overlap"""
+    if offset >= 0:
+        pairs = zip(a[offset:], b)
+    else:
+        pairs = zip(a, b[-offset:])
+    total = 0
+    differing = 0
+    for x, y in pairs:
+        differing += _popcount(x ^ y)
+        total += 32
+    if total < 32 * 16:
+        return 0.0
+    return 1.0 - differing / total
+
+def similarity(a, b):
+    """Best bit similarity (0..1) of two fingerprints of the same method over a few alignments"""
+    if a.method != b.method or not a.values or not b.values:
+        return 0.0
+    positions = {}
+    for i, value in enumerate(a.values):
+        positions.setdefault(value, i)
+    offsets = {}
+    for j, value in enumerate(b.values):
+        i = positions.get(value)
+        if i is not None:
+            offsets[i - j] = offsets.get(i - j, 0) + 1
+    candidates = sorted(offsets, key=offsets.get, reverse=True)[:MAX_ALIGN_CANDIDATES] or [0]
+    if 0 not in candidates:
+        candidates.append(0)
+    return max(_bit_similarity(a.values, b.values, offset) for offset in candidates)
+
+class FingerprintIndex:
+    """Near-identical recording lookup over stored fingerprints.
+
+    Every fingerprint is reduced to a small min-hash sketch kept in an inverted index,
+    so a query only aligns and compares the few files that share sketch values with
+    it instead of the whole library.
+    """
+    def __init__(self, fingerprints):
+        self.fingerprints = {fp.path: fp for fp in fingerprints if fp.values}
+        self.sketches = {}
+        self.postings = {}
+        for fp in self.fingerprints.values():
+            sketch = self._sketch(fp)
+            self.sketches[fp.path] = sketch
+            for key in sketch:
+                self.postings.setdefault(key, []).append(fp.path)
+
+    @staticmethod
+    def _sketch(fp):
+        # Sub-fingerprint bits are close to uniform, so the numerically smallest distinct
+        # values already form a min-hash sketch; nsmallest keeps this in C for large libraries
+        return {(fp.method, v) for v in heapq.nsmallest(SKETCH_SIZE, set(fp.values))}
+
+    def _candidates(self, path, sketch):
+        shared = {}
+        for key in sketch:
+            posting = self.postings.get(key, ())
+            if len(posting) > MAX_POSTINGS:
+                continue
+            for other in posting:
+                if other != path:
+                    shared[other] = shared.get(other, 0) + 1
+        return [other for other, count in shared.items() if count >= MIN_SHARED]
+
+    @staticmethod
+    def _durations_match(a, b):
+        longest = max(a.duration, b.duration)
+        return not longest or abs(a.duration - b.duration) <= max(5.0, longest * 0.1)
+
+    def similar(self, path, threshold=DEFAULT_THRESHOLD):
+        """[(other_path, score)] of recordings matching the fingerprint stored for path, best first"""
+        fp = self.fingerprints.get(path)
+        if fp is None:
+            return []
+        matches = []
+        for other in self._candidates(path, self.sketches[path]):
+            other_fp = self.fingerprints[other]
+            if not self._durations_match(fp, other_fp):
+                continue
+            score = similarity(fp, other_fp)
+            if score >= threshold:
+                matches.append((other, score))
+        return sorted(matches, key=lambda m: m[1], reverse=True)
+
+    def near_duplicates(self, threshold=DEFAULT_THRESHOLD):
+        """[(path_a, path_b, score)] for every pair of near-identical recordings"""
+        pairs = []
+        for path in sorted(self.fingerprints):
+            for other, score in self.similar(path, threshold):
+                if path < other:
+                    pairs.append((path, other, score))
+        return pairs
+
+def load_fingerprint_index(library_path):
+    from core.library_db import get_fingerprints
+    fingerprints = []
+    for path, method, duration, blob in get_fingerprints(library_path):
+        values = array('I')
+        values.frombytes(blob)
+        fingerprints.append(Fingerprint(path, method, duration, values))
+    return FingerprintIndex(fingerprints)
@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import hashlib
+from utils.config import CONFIG_DIR
+
+# On-disk cache for fetched pages: <key>.body holds the payload, <key>.json the validators
+# and <key>.parsed.json what the caller extracted from the payload with that content_hash
+CACHE_DIR = os.path.join(CONFIG_DIR, 'http_cache')
+
+class CachedResponse:
+    def __init__(self, url, content, etag=None, last_modified=None, content_hash=None, fetched_at=None):
+        self.url = url
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.fetched_at = fetched_at
+        # Set by fetch_cached: True if the server answered 304 or the payload hash did not change
+        self.unchanged = False
+
+def _cache_key(url):
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest())
+
+def _cache_paths(url):
+    key = _cache_key(url)
+    return key + '.json', key + '.body'
+
+def load_cached(url):
+    """Returns the cached CachedResponse for url, or None if nothing usable is stored"""
+    meta_path, body_path = _cache_paths(url)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            content = f.read()
+    except (OSError, ValueError):
+        return None
+    if meta.get('url') != url:
+        return None
+    return CachedResponse(url, content, meta.get('etag'), meta.get('last_modified'),
+                          meta.get('content_hash'), meta.get('fetched_at'))
+
+def load_parsed(entry):
+    """Returns the value stored by store_parsed for entry's url and content_hash, or None"""
+    try:
+        with open(_cache_key(entry.url) + '.parsed.json', 'r', encoding='utf-8') as f:
+            parsed = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not entry.content_hash or parsed.get('content_hash') != entry.content_hash:
+        return None
+    return parsed.get('value')
+
+def store_parsed(entry, value):
+    """Remembers a JSON-serializable value derived from entry's payload, keyed by its content_hash"""
+    if not entry.content_hash:
+        return
+    parsed_path = _cache_key(entry.url) + '.parsed.json'
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = parsed_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'content_hash': entry.content_hash, 'value': value}, f, ensure_ascii=False)
+        os.replace(tmp_path, parsed_path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+def store_cached(entry):
+    """Persists a CachedResponse; body and metadata are each written atomically"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    meta_path, body_path = _cache_paths(entry.url)
+    meta = {
+        'url': entry.url,
+        'etag': entry.etag,
+        'last_modified': entry.last_modified,
+        'content_hash': entry.content_hash,
+        'fetched_at': entry.fetched_at,
+    }
+    try:
+        tmp_body = body_path + '.tmp'
+        with open(tmp_body, 'wb') as f:
+            f.write(entry.content)
+        os.replace(tmp_body, body_path)
+        tmp_meta = meta_path + '.tmp'
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+    except OSError:
+        pass
+
+def fetch_cached(session, url, timeout=10, hash_source=None):
+    """GETs url with ETag / Last-Modified revalidation against the on-disk cache.
+
+    hash_source(content) selects the part of the payload that is hashed to decide
+    whether the content really changed (defaults to the whole body). The returned
+    CachedResponse has unchanged=True when the server answered 304 or the hash matches.
+    """
+    cached = load_cached(url)
+    headers = {}
+    if cached:
+        if cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+
+    resp = session.get(url, headers=headers, timeout=timeout)
+    if resp.status_code == 304 and cached:
+        cached.fetched_at = time.time()
+        cached.unchanged = True
+        store_cached(cached)
+        return cached
+    resp.raise_for_status()
+
+    content = resp.content
+    source = hash_source(content) if hash_source else content
+    content_hash = hashlib.sha256(source or content).hexdigest()
+    entry = CachedResponse(url, content, resp.headers.get('ETag'), resp.headers.get('Last-Modified'),
+                           content_hash, time.time())
+    entry.unchanged = bool(cached and cached.content_hash == content_hash)
+    store_cached(entry)
+    return entry
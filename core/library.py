@@ -1,17 +1,35 @@
 import os
+import re
 import glob
 import time
 import shutil
-import random
+import threading
+import itertools
+from functools import lru_cache
+from zhconv import convert
 from utils.helpers import sanitize_filename, normalize_name
 from utils.config import ensure_dirs
 
+AUDIO_EXTENSIONS = ('.mp3', '.m4a', '.flac', '.wav', '.webm', '.opus', '.ogg', '.aac')
+
+# audio_format value that keeps the source codec (opus/aac) instead of re-encoding
+NATIVE_FORMAT = 'native'
+
+def format_extension(audio_format):
+    """File extension expected for songs downloaded as audio_format (used for not-yet-downloaded entries)"""
+    # YouTube's best audio stream is almost always opus
+    return '.opus' if audio_format == NATIVE_FORMAT else f'.{audio_format}'
+
+# Bump whenever get_normalized_tokens changes so cached tokens in the library index are rebuilt
+TOKENIZER_VERSION = 2
+
 class UpdateStats:
     def __init__(self):
         self.playlists_scanned = 0
         self.songs_downloaded = []
         self.playlist_changes = {}
         self.playlist_updates = {}
+        self.fuzzy_matches = []  # (song_name, matched_path, score)
         self.stop_event = None
 
 def parse_playlist(file_path):
@@ -74,85 +92,307 @@ def unblock_files(directory, log_func):
             subprocess.run(["powershell", "-Command", cmd], capture_output=True, check=False)
         except: pass
 
-def get_normalized_tokens(text):
-    import re
-    from zhconv import convert
+# --- Name normalization engine ---
+# Patterns are compiled once; see get_normalized_tokens for the meaning of each step.
+_CJK_RUN_RE = re.compile(r'[\u4e00-\u9fff]+')
+_E_PREFIX_RE = re.compile(r'^e(?=[a-z\u4e00-\u9fff\u3040-\u30ff])')
+_SEPARATOR_RE = re.compile(r'\s*(feat|ft|vs)\.?\s*|\s*[&,x]\s*')
+_BRACKET_RE = re.compile(r"[\(\[【][^\)\]】]*[\)\]】]")
+_NON_WORD_RE = re.compile(r"[^a-z0-9\u4e00-\u9fff\u3040-\u309f\u30a0-\u30ff]+")
 
-    # 1. Convert to lowercase
-    text = str(text).lower()
-    
-    # 2. Convert Chinese characters to Simplified Chinese, but preserve Japanese
-    # Only apply zhconv to Chinese characters, not Japanese kana
+def _convert_cjk_run(match):
     try:
-        # Split text to preserve Japanese characters
-        import re as regex
-        # This regex separates Chinese characters from other characters
-        def convert_chinese_only(match):
-            chinese_text = match.group(0)
-            try:
-                return convert(chinese_text, 'zh-cn')
-            except:
-                return chinese_text
-        
-        # Apply conversion only to Chinese characters (CJK Unified Ideographs)
-        text = regex.sub(r'[\u4e00-\u9fff]', convert_chinese_only, text)
-    except:
-        # If conversion fails, keep original text
-        pass
+        return convert(match.group(0), 'zh-cn')
+    except Exception:
+        return match.group(0)
+
+@lru_cache(maxsize=65536)
+def _normalize_tokens(text):
+    # 1. Convert to lowercase
+    text = text.lower()
+
+    # 2. Convert Chinese characters to Simplified Chinese, but preserve Japanese kana.
+    # Each contiguous run of CJK Unified Ideographs is converted in a single call.
+    text = _CJK_RUN_RE.sub(_convert_cjk_run, text)
 
     # 2.5 Remove "E" prefix artifact (common in Spotify scrapes)
     # e.g. "EYosebe", "E王ADEN"
-    text = re.sub(r'^e(?=[a-z\u4e00-\u9fff\u3040-\u30ff])', '', text)
+    text = _E_PREFIX_RE.sub('', text)
 
     # 3. Standardize artist separators and common terms to spaces
     # Handles 'feat.', 'ft.', 'vs', 'vs.', '&', ',', ' x '
-    text = re.sub(r'\s*(feat|ft|vs)\.?\s*|\s*[&,x]\s*', ' ', text)
+    text = _SEPARATOR_RE.sub(' ', text)
 
     # 4. Remove content in brackets (e.g., (Live), [Remix], 【MV】)
     # Also removes the brackets themselves
-    text = re.sub(r"[\(\[【][^\)\]】]*[\)\]】]", " ", text)
+    text = _BRACKET_RE.sub(' ', text)
 
     # 5. Replace all non-alphanumeric characters (excluding Chinese and Japanese) with spaces
-    # This will also handle underscores and other symbols
     # Include Japanese Hiragana (\u3040-\u309f) and Katakana (\u30a0-\u30ff)
-    text = re.sub(r"[^a-z0-9\u4e00-\u9fff\u3040-\u309f\u30a0-\u30ff]+", " ", text)
+    text = _NON_WORD_RE.sub(' ', text)
+
+    # 6. Split into tokens and sort
+    return tuple(sorted(text.split()))
+
+def get_normalized_tokens(text):
+    """Returns the sorted list of normalized name tokens used for order-independent matching.
+    Results are memoized by the raw string, so repeated lookups of the same name are free."""
+    return list(_normalize_tokens(str(text)))
+
+def normalize_many(names):
+    """Batch entry point: returns a token tuple for every name, in input order"""
+    normalize = _normalize_tokens
+    return [normalize(str(name)) for name in names]
+
+# Tokens that describe a release rather than the recording; ignored by fuzzy matching.
+# "remix" / "cover" / "inst" are deliberately absent since they are different recordings.
+FUZZY_FILLER_TOKENS = frozenset([
+    'remaster', 'remastered', 'version', 'ver', 'edit', 'radio', 'official',
+    'audio', 'video', 'mv', 'lyrics', 'lyric', 'hd', '4k', 'explicit', 'clean', 'single',
+])
+_YEAR_RE = re.compile(r'^(19|20)\d\d$')
+
+# Posting lists longer than this are too common to narrow candidates (e.g. a prolific artist)
+FUZZY_MAX_POSTINGS = 2000
+# Only this many best-overlapping candidates are fully scored
+FUZZY_MAX_CANDIDATES = 32
+
+def _core_tokens(tokens):
+    return frozenset(t for t in tokens if t not in FUZZY_FILLER_TOKENS and not _YEAR_RE.match(t))
+
+def _is_numeric_token(token):
+    return any(c.isdigit() for c in token)
+
+@lru_cache(maxsize=65536)
+def _trigrams(token):
+    # Padded so one- and two-letter tokens still produce grams
+    text = f' {token} '
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+def _jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def _fuzzy_score(query_core, key_core, token_threshold):
+    """Similarity of two core token sets, or 0.0 when they name different recordings.
+
+    Numbered tokens ("2", "no5", "op27") must match exactly, as must the word count:
+    only filler and year tokens, already stripped from the core, may differ. Every
+    remaining word pairs up with one word of the other name, either exactly or as a
+    spelling variant whose trigram similarity reaches token_threshold; the score is
+    the mean similarity over all pairs.
+    """
+    if len(query_core) != len(key_core):
+        return 0.0
+    if {t for t in query_core if _is_numeric_token(t)} != {t for t in key_core if _is_numeric_token(t)}:
+        return 0.0
+    query_rest = [t for t in query_core if t not in key_core]
+    key_rest = [t for t in key_core if t not in query_core]
+    total = float(len(query_core) - len(query_rest))
+    for token in query_rest:
+        if _is_numeric_token(token):
+            return 0.0
+        grams = _trigrams(token)
+        best, best_score = None, 0.0
+        for other in key_rest:
+            score = _jaccard(grams, _trigrams(other))
+            if score > best_score:
+                best, best_score = other, score
+        if best is None or best_score < token_threshold:
+            return 0.0
+        key_rest.remove(best)
+        total += best_score
+    return total / len(query_core)
+
+class LibraryIndex:
+    """Token-keyed view of the library shared by matching, downloading and export.
+
+    Lookups by token tuple are O(1), and newly downloaded files can be appended
+    without rebuilding the index. Iterating yields the indexed file paths.
+    A token inverted index is kept alongside for fuzzy near-miss resolution.
+
+    (uid, generation) identifies the index content: uid is unique per instance and
+    generation grows with every add(), so derived results can be cached against it.
+    """
+    _next_uid = itertools.count(1)
+
+    def __init__(self, audio_files=None, tokens=None):
+        self.files = []
+        self.by_tokens = {}
+        self.postings = {}  # core token -> set of token tuples containing it
+        self.lock = threading.Lock()
+        self.uid = next(LibraryIndex._next_uid)
+        self.generation = 0
+        if audio_files:
+            self.extend(audio_files, tokens)
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Builds an index from library_db entries, reusing their cached tokens"""
+        return cls([e.path for e in entries], [e.tokens for e in entries])
 
-    # 6. Split into tokens, remove empty strings, and sort
-    return sorted([t for t in text.split() if t])
+    def add(self, file_path, tokens=None):
+        if tokens is None:
+            tokens = _normalize_tokens(os.path.splitext(os.path.basename(file_path))[0])
+        with self.lock:
+            self.files.append(file_path)
+            self.generation += 1
+            # The key is a tuple of sorted tokens, making it order-independent
+            if tokens:
+                self.by_tokens[tokens] = file_path
+                for token in _core_tokens(tokens):
+                    self.postings.setdefault(token, set()).add(tokens)
+
+    # Drop-in replacement for the old audio_files_cache.append()
+    append = add
+
+    def add_alias(self, song_name, file_path):
+        """Resolves song_name to an already indexed file without listing it twice.
+        A real file with the same tokens always wins over an alias."""
+        tokens = _normalize_tokens(str(song_name))
+        with self.lock:
+            if not tokens or tokens in self.by_tokens:
+                return
+            self.by_tokens[tokens] = file_path
+            self.generation += 1
+            for token in _core_tokens(tokens):
+                self.postings.setdefault(token, set()).add(tokens)
+
+    def extend(self, audio_files, tokens=None):
+        audio_files = list(audio_files)
+        if tokens is None:
+            names = [os.path.splitext(os.path.basename(f))[0] for f in audio_files]
+            tokens = normalize_many(names)
+        for file_path, tokens_tuple in zip(audio_files, tokens):
+            self.add(file_path, tuple(tokens_tuple))
+
+    def get(self, tokens, default=None):
+        return self.by_tokens.get(tokens, default)
+
+    def find(self, song_name):
+        query_tokens = _normalize_tokens(str(song_name))
+        if not query_tokens:
+            return None
+        return self.by_tokens.get(query_tokens)
+
+    def find_match(self, song_name, fuzzy_threshold=None):
+        """Returns (path, score, is_fuzzy). Exact token matches score 1.0; if none exists and
+        fuzzy_threshold is set, the best near miss scoring at least the threshold is returned.
+        Near misses may only differ in filler/year tokens and word spelling (see _fuzzy_score).
+        Candidates come from the inverted index, so no linear scan of the library is needed."""
+        query_tokens = _normalize_tokens(str(song_name))
+        if not query_tokens:
+            return None, 0.0, False
+        exact = self.by_tokens.get(query_tokens)
+        if exact or not fuzzy_threshold:
+            return exact, (1.0 if exact else 0.0), False
+
+        query_core = _core_tokens(query_tokens)
+        if not query_core:
+            return None, 0.0, False
+
+        # Count shared core tokens per candidate, skipping overly common tokens when possible
+        postings = [self.postings.get(t, ()) for t in query_core]
+        selective = [p for p in postings if len(p) <= FUZZY_MAX_POSTINGS] or postings
+        overlap = {}
+        for posting in selective:
+            for key in posting:
+                overlap[key] = overlap.get(key, 0) + 1
+        if not overlap:
+            return None, 0.0, False
+
+        candidates = sorted(overlap, key=overlap.get, reverse=True)[:FUZZY_MAX_CANDIDATES]
+        best_key, best_score = None, 0.0
+        for key in candidates:
+            score = _fuzzy_score(query_core, _core_tokens(key), fuzzy_threshold)
+            if score > best_score:
+                best_key, best_score = key, score
+
+        if best_key is not None and best_score >= fuzzy_threshold:
+            return self.by_tokens[best_key], best_score, True
+        return None, best_score, False
+
+    def __contains__(self, tokens):
+        return tokens in self.by_tokens
+
+    def __len__(self):
+        return len(self.files)
+
+    def __iter__(self):
+        # Iterate over a snapshot so readers never race with concurrent add()
+        with self.lock:
+            return iter(list(self.files))
 
 def build_library_index(audio_files):
-    index = {}
-    for file_path in audio_files:
-        filename = os.path.basename(file_path)
-        name_no_ext = os.path.splitext(filename)[0]
-        # The key is a tuple of sorted tokens, making it order-independent
-        tokens_tuple = tuple(get_normalized_tokens(name_no_ext))
-        if tokens_tuple:
-            index[tokens_tuple] = file_path
+    if isinstance(audio_files, LibraryIndex):
+        return audio_files
+    return LibraryIndex(audio_files)
+
+def get_audio_files(library_path):
+    """Lists all audio files in the library, served from the persistent on-disk index"""
+    from core.library_db import scan_library
+    return [entry.path for entry in scan_library(library_path)]
+
+_shared_indexes = {}  # normalized library path -> (scan signature, LibraryIndex, generation at build)
+_shared_indexes_lock = threading.Lock()
+
+def load_library_index(library_path):
+    """Returns a LibraryIndex built from the cached tokens of the persistent index.
+    While the library is unchanged on disk the same instance is returned, so results
+    cached against its (uid, generation) stay valid across calls."""
+    from core.library_db import scan_library, get_aliases
+    entries = scan_library(library_path)
+    signature = hash(tuple((e.path, e.size, e.mtime) for e in entries))
+    key = os.path.normcase(os.path.abspath(library_path or '.'))
+    with _shared_indexes_lock:
+        cached = _shared_indexes.get(key)
+        # An index that was appended to since is no longer a pure view of this scan
+        if cached and cached[0] == signature and cached[1].generation == cached[2]:
+            return cached[1]
+
+    index = LibraryIndex.from_entries(entries)
+    # Names of merged duplicates keep resolving to the copy that was kept
+    indexed = {e.path for e in entries}
+    for name, target in get_aliases(library_path).items():
+        if target in indexed:
+            index.add_alias(name, target)
+    with _shared_indexes_lock:
+        _shared_indexes[key] = (signature, index, index.generation)
     return index
 
-def find_song_in_library(song_name, library_source):
-    """ Tries to find a song using either a pre-built library index (dict) or a file list (list). """
-    query_tokens = tuple(get_normalized_tokens(song_name))
-    if not query_tokens:
-        return None
-    
-    # Check if library_source is a dictionary (index) or list (file list)
-    if isinstance(library_source, dict):
-        # Fast O(1) lookup using the index
-        return library_source.get(query_tokens)
-    elif isinstance(library_source, list):
-        # Fallback to O(n) search for backward compatibility with downloader.py
-        for file_path in library_source:
-            filename = os.path.basename(file_path)
-            name_no_ext = os.path.splitext(filename)[0]
-            file_tokens = tuple(get_normalized_tokens(name_no_ext))
-            if file_tokens == query_tokens:
-                return file_path
-        return None
-    else:
-        # Unsupported type
-        return None
+def _require_index(library_source):
+    # Plain file lists would have to be re-indexed on every lookup; build a LibraryIndex once instead
+    if not isinstance(library_source, LibraryIndex):
+        raise TypeError(f"expected a LibraryIndex, got {type(library_source).__name__}")
+    return library_source
+
+def match_song_in_library(song_name, library_source, fuzzy_threshold=None):
+    """ Like find_song_in_library, but returns (path, score, is_fuzzy) so callers can report near misses. """
+    return _require_index(library_source).find_match(song_name, fuzzy_threshold)
+
+def get_fuzzy_threshold(config):
+    """The configured fuzzy match threshold, or None while fuzzy matching is disabled"""
+    return config.get('fuzzy_match_threshold', 0.85) if config.get('enable_fuzzy_match', False) else None
+
+def resolve_song(song_name, library_index, fuzzy_threshold=None, library_path=None):
+    """ match_song_in_library that remembers accepted fuzzy hits as aliases, in the index and
+    (with library_path) in the library database, so every later exact lookup (export, M3U
+    paths, completeness, _Unsorted) resolves the song to the same file. """
+    path, score, is_fuzzy = match_song_in_library(song_name, library_index, fuzzy_threshold)
+    if path and is_fuzzy:
+        library_index.add_alias(song_name, path)
+        if library_path:
+            from core.library_db import add_aliases
+            add_aliases(library_path, {song_name: path})
+    return path, score, is_fuzzy
+
+def find_song_in_library(song_name, library_source, fuzzy_threshold=None):
+    """ Tries to find a song in a LibraryIndex (see load_library_index / build_library_index). """
+    if fuzzy_threshold:
+        return match_song_in_library(song_name, library_source, fuzzy_threshold)[0]
+    # Fast O(1) lookup using the index
+    return _require_index(library_source).find(song_name)
 
 def rename_explicit_files(library_path, log_func):
     """ Renames files starting with 'E' prefix and standardizes all filenames to be safe for players """
@@ -224,21 +464,21 @@ def move_unsorted_songs(config, log_func):
         t = tuple(get_normalized_tokens(s))
         if t: playlist_tokens.add(t)
         
-    # 2. Identify orphan files in Music root
-    search_pattern = os.path.join(library_path, "**", "*")
-    all_library_files = [os.path.normpath(f) for f in glob.glob(search_pattern, recursive=True) if os.path.isfile(f)]
+    # Merged duplicates: a playlist entry naming a removed copy still references the kept file
+    from core.library_db import scan_library, get_aliases
+    alias_targets = {os.path.normcase(os.path.normpath(target))
+                     for name, target in get_aliases(library_path).items()
+                     if tuple(get_normalized_tokens(name)) in playlist_tokens}
+
+    # 2. Identify orphan files in Music root (tokens come from the persistent index)
+    all_library_files = [(os.path.normpath(e.path), e.tokens) for e in scan_library(library_path)]
     
     orphans = []
-    for f in all_library_files:
+    for f, file_tokens in all_library_files:
         # ROBUST CHECK: skip if file is actually inside the _Unsorted directory
         if f.lower().startswith(unsorted_dir_norm): continue
-        if os.path.basename(f).startswith('.'): continue
-        if not f.lower().endswith(('.mp3', '.m4a', '.flac', '.wav', '.webm')): continue
         
-        filename_no_ext = os.path.splitext(os.path.basename(f))[0]
-        file_tokens = tuple(get_normalized_tokens(filename_no_ext))
-        
-        if file_tokens not in playlist_tokens:
+        if file_tokens not in playlist_tokens and os.path.normcase(f) not in alias_targets:
             orphans.append(f)
             
     # 3. Move files to _Unsorted dir
@@ -264,14 +504,14 @@ def move_unsorted_songs(config, log_func):
     if os.path.exists(unsorted_dir):
         unsorted_files = [os.path.join(unsorted_dir, f) for f in os.listdir(unsorted_dir) if os.path.isfile(os.path.join(unsorted_dir, f))]
         for f in unsorted_files:
-            if not f.lower().endswith(('.mp3', '.m4a', '.flac', '.wav', '.webm')): continue
+            if not f.lower().endswith(AUDIO_EXTENSIONS): continue
             
             filename_no_ext = os.path.splitext(os.path.basename(f))[0]
             file_tokens = tuple(get_normalized_tokens(filename_no_ext))
+            dest = os.path.join(library_path, os.path.basename(f))
             
-            if file_tokens in playlist_tokens:
+            if file_tokens in playlist_tokens or os.path.normcase(dest) in alias_targets:
                 try:
-                    dest = os.path.join(library_path, os.path.basename(f))
                     if not os.path.exists(dest):
                         os.rename(f, dest)
                         recovered_count += 1
@@ -295,7 +535,7 @@ def move_unsorted_songs(config, log_func):
     single_tracks_pl = os.path.join(playlists_path, "Single Tracks.m3u8")
     
     if os.path.exists(single_tracks_dir):
-        st_files = [f for f in os.listdir(single_tracks_dir) if f.lower().endswith(('.mp3', '.m4a', '.flac', '.wav', '.webm'))]
+        st_files = [f for f in os.listdir(single_tracks_dir) if f.lower().endswith(AUDIO_EXTENSIONS)]
         if st_files:
             with open(single_tracks_pl, 'w', encoding='utf-8-sig', newline='') as f:
                 f.write("#EXTM3U\r\n")
@@ -313,7 +553,7 @@ def move_unsorted_songs(config, log_func):
     
     if os.path.exists(unsorted_dir):
         files_in_dir = os.listdir(unsorted_dir)
-        audio_orphans = [f for f in files_in_dir if f.lower().endswith(('.mp3', '.m4a', '.flac', '.wav', '.webm'))]
+        audio_orphans = [f for f in files_in_dir if f.lower().endswith(AUDIO_EXTENSIONS)]
         
         if audio_orphans:
             try:
@@ -339,12 +579,28 @@ def move_unsorted_songs(config, log_func):
     
     return moved_count
 
+def _future_path(future, log_func):
+    """Result of a transcode Future, or None if it failed or was cancelled"""
+    from concurrent.futures import CancelledError
+    from utils.i18n import _
+    try:
+        return future.result()
+    except CancelledError:
+        return None
+    except Exception as e:
+        log_func(_('dl_fail', str(e)))
+        return None
+
 def update_library_logic(config, stats, log_func, progress_func=None, post_scrape_callback=None, post_download_callback=None, speed_display_callback=None):
     from core.spotify import scrape_via_spotify_embed
-    from core.downloader import download_song
+    from core.downloader import download_song, release_ydl_engines
+    from core.transcoder import TranscodePool
+    from core.lyrics import configure as configure_lyrics
+    from concurrent.futures import Future
     import time
             
     # 0. Initialize
+    configure_lyrics(config)
     library_path = config['library_path']
     playlists_path = config['playlists_path']
     audio_format = config.get('audio_format', 'mp3')
@@ -374,12 +630,13 @@ def update_library_logic(config, stats, log_func, progress_func=None, post_scrap
 
     # Build the library index for fast lookups
     log_func(_('building_index'))
-    search_pattern = os.path.join(library_path, "**", "*")
-    all_files = glob.glob(search_pattern, recursive=True)
-    audio_files_cache = [f for f in all_files if f.lower().endswith(('.mp3', '.m4a', '.flac', '.wav', '.webm'))]
-    library_index = build_library_index(audio_files_cache)
-    log_func(_('indexed_songs', len(audio_files_cache)))
+    library_index = load_library_index(library_path)
+    audio_files_cache = library_index.files
+    log_func(_('indexed_songs', len(library_index)))
     
+    # Near-miss resolution (e.g. "(Remastered 2011)" suffixes) to avoid redundant downloads
+    fuzzy_threshold = get_fuzzy_threshold(config)
+
     songs_to_download = [] # List of {'name': s, 'playlist': pl}
     songs_missing_lyrics = [] # List of (song_name, existing_path)
     
@@ -403,7 +660,10 @@ def update_library_logic(config, stats, log_func, progress_func=None, post_scrap
                   log_func(_('task_stopped'))
                   return
 
-             existing_path = find_song_in_library(song_name, library_index)
+             existing_path, score, is_fuzzy = resolve_song(song_name, library_index, fuzzy_threshold, library_path)
+             if existing_path and is_fuzzy:
+                 stats.fuzzy_matches.append((song_name, existing_path, score))
+                 log_func(_('fuzzy_match', song_name, os.path.basename(existing_path), score))
              if not existing_path:
                  # Check if already in list to avoid duplicates across diff playlists
                  if not any(d['name'] == song_name for d in songs_to_download):
@@ -416,231 +676,190 @@ def update_library_logic(config, stats, log_func, progress_func=None, post_scrap
     
     # PHASE 2: Download
     if total_missing > 0:
+        from core.scheduler import DownloadScheduler
+        import threading
         log_func(_('dl_start'))
-        current_dl = 0
-        successful_downloads = 0
-        
-        # Create a wrapper to pass overall ETA to progress function
+
+        max_workers = config.get('max_threads', 4)
+        # Network stage (scheduler) and CPU stage (ffmpeg pool) overlap; without ffmpeg
+        # on hand yt-dlp keeps converting inline as before
+        transcoder = TranscodePool(max_workers=config.get('transcode_workers') or os.cpu_count(),
+                                   stop_event=getattr(stats, 'stop_event', None), io_workers=max_workers)
+
+        scheduler = DownloadScheduler(
+            max_workers=max_workers,
+            rate_per_minute=config.get('downloads_per_minute', 12),
+            stop_event=getattr(stats, 'stop_event', None),
+            pause_event=getattr(stats, 'pause_event', None),
+            log_func=log_func
+        )
+
         overall_start_time = time.time()
-        total_downloaded_time = 0  # Track cumulative download time
-        
+        progress_lock = threading.Lock()
+        completed = [0]
+        started = [0]
+        in_flight = {}  # index -> fraction of the current song already downloaded
+
         # Initial progress call to show task starting
         if progress_func:
-            # Provide an initial rough estimate (2 minutes per song)
-            initial_eta = total_missing * 120  # 2 minutes per song
+            # Provide an initial rough estimate (2 minutes per song, split across workers)
+            initial_eta = total_missing * 120 / max(1, min(max_workers, total_missing))
             progress_func(0, total_missing, initial_eta)
-        
-        def progress_with_overall_eta(current, total, song_eta=None):
-            if progress_func:
-                # Use provided song_eta if available, otherwise calculate based on average time
-                if song_eta is not None and isinstance(song_eta, (int, float)):
-                    # Use the provided ETA directly, even if small
-                    eta_seconds = song_eta
-                elif current > 0 and total_downloaded_time > 0:
-                    # Calculate overall ETA based on progress and average time per song
-                    avg_time_per_song = total_downloaded_time / max(1, current)
-                    remaining_songs = total - current
-                    eta_seconds = remaining_songs * avg_time_per_song
-                else:
-                    eta_seconds = 0
-                
-                # Ensure eta_seconds is numeric
-                try:
-                    eta_seconds = float(eta_seconds)
-                except (ValueError, TypeError):
-                    eta_seconds = 0
-                
-                if eta_seconds > 0:
-                    eta_min = int(eta_seconds // 60)
-                    eta_sec = int(eta_seconds % 60)
-                    overall_eta = f"{eta_min}:{eta_sec:02d}"
-                else:
-                    overall_eta = "即將完成" if current > 0 else None
-                
-                progress_func(current, total, overall_eta)
+
+        def report_overall_progress():
+            """Overall progress = finished songs + partial progress of songs still in flight"""
+            if not progress_func:
+                return
+            with progress_lock:
+                overall = completed[0] + sum(in_flight.values())
+            elapsed = time.time() - overall_start_time
+            if overall > 0 and elapsed > 0:
+                eta_seconds = elapsed / overall * (total_missing - overall)
             else:
-                progress_func(0, total, None)
-        
+                eta_seconds = None
+            progress_func(overall, total_missing, eta_seconds)
+
+        def has_status_ui():
+            return hasattr(stats, 'app') and hasattr(stats.app, 'update_song_status')
+
         # Initialize song status tracking for downloads
-        download_status = {}
         for i, item in enumerate(songs_to_download):
-            song_name = item['name']
-            download_status[i] = {
-                'name': song_name,
-                'status': '⏳ 等待中',
-                'order': i + 1
-            }
-            # Initialize song status in UI
-            if hasattr(stats, 'app') and hasattr(stats.app, 'update_song_status'):
-                stats.app.update_song_status(i, '⏳ 等待中', song_name)
+            if has_status_ui():
+                stats.app.update_song_status(i, '⏳ 等待中', item['name'])
 
-        for i, item in enumerate(songs_to_download):
+        def on_start(i, item):
             song_name = item['name']
-            pl_name = item['playlist']
-            remaining = total_missing - (current_dl + 1)
-            
-            if stats and stats.stop_event and stats.stop_event.is_set():
-                 log_func(_('task_stopped'))
-                 return
+            started[0] += 1
+            remaining = total_missing - started[0]
+            with progress_lock:
+                in_flight[i] = 0.0
 
-            if hasattr(stats, 'pause_event') and stats.pause_event:
-                 stats.pause_event.wait()
-            
             # Update status to downloading
-            if hasattr(stats, 'app') and hasattr(stats.app, 'update_song_status'):
+            if has_status_ui():
                 stats.app.update_song_status(i, '🔽 下載中', song_name)
-                 
+
             # Check if log_func supports immediate parameter
+            msg = _('dl_progress', started[0], total_missing, remaining, item['playlist'], song_name)
             if hasattr(log_func, '__code__') and 'immediate' in log_func.__code__.co_varnames:
-                log_func(_('dl_progress', current_dl+1, total_missing, remaining, pl_name, song_name), immediate=True)
+                log_func(msg, immediate=True)
             else:
-                log_func(_('dl_progress', current_dl+1, total_missing, remaining, pl_name, song_name))
-            
-            # Create a progress callback for this song
-            song_start_time = time.time()
-            def song_progress_callback(current, total, eta=None):
-                # Update overall progress with current song progress
-                # Use current_dl + (current/total) to show progress within current song
-                if total > 0:
-                    song_progress = current / total
-                    overall_progress = current_dl + song_progress
-                else:
-                    overall_progress = current_dl
-                
-                # Calculate overall ETA for the entire task
-                if total_downloaded_time > 0 and current_dl > 0:
-                    avg_time_per_song = total_downloaded_time / current_dl
-                    remaining_songs = total_missing - current_dl
-                    eta_seconds = remaining_songs * avg_time_per_song
-                    # Ensure eta_seconds is numeric
-                    try:
-                        eta_seconds = float(eta_seconds)
-                    except (ValueError, TypeError):
-                        eta_seconds = None
-                    progress_with_overall_eta(overall_progress, total_missing, eta_seconds)
-                else:
-                    # For first song, try to use current song's ETA as rough estimate
-                    if eta and isinstance(eta, (int, float)) and eta > 0:
-                        # Rough estimate: current song ETA * remaining songs
-                        remaining_songs = total_missing - current_dl
-                        overall_eta = eta * remaining_songs
-                        progress_with_overall_eta(overall_progress, total_missing, overall_eta)
-                    elif total > 0 and current > 0:
-                        # If we have current song progress, estimate based on current song's progress rate
-                        song_progress_ratio = current / total
-                        if song_progress_ratio > 0:
-                            # Estimate total time for current song based on elapsed time and progress
-                            elapsed_time = time.time() - song_start_time
-                            estimated_total_song_time = elapsed_time / song_progress_ratio
-                            remaining_song_time = estimated_total_song_time - elapsed_time
-                            # Rough estimate: remaining time for current song + time for remaining songs
-                            remaining_songs = total_missing - current_dl - 1  # Exclude current song
-                            if remaining_songs > 0:
-                                # Estimate 2 minutes per remaining song as fallback
-                                estimated_remaining_time = remaining_song_time + (remaining_songs * 120)
-                            else:
-                                estimated_remaining_time = remaining_song_time
-                            progress_with_overall_eta(overall_progress, total_missing, estimated_remaining_time)
-                        else:
-                            progress_with_overall_eta(overall_progress, total_missing, None)
-                    else:
-                        progress_with_overall_eta(overall_progress, total_missing, None)
-            
-            res = download_song(song_name, library_path, audio_format, log_func, audio_files_cache, stats, None, song_progress_callback, current_dl)
+                log_func(msg)
+
+        def download_job(i, item):
+            def song_progress_callback(downloaded, total, eta=None):
+                if total and total > 0:
+                    with progress_lock:
+                        if i in in_flight:
+                            in_flight[i] = min(1.0, downloaded / total)
+                report_overall_progress()
+
+            return download_song(item['name'], library_path, audio_format, log_func, library_index,
+                                 stats, None, song_progress_callback,
+                                 transcoder=transcoder if transcoder.available else None)
+
+        finalize_lock = threading.Lock()
+
+        def on_done(i, item, res):
+            if isinstance(res, Future):
+                # Still converting: finish the bookkeeping once the transcode pool is done with it
+                if has_status_ui():
+                    stats.app.update_song_status(i, '🔄 轉檔中', item['name'])
+                res.add_done_callback(lambda f: on_done(i, item, _future_path(f, log_func)))
+                return
+
+            with finalize_lock:
+                finalize(i, item, res)
+
+        def finalize(i, item, res):
+            song_name = item['name']
+            pl_name = item['playlist']
+            with progress_lock:
+                in_flight.pop(i, None)
+                completed[0] += 1
+
             if res and os.path.exists(res):
                 # Update status to success
-                if hasattr(stats, 'app') and hasattr(stats.app, 'update_song_status'):
+                if has_status_ui():
                     stats.app.update_song_status(i, '✅ 完成', song_name)
-                
-                # Track time spent on this song
-                song_end_time = time.time()
-                song_duration = song_end_time - song_start_time
-                total_downloaded_time += song_duration
-                
+
                 stats.songs_downloaded.append(song_name)
                 # Track which playlist this song was updated for
                 if pl_name not in stats.playlist_updates:
                     stats.playlist_updates[pl_name] = []
                 stats.playlist_updates[pl_name].append(song_name)
-                audio_files_cache.append(res)
-                successful_downloads += 1
-                
-                if post_download_callback:
-                    post_download_callback(audio_files_cache)
+                # Index the new file incrementally so later lookups see it
+                library_index.add(res)
 
-                if successful_downloads % 10 == 0:
-                    log_func(_('dl_rest', successful_downloads))
-                    time.sleep(15)
+                if post_download_callback:
+                    post_download_callback(library_index)
             else:
                 # Update status to failed
-                if hasattr(stats, 'app') and hasattr(stats.app, 'update_song_status'):
+                if has_status_ui():
                     stats.app.update_song_status(i, '❌ 失敗', song_name)
-            
-            current_dl += 1
-            # Update progress with overall ETA calculation
-            if total_downloaded_time > 0 and current_dl > 0:
-                avg_time_per_song = total_downloaded_time / current_dl
-                remaining_songs = total_missing - current_dl
-                eta_seconds = remaining_songs * avg_time_per_song
-                # Ensure eta_seconds is numeric
-                try:
-                    eta_seconds = float(eta_seconds)
-                except (ValueError, TypeError):
-                    eta_seconds = None
-                if progress_func: 
-                    progress_func(current_dl, total_missing, eta_seconds)
-            else:
-                if progress_func: 
-                    progress_func(current_dl, total_missing, None)
-            
-            # Only add delay if not the last song and not cancelled
-            if current_dl < total_missing - 1:
-                delay = random.uniform(3, 8)
-                time.sleep(delay)
-        
+
+            report_overall_progress()
+
+        finished = scheduler.run(songs_to_download, download_job, on_start=on_start, on_done=on_done)
+        # Let conversions that are still queued finish (or drop them if the task was stopped)
+        transcoder.shutdown(cancel=not finished)
+
+        # Close the per-worker yt-dlp instances and report how much start-up time reuse saved
+        engine_stats = release_ydl_engines()
+        if engine_stats['jobs']:
+            log_func(_('ydl_engine_stats', engine_stats['engines'], engine_stats['jobs'], engine_stats['saved_seconds']))
+
+        if not finished:
+            log_func(_('task_stopped'))
+            return
+
     # PHASE 3: Retroactive Lyrics Download (Only run if enabled and there are existing songs missing lyrics)
     if songs_missing_lyrics and config.get('enable_retroactive_lyrics', True):
-        from core.downloader import download_lyrics
-        import threading
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        import json
-        import hashlib
+        from core.lyrics import ThreadedLyricsFetcher, save_lrc
+        from core import lyrics_store
         
         log_func(_('retroactive_lyrics', len(songs_missing_lyrics)))
-        total_lyrics_to_fetch = len(songs_missing_lyrics)
         lyrics_fetched_count = 0
         consecutive_failures = 0
         max_consecutive_failures = 10  # Skip to next phase after too many failures
-        
-        # Load failed lyrics cache
-        failed_cache_file = os.path.join(config.get('base_path', ''), 'data', 'failed_lyrics.json')
-        failed_cache = {}
-        try:
-            if os.path.exists(failed_cache_file):
-                with open(failed_cache_file, 'r', encoding='utf-8') as f:
-                    failed_cache = json.load(f)
-        except:
-            failed_cache = {}
-        
-        # Filter out songs that were previously marked as failed
+
+        # One-time import of the old never-expiring failure list
+        for legacy_file in {os.path.join(config.get('base_path', ''), 'data', 'failed_lyrics.json'),
+                            os.path.join('data', 'failed_lyrics.json')}:
+            migrated = lyrics_store.migrate_failed_json(legacy_file)
+            if migrated:
+                log_func(f"  ℹ️ 已匯入 {migrated} 筆舊的歌詞失敗紀錄")
+
+        # Decide per song from the lyrics store: regenerate known lyrics locally, skip
+        # misses whose TTL has not expired yet, and only fetch the rest
+        negative_ttl = config.get('lyrics_negative_ttl_days', 30) * 86400
+        should_retry = config.get('retry_failed_lyrics', False)
+        known = lyrics_store.get_entries(name for name, path in songs_missing_lyrics)
+        now = time.time()
         filtered_songs = []
+        regenerated = 0
+        skipped = 0
         for name, path in songs_missing_lyrics:
-            # Create a unique key for the song (based on name)
-            song_key = hashlib.md5(name.encode('utf-8')).hexdigest()
-            # Check if we should retry or skip
-            should_retry = config.get('retry_failed_lyrics', False)
-            
-            if should_retry or song_key not in failed_cache:
-                filtered_songs.append((name, path))
-            else:
-                log_func(f"  ⏭️ [Lyrics Skipped] {name} (previously failed)")
-        
+            status, lrc_text, checked_at = known.get(name, (None, None, None))
+            if status == lyrics_store.STATUS_FOUND and lrc_text:
+                try:
+                    save_lrc(lrc_text, os.path.splitext(path)[0] + ".lrc", converted=True)
+                    regenerated += 1
+                    continue
+                except OSError:
+                    pass
+            if not should_retry and status and lyrics_store.is_miss_fresh(status, checked_at, negative_ttl, now):
+                skipped += 1
+                continue
+            filtered_songs.append((name, path))
+
+        if regenerated:
+            log_func(f"  ♻️ 從歌詞資料庫還原 {regenerated} 個 .lrc 檔案")
+        if skipped:
+            log_func(f"  ℹ️ 跳過 {skipped} 首近期查無歌詞的歌曲")
         if not filtered_songs:
-            log_func("  ℹ️ 所有缺少歌詞的歌曲都已標記為失敗，跳過歌詞補抓")
-        else:
-            log_func(f"  ℹ️ 跳過 {len(songs_missing_lyrics) - len(filtered_songs)} 首先前失敗的歌曲")
-            songs_missing_lyrics = filtered_songs
-            total_lyrics_to_fetch = len(songs_missing_lyrics)
+            log_func("  ℹ️ 沒有需要重新查詢的歌詞")
+        songs_missing_lyrics = filtered_songs
+        total_lyrics_to_fetch = len(songs_missing_lyrics)
         
         # Create song status tracking
         song_status = {}
@@ -654,87 +873,57 @@ def update_library_logic(config, stats, log_func, progress_func=None, post_scrap
             if hasattr(stats, 'app') and hasattr(stats.app, 'update_song_status'):
                 stats.app.update_song_status(i, '⏳ 等待中', name)
         
-        # Multi-threading settings
-        max_workers = config.get('max_threads', 4)
-        results_lock = threading.Lock()
-        
-        def process_single_song(song_data):
-            nonlocal lyrics_fetched_count, consecutive_failures, failed_cache, song_status
-            
-            i, (name, path) = song_data
-            if stats and stats.stop_event and stats.stop_event.is_set():
-                return None, None
-            
-            if hasattr(stats, 'pause_event') and stats.pause_event:
-                stats.pause_event.wait()
-            
-            # Update status to processing
-            with results_lock:
-                song_status[i]['status'] = '🔍 搜尋中'
+        # One asyncio loop schedules every song onto lyrics_concurrency threads sharing a
+        # pooled session; lrclib sees at most that many requests in flight and
+        # lyrics_requests_per_second starts
+        fetcher = ThreadedLyricsFetcher(
+            concurrency=config.get('lyrics_concurrency', 8),
+            rate_per_second=config.get('lyrics_requests_per_second', 5),
+            stop_event=getattr(stats, 'stop_event', None),
+            pause_event=getattr(stats, 'pause_event', None)
+        )
+        completed_count = 0
+
+        def on_lyrics_result(i, name, lrc_path, result):
+            nonlocal lyrics_fetched_count, consecutive_failures, completed_count
+            completed_count += 1
+
+            if result.text:
+                lyrics_fetched_count += 1
+                consecutive_failures = 0
+                lyrics_store.store_found(name, result.text, result.source, result.query)
+                song_status[i]['status'] = '✅ 成功'
                 if hasattr(stats, 'app') and hasattr(stats.app, 'update_song_status'):
-                    stats.app.update_song_status(i, '🔍 搜尋中', name)
-            
-            lrc_path = os.path.splitext(path)[0] + ".lrc"
-            success = download_lyrics(name, lrc_path, lambda msg: None)  # Suppress individual logs
-            
-            with results_lock:
-                if success:
-                    lyrics_fetched_count += 1
-                    consecutive_failures = 0
-                    song_status[i]['status'] = '✅ 成功'
-                    if hasattr(stats, 'app') and hasattr(stats.app, 'update_song_status'):
-                        stats.app.update_song_status(i, '✅ 成功', name)
-                    return f"  ✅ [Lyrics] {name}", i + 1
-                else:
-                    # Mark as failed in cache
-                    song_key = hashlib.md5(name.encode('utf-8')).hexdigest()
-                    failed_cache[song_key] = {
-                        'name': name,
-                        'timestamp': time.time(),
-                        'reason': 'not_found'
-                    }
-                    
-                    consecutive_failures += 1
-                    song_status[i]['status'] = '❌ 失敗'
-                    if hasattr(stats, 'app') and hasattr(stats.app, 'update_song_status'):
-                        stats.app.update_song_status(i, '❌ 失敗', name)
-                    if consecutive_failures >= max_consecutive_failures:
-                        return f"  ⚠️ [Lyrics] 連續 {max_consecutive_failures} 次失敗，跳過剩餘歌詞下載", None
-                    return f"  ❌ [Lyrics] {name}", i + 1
-        
-        # Process songs with multi-threading
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_index = {
-                executor.submit(process_single_song, (i, song_data)): i 
-                for i, song_data in enumerate(songs_missing_lyrics)
-            }
-            
-            # Collect results as they complete
-            completed_count = 0
-            
-            for future in as_completed(future_to_index):
-                if consecutive_failures >= max_consecutive_failures:
-                    break
-                    
-                result, progress = future.result()
-                completed_count += 1
-                
-                # Show simple progress every 50 songs
-                if completed_count % 50 == 0 or completed_count == total_lyrics_to_fetch:
-                    log_func(f"� 歌詞下載進度: {completed_count}/{total_lyrics_to_fetch} (成功: {lyrics_fetched_count})")
-        
+                    stats.app.update_song_status(i, '✅ 成功', name)
+            else:
+                # Remember the miss; it is looked up again once its TTL expires
+                status = lyrics_store.STATUS_NOT_FOUND if result.error is None else lyrics_store.STATUS_ERROR
+                lyrics_store.store_miss(name, status, result.query)
+                consecutive_failures += 1
+                song_status[i]['status'] = '❌ 失敗'
+                if hasattr(stats, 'app') and hasattr(stats.app, 'update_song_status'):
+                    stats.app.update_song_status(i, '❌ 失敗', name)
+
+            # Show simple progress every 50 songs
+            if completed_count % 50 == 0 or completed_count == total_lyrics_to_fetch:
+                log_func(f"📝 歌詞下載進度: {completed_count}/{total_lyrics_to_fetch} (成功: {lyrics_fetched_count})")
+
+            if consecutive_failures >= max_consecutive_failures:
+                log_func(f"  ⚠️ [Lyrics] 連續 {max_consecutive_failures} 次失敗，跳過剩餘歌詞下載")
+                return False
+            return True
+
+        fetcher.run(
+            [(i, name, os.path.splitext(path)[0] + ".lrc", path) for i, (name, path) in enumerate(songs_missing_lyrics)],
+            on_lyrics_result
+        )
+        if fetcher.requests_made:
+            log_func(f"  ℹ️ lrclib 請求 {fetcher.requests_made} 次 (精確比對命中 {fetcher.exact_hits} 首)")
+
         # Final summary
         if lyrics_fetched_count > 0:
             log_func(f"🎉 歌詞補抓完成: 成功 {lyrics_fetched_count} / {total_lyrics_to_fetch} 首")
         
-        # Save failed cache
-        try:
-            os.makedirs(os.path.dirname(failed_cache_file), exist_ok=True)
-            with open(failed_cache_file, 'w', encoding='utf-8') as f:
-                json.dump(failed_cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            log_func(f"  ⚠️ 無法儲存失敗歌詞快取: {e}")
     elif songs_missing_lyrics and not config.get('enable_retroactive_lyrics', True):
         log_func(f" -> 跳過歌詞補抓 ({len(songs_missing_lyrics)} 首歌曲缺少歌詞，但已停用自動補抓功能)")
     
@@ -748,81 +937,243 @@ def update_library_logic(config, stats, log_func, progress_func=None, post_scrap
     except: pass
     log_func(_('update_complete'))
 
+class _CompletenessEntry:
+    __slots__ = ('stat_key', 'song_tokens', 'index_uid', 'generation', 'missing')
+
+_completeness_cache = {}  # playlist path -> _CompletenessEntry
+_completeness_lock = threading.Lock()
+
+def _playlist_stat_key(pl_file):
+    try:
+        st = os.stat(pl_file)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
 def get_playlist_completeness_report(playlists, library_path, audio_files_cache=None):
-    """Returns a dict {pl_file: (is_complete, missing_count, total_count)}"""
-    report = {}
-    
-    if audio_files_cache is None:
-        search_pattern = os.path.join(library_path, "**", "*")
-        all_files = glob.glob(search_pattern, recursive=True)
-        audio_files_cache = [f for f in all_files if f.lower().endswith(('.mp3', '.m4a', '.flac', '.wav', '.webm'))]
+    """Returns a dict {pl_file: (is_complete, missing_count, total_count)}
 
-    # Build index for this report
-    library_index = build_library_index(audio_files_cache)
+    Results are cached per playlist against its (mtime, size) and the library
+    index's (uid, generation): an untouched playlist on an unchanged index costs
+    nothing, and when files were only added only the previously missing songs
+    are looked up again. Playlists are re-parsed only when they changed on disk.
+    """
+    if audio_files_cache is None:
+        library_index = load_library_index(library_path)
+    else:
+        # Reuses the index as-is when handed a LibraryIndex
+        library_index = build_library_index(audio_files_cache)
 
+    report = {}
     for pl_file in playlists:
-        songs = parse_playlist(pl_file)
-        if not songs:
-            report[pl_file] = (True, 0, 0)
-            continue
-            
-        missing = 0
-        for song_name in songs:
-            if not find_song_in_library(song_name, library_index):
-                missing += 1
-        
-        report[pl_file] = (missing == 0, missing, len(songs))
+        stat_key = _playlist_stat_key(pl_file)
+        with _completeness_lock:
+            entry = _completeness_cache.get(pl_file)
+
+        if entry is None or entry.stat_key != stat_key:
+            # New or edited playlist: parse it and tokenize its songs once
+            entry = _CompletenessEntry()
+            entry.stat_key = stat_key
+            entry.song_tokens = [_normalize_tokens(str(name)) for name in parse_playlist(pl_file)]
+            entry.index_uid = None
+            entry.generation = -1
+            entry.missing = entry.song_tokens
+
+        generation = library_index.generation
+        if entry.index_uid != library_index.uid or entry.generation != generation:
+            if entry.index_uid != library_index.uid:
+                # Different index: look every song up again (playlist parse is still reused)
+                candidates = entry.song_tokens
+            else:
+                # Same index with files added since: only songs that were missing can change
+                candidates = entry.missing
+            updated = _CompletenessEntry()
+            updated.stat_key = entry.stat_key
+            updated.song_tokens = entry.song_tokens
+            updated.missing = [t for t in candidates if not t or t not in library_index]
+            updated.index_uid = library_index.uid
+            updated.generation = generation
+            entry = updated
+            with _completeness_lock:
+                _completeness_cache[pl_file] = entry
+
+        total = len(entry.song_tokens)
+        missing = len(entry.missing)
+        report[pl_file] = (missing == 0, missing, total)
     
     return report
 
-def export_usb_logic(config, selected_playlists, log_func):
+def export_usb_logic(config, selected_playlists, log_func, progress_func=None, stop_event=None):
+    """Exports the selected playlists into the export folder, one folder per playlist.
+
+    The copy set is planned up front and then copied by core.exporter.ExportEngine.
+    In sync mode (export_sync, the default) the target is updated in place: only new
+    or changed files are transferred and only files a previous export wrote are
+    removed, so export_target may point straight at a USB drive (a default export folder
+    written before manifests existed is adopted whole on its first sync). Otherwise the export
+    is rebuilt from scratch: the default export folder is wiped, a custom export_target
+    only loses the files previous exports wrote. An interrupted rebuild leaves a marker
+    behind and the next export resumes it instead of wiping again. Returns False if cancelled.
+    """
     from utils.i18n import _
+    from utils.helpers import open_folder
+    from core.exporter import (plan_export, ExportEngine, ExportCancelled, LinkTransfer, remove_stale,
+                               save_manifest, load_manifest, adopt_existing_files, IN_PROGRESS_MARKER,
+                               EXPORT_MODE_LINK)
     log_func(_('export_start'))
-    export_path = config['export_path']
+    export_path = config.get('export_target') or config['export_path']
     library_path = config['library_path']
-    
-    if os.path.exists(export_path):
-        shutil.rmtree(export_path)
-        time.sleep(0.5)
-    os.makedirs(export_path)
+    sync = config.get('export_sync', True)
     
     if not selected_playlists:
         log_func(_('no_pl_selected'))
-        return
+        return True
 
-    search_pattern = os.path.join(library_path, "**", "*")
-    all_files = glob.glob(search_pattern, recursive=True)
-    audio_files_cache = [f for f in all_files if f.lower().endswith(('.mp3', '.m4a', '.flac', '.wav', '.webm'))]
+    marker = os.path.join(export_path, IN_PROGRESS_MARKER)
+    if sync:
+        os.makedirs(export_path, exist_ok=True)
+        if not config.get('export_target'):
+            # The default folder from a pre-manifest export is entirely ours: let the
+            # stale-file pass below treat all of it as previously exported
+            adopt_existing_files(export_path)
+    elif os.path.exists(marker):
+        log_func(_('export_resume'))
+    else:
+        if not config.get('export_target'):
+            if os.path.exists(export_path):
+                shutil.rmtree(export_path)
+        elif os.path.isdir(export_path):
+            # A custom target may be a drive root holding unrelated files: only undo our own exports
+            remove_stale(export_path, [])
+            save_manifest(export_path, [])
+        os.makedirs(export_path, exist_ok=True)
+        with open(marker, 'w') as f:
+            f.write(str(time.time()))
 
-    for pl_file in selected_playlists:
-        if not os.path.exists(pl_file): continue
-        
-        pl_name = os.path.splitext(os.path.basename(pl_file))[0]
-        dest_folder = os.path.join(export_path, pl_name)
-        if not os.path.exists(dest_folder):
-            os.makedirs(dest_folder)
-            
-        songs = parse_playlist(pl_file)
+    library_index = load_library_index(library_path)
+    tasks, summary = plan_export(selected_playlists, library_index, export_path)
+    for pl_name, found, total in summary:
         log_func(_('exporting_pl', pl_name))
-        
-        count = 0
-        for song_name in songs:
-            src = find_song_in_library(song_name, audio_files_cache)
-            if src and os.path.exists(src):
-                try:
-                    shutil.copy2(src, dest_folder)
-                    count += 1
-                except Exception as e:
-                    log_func(_('copy_error', e))
-        
-        log_func(_('exported_count', count, len(songs)))
+        log_func(_('exported_count', found, total))
+
+    def report(done, total, speed):
+        log_func(_('export_progress', done / (1024 * 1024), total / (1024 * 1024), speed / (1024 * 1024)))
+        if progress_func:
+            # MB granularity keeps the values readable for the progress label
+            progress_func(done // (1024 * 1024), max(1, total // (1024 * 1024)))
+
+    planned = [os.path.relpath(task.dst, export_path) for task in tasks]
+    if sync:
+        # Drop what the previous export wrote but is no longer selected, before copying frees the space
+        removed = remove_stale(export_path, planned)
+        if removed:
+            log_func(_('export_removed', removed))
+        save_manifest(export_path, planned)
+    else:
+        save_manifest(export_path, load_manifest(export_path) | set(planned))
+
+    engine = ExportEngine(max_workers=config.get('export_workers', 4), stop_event=stop_event,
+                          progress_func=report, progress_interval=2.0,
+                          verify_hash=config.get('export_verify_hash', False))
+    # Link mode: same-volume exports become reflinks/hardlinks, other volumes fall back to copying
+    transfer = None
+    if config.get('export_mode', 'copy') == EXPORT_MODE_LINK:
+        transfer = LinkTransfer(stop_event, engine.add_bytes)
+    try:
+        copied, skipped, errors = engine.run(tasks, transfer)
+    except ExportCancelled:
+        log_func(_('export_cancelled'))
+        return False
+
+    for task, e in errors:
+        log_func(_('copy_error', f"{os.path.basename(task.src)}: {e}"))
+    if not errors and not sync:
+        try:
+            os.remove(marker)
+        except OSError:
+            pass
+    if skipped:
+        log_func(_('export_skipped', skipped))
+    if transfer:
+        log_func(_('export_link_stats', transfer.counts['reflink'], transfer.counts['hardlink'], transfer.counts['copy']))
         
     log_func(_('export_done_open'))
     abs_export_path = os.path.abspath(export_path)
-    if os.path.exists(abs_export_path):
-        os.startfile(abs_export_path)
-    else:
+    if not (os.path.exists(abs_export_path) and open_folder(abs_export_path)):
         log_func(_('open_dir_error', abs_export_path))
+    return True
+
+def find_library_duplicates(config, log_func, stop_event=None):
+    """Scans the library for byte-identical files and logs what a merge would do.
+    Returns the merge plan [(keeper, [duplicates])], empty if there is nothing to merge."""
+    from utils.i18n import _
+    from core.dedup import find_duplicates, plan_merge
+    from core.library_db import scan_library
+    log_func(_('dedup_start'))
+    entries = scan_library(config['library_path'])
+    groups = find_duplicates([e.path for e in entries], config.get('dedup_workers', 4), stop_event)
+    if stop_event and stop_event.is_set():
+        return []
+    plan = plan_merge(groups, config['playlists_path'])
+    if config.get('fingerprint_enabled', False):
+        find_same_recordings(config, entries, log_func, groups, stop_event)
+    if not plan:
+        log_func(_('dedup_none'))
+        return []
+
+    wasted = 0
+    for keeper, duplicates in plan:
+        log_func(_('dedup_group', os.path.basename(keeper), ", ".join(os.path.basename(d) for d in duplicates)))
+        for dup in duplicates:
+            try:
+                wasted += os.path.getsize(dup)
+            except OSError:
+                pass
+    log_func(_('dedup_found', sum(len(d) for _k, d in plan), wasted / (1024 * 1024)))
+    return plan
+
+def find_same_recordings(config, entries, log_func, identical_groups=(), stop_event=None):
+    """Fingerprints new or changed library files and logs pairs that are the same recording
+    under different names or encodings. Byte-identical pairs (identical_groups) are left
+    to the content-hash merge. Returns [(path_a, path_b, score)]."""
+    from utils.i18n import _
+    from core.fingerprint import update_fingerprints, load_fingerprint_index, BATCH_SIZE, DEFAULT_THRESHOLD
+    library_path = config['library_path']
+    log_func(_('fingerprint_start'))
+
+    def progress(done, total):
+        if done == total or done % (BATCH_SIZE * 8) == 0:
+            log_func(_('fingerprint_progress', done, total))
+
+    processed = update_fingerprints(library_path, entries, config.get('fingerprint_workers') or None, stop_event, progress)
+    if processed is None:
+        log_func(_('fingerprint_unavailable'))
+        return []
+    if stop_event and stop_event.is_set():
+        return []
+
+    group_of = {path: i for i, group in enumerate(identical_groups) for path in group}
+    pairs = []
+    index = load_fingerprint_index(library_path)
+    for a, b, score in index.near_duplicates(config.get('fingerprint_threshold', DEFAULT_THRESHOLD)):
+        if a in group_of and group_of.get(b) == group_of[a]:
+            continue
+        pairs.append((a, b, score))
+        log_func(_('fingerprint_match', os.path.basename(a), os.path.basename(b), score))
+    if not pairs:
+        log_func(_('fingerprint_none'))
+    return pairs
+
+def merge_library_duplicates(config, plan, log_func):
+    """Removes the duplicates of a find_library_duplicates plan and repoints playlists at the kept copies"""
+    from utils.i18n import _
+    from core.dedup import merge_duplicates
+    from core.library_db import add_aliases
+    removed, freed, rewritten, aliases = merge_duplicates(plan, config['playlists_path'])
+    if aliases:
+        add_aliases(config['library_path'], aliases)
+    log_func(_('dedup_merged', removed, freed / (1024 * 1024), rewritten))
+    return removed
 
 def get_detailed_stats(config, audio_files=None):
     """
@@ -834,114 +1185,9 @@ def get_detailed_stats(config, audio_files=None):
     - unique_playlist_entries: count of unique song names across all playlists
     - potential_size_gb: what the size would be if duplicates were real files
     - savings_mb: space saved due to deduplication
+
+    The numbers come from core.stats running aggregates: only library files and
+    playlists that changed since the previous call are looked at.
     """
-    library_path = config['library_path']
-    playlists_path = config['playlists_path']
-    
-    # 1. Library Stats
-    if audio_files is None:
-        search_pattern = os.path.join(library_path, "**", "*")
-        all_files = [f for f in glob.glob(search_pattern, recursive=True) if os.path.isfile(f)]
-        audio_files = [f for f in all_files if f.lower().endswith(('.mp3', '.m4a', '.flac', '.wav', '.webm'))]
-    
-    total_songs = len(audio_files)
-    total_size_bytes = 0
-    for f in audio_files:
-        try:
-            if os.path.exists(f):
-                total_size_bytes += os.path.getsize(f)
-        except (OSError, IOError):
-            # Skip files that can't be accessed (deleted, moved, etc.)
-            continue
-    total_size_mb = total_size_bytes / (1024 * 1024)
-    
-    # Recently added (by mtime)
-    # Filter out files that don't exist before sorting
-    existing_audio_files = [f for f in audio_files if os.path.exists(f)]
-    
-    def safe_getmtime(filepath):
-        try:
-            return os.path.getmtime(filepath)
-        except (OSError, IOError):
-            return 0
-    
-    audio_files_sorted = sorted(existing_audio_files, key=safe_getmtime, reverse=True)
-    recent_5 = []
-    for f in audio_files_sorted[:5]:
-        try:
-            mtime = os.path.getmtime(f)
-            import datetime
-            date_str = datetime.datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')
-            recent_5.append((os.path.basename(f), date_str))
-        except (OSError, IOError):
-            # Skip files that can't be accessed
-            continue
-        
-    # 2. Duplicate/Savings Stats
-    pl_files = glob.glob(os.path.join(playlists_path, "*.m3u8")) + \
-               glob.glob(os.path.join(playlists_path, "*.m3u")) + \
-               glob.glob(os.path.join(playlists_path, "*.txt"))
-    
-    all_pl_songs = []
-    unique_pl_songs = set()
-    for pl_file in pl_files:
-        songs = parse_playlist(pl_file)
-        all_pl_songs.extend(songs)
-        for s in songs: unique_pl_songs.add(s)
-    
-    total_playlist_entries = len(all_pl_songs)
-    unique_playlist_entries = len(unique_pl_songs)
-    
-    # Calculate actual savings by summing sizes of duplicate songs
-    duplicates_count = total_playlist_entries - unique_playlist_entries
-    
-    # Build song name to file path mapping for accurate size calculation
-    song_to_files = {}
-    for file_path in audio_files:
-        if os.path.exists(file_path):
-            filename = os.path.basename(file_path)
-            name_no_ext = os.path.splitext(filename)[0]
-            tokens_tuple = tuple(get_normalized_tokens(name_no_ext))
-            if tokens_tuple:
-                if tokens_tuple not in song_to_files:
-                    song_to_files[tokens_tuple] = []
-                song_to_files[tokens_tuple].append(file_path)
-    
-    # Count song occurrences in playlists
-    song_occurrences = {}
-    for pl_file in pl_files:
-        songs = parse_playlist(pl_file)
-        for song_name in songs:
-            query_tokens = tuple(get_normalized_tokens(song_name))
-            if query_tokens:
-                if query_tokens not in song_occurrences:
-                    song_occurrences[query_tokens] = 0
-                song_occurrences[query_tokens] += 1
-    
-    # Calculate actual savings: for each song that appears multiple times, 
-    # add (occurrences - 1) * file_size
-    actual_savings_bytes = 0
-    for tokens_tuple, occurrences in song_occurrences.items():
-        if occurrences > 1 and tokens_tuple in song_to_files:
-            # Find the first existing file for this song
-            for file_path in song_to_files[tokens_tuple]:
-                if os.path.exists(file_path):
-                    try:
-                        file_size = os.path.getsize(file_path)
-                        # Add file size for each duplicate occurrence (occurrences - 1)
-                        actual_savings_bytes += (occurrences - 1) * file_size
-                        break  # Only use the first file found
-                    except (OSError, IOError):
-                        continue
-    
-    savings_mb = actual_savings_bytes / (1024 * 1024)
-    
-    return {
-        'total_songs': total_songs,
-        'total_size_mb': total_size_mb,
-        'recent_5': recent_5,
-        'total_playlist_entries': total_playlist_entries,
-        'unique_playlist_entries': unique_playlist_entries,
-        'duplicates_count': duplicates_count,
-        'savings_mb': savings_mb
-    }
+    from core.stats import refresh_stats
+    return refresh_stats(config['library_path'], config['playlists_path'], audio_files)
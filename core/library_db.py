@@ -0,0 +1,273 @@
+import os
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+from utils.config import CONFIG_DIR
+
+# Persistent library index: caches the directory tree, file stats and normalized
+# name tokens so a refresh only has to look at directories that actually changed.
+DB_FILE = os.path.join(CONFIG_DIR, 'library_index.db')
+
+# A directory whose mtime is this close to "now" may still be changing within the
+# same timestamp tick, so it is never trusted on the next scan (same idea as git's racy-clean check).
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
+LibraryEntry = namedtuple('LibraryEntry', ['path', 'size', 'mtime', 'tokens'])
+
+_scan_lock = threading.Lock()
+
+def _connect():
+    os.makedirs(os.path.dirname(DB_FILE) or '.', exist_ok=True)
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS dirs (
+            root TEXT NOT NULL,
+            rel_dir TEXT NOT NULL,
+            parent TEXT,
+            mtime_ns INTEGER NOT NULL,
+            PRIMARY KEY (root, rel_dir)
+        );
+        CREATE TABLE IF NOT EXISTS files (
+            root TEXT NOT NULL,
+            rel_dir TEXT NOT NULL,
+            name TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            tokens TEXT NOT NULL,
+            PRIMARY KEY (root, rel_dir, name)
+        );
+        CREATE TABLE IF NOT EXISTS aliases (
+            root TEXT NOT NULL,
+            name TEXT NOT NULL,
+            target TEXT NOT NULL,
+            PRIMARY KEY (root, name)
+        );
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            root TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            method TEXT,
+            duration REAL,
+            fp BLOB,
+            PRIMARY KEY (root, path)
+        );
+    """)
+    return conn
+
+def _check_token_version(conn):
+    """Drops cached tokens if the normalization rules changed since they were stored"""
+    from core.library import TOKENIZER_VERSION
+    row = conn.execute("SELECT value FROM meta WHERE key = 'token_version'").fetchone()
+    if row is None or row[0] != str(TOKENIZER_VERSION):
+        conn.execute("DELETE FROM files")
+        conn.execute("DELETE FROM dirs")
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('token_version', ?)", (str(TOKENIZER_VERSION),))
+
+def _encode_tokens(tokens):
+    return '\x1f'.join(tokens)
+
+def _decode_tokens(text):
+    return tuple(text.split('\x1f')) if text else ()
+
+def _root_key(library_path):
+    return os.path.normcase(os.path.normpath(os.path.abspath(library_path)))
+
+def add_aliases(library_path, aliases):
+    """Remembers that song names resolve to another library file ({name: target_path}),
+    e.g. after a duplicate was merged into the copy that was kept"""
+    root = _root_key(library_path)
+    rows = [(root, name, os.path.relpath(target, library_path)) for name, target in aliases.items()]
+    with _scan_lock:
+        conn = _connect()
+        try:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO aliases (root, name, target) VALUES (?, ?, ?)", rows)
+        finally:
+            conn.close()
+
+def get_aliases(library_path):
+    """Returns {song_name: target_path} for library_path"""
+    rows = _query(library_path, "SELECT name, target FROM aliases WHERE root = ?")
+    return {name: os.path.join(library_path, target) for name, target in rows}
+
+def _query(library_path, sql, params=()):
+    with _scan_lock:
+        conn = _connect()
+        try:
+            return conn.execute(sql, (_root_key(library_path),) + tuple(params)).fetchall()
+        finally:
+            conn.close()
+
+def get_fingerprint_stats(library_path):
+    """Returns {path: (size, mtime_ns)} of the files whose fingerprint was computed (or attempted)"""
+    rows = _query(library_path, "SELECT path, size, mtime_ns FROM fingerprints WHERE root = ?")
+    return {os.path.join(library_path, rel): (size, mtime_ns) for rel, size, mtime_ns in rows}
+
+def get_fingerprints(library_path):
+    """Returns [(path, method, duration, fp_bytes)] for every successfully fingerprinted file"""
+    rows = _query(library_path, "SELECT path, method, duration, fp FROM fingerprints WHERE root = ? AND method IS NOT NULL")
+    return [(os.path.join(library_path, rel), method, duration, fp) for rel, method, duration, fp in rows]
+
+def store_fingerprints(library_path, rows):
+    """Stores [(path, size, mtime_ns, method, duration, fp_bytes)]; method None marks an undecodable file"""
+    root = _root_key(library_path)
+    with _scan_lock:
+        conn = _connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO fingerprints (root, path, size, mtime_ns, method, duration, fp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(root, os.path.relpath(path, library_path), size, mtime_ns, method, duration, fp)
+                     for path, size, mtime_ns, method, duration, fp in rows])
+        finally:
+            conn.close()
+
+def prune_fingerprints(library_path, keep_paths):
+    """Drops fingerprints of files that are no longer in the library"""
+    keep = {os.path.relpath(p, library_path) for p in keep_paths}
+    stale = [(rel,) for (rel,) in _query(library_path, "SELECT path FROM fingerprints WHERE root = ?") if rel not in keep]
+    if not stale:
+        return
+    root = _root_key(library_path)
+    with _scan_lock:
+        conn = _connect()
+        try:
+            with conn:
+                conn.executemany("DELETE FROM fingerprints WHERE root = ? AND path = ?", [(root, rel) for (rel,) in stale])
+        finally:
+            conn.close()
+
+def scan_library(library_path, extensions=None):
+    """Returns a LibraryEntry for every audio file under library_path.
+
+    Directories whose mtime is unchanged since the last scan are not re-listed: their
+    cached listing and tokens are reused and only each file is stat()ed. Changed
+    directories are re-listed and only new or renamed files are re-tokenized. Paths are built from library_path exactly like
+    glob.glob(os.path.join(library_path, '**', '*'), recursive=True) would.
+    """
+    from core.library import AUDIO_EXTENSIONS, get_normalized_tokens
+    if extensions is None:
+        extensions = AUDIO_EXTENSIONS
+    if not library_path or not os.path.isdir(library_path):
+        return []
+
+    root = _root_key(library_path)
+    racy_limit = time.time_ns() - RACY_WINDOW_NS
+
+    with _scan_lock:
+        conn = _connect()
+        try:
+            with conn:
+                _check_token_version(conn)
+
+                stored_dirs = {}
+                stored_children = {}
+                for rel_dir, parent, mtime_ns in conn.execute(
+                        "SELECT rel_dir, parent, mtime_ns FROM dirs WHERE root = ?", (root,)):
+                    stored_dirs[rel_dir] = mtime_ns
+                    if parent is not None:
+                        stored_children.setdefault(parent, []).append(rel_dir)
+
+                stored_files = {}
+                for rel_dir, name, size, mtime_ns, tokens in conn.execute(
+                        "SELECT rel_dir, name, size, mtime_ns, tokens FROM files WHERE root = ?", (root,)):
+                    stored_files.setdefault(rel_dir, {})[name] = (size, mtime_ns, tokens)
+
+                seen_dirs = {}
+                changed_dirs = {}  # rel_dir -> {name: (size, mtime_ns, tokens)}
+                entries = []
+                stack = [('', None)]
+
+                while stack:
+                    rel_dir, parent = stack.pop()
+                    abs_dir = os.path.join(library_path, rel_dir) if rel_dir else library_path
+                    try:
+                        dir_mtime = os.stat(abs_dir).st_mtime_ns
+                    except OSError:
+                        continue
+
+                    trusted_mtime = dir_mtime if dir_mtime < racy_limit else -1
+                    seen_dirs[rel_dir] = (parent, trusted_mtime)
+
+                    if stored_dirs.get(rel_dir) == dir_mtime:
+                        # Unchanged directory: reuse the cached listing, subdirectories and tokens,
+                        # but stat every file, since rewriting a file in place (tag edits, a
+                        # re-download under the same name) does not touch the directory mtime
+                        files = {}
+                        modified = False
+                        for name, (size, mtime_ns, tokens) in stored_files.get(rel_dir, {}).items():
+                            try:
+                                st = os.stat(os.path.join(abs_dir, name))
+                            except OSError:
+                                modified = True
+                                continue
+                            if st.st_size != size or st.st_mtime_ns != mtime_ns:
+                                modified = True
+                            files[name] = (st.st_size, st.st_mtime_ns, tokens)
+                        if modified:
+                            changed_dirs[rel_dir] = files
+                        for sub in stored_children.get(rel_dir, []):
+                            stack.append((sub, rel_dir))
+                    else:
+                        old_files = stored_files.get(rel_dir, {})
+                        files = {}
+                        try:
+                            with os.scandir(abs_dir) as it:
+                                for entry in it:
+                                    # glob's '**/*' skips hidden entries, keep the same semantics
+                                    if entry.name.startswith('.'):
+                                        continue
+                                    try:
+                                        if entry.is_dir():
+                                            sub = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                                            stack.append((sub, rel_dir))
+                                            continue
+                                        if not entry.name.lower().endswith(extensions):
+                                            continue
+                                        st = entry.stat()
+                                    except OSError:
+                                        continue
+
+                                    prev = old_files.get(entry.name)
+                                    if prev and prev[0] == st.st_size and prev[1] == st.st_mtime_ns:
+                                        tokens = prev[2]
+                                    else:
+                                        name_no_ext = os.path.splitext(entry.name)[0]
+                                        tokens = _encode_tokens(get_normalized_tokens(name_no_ext))
+                                    files[entry.name] = (st.st_size, st.st_mtime_ns, tokens)
+                        except OSError:
+                            continue
+                        changed_dirs[rel_dir] = files
+
+                    for name, (size, mtime_ns, tokens) in files.items():
+                        path = os.path.join(library_path, rel_dir, name) if rel_dir else os.path.join(library_path, name)
+                        entries.append(LibraryEntry(path, size, mtime_ns / 1e9, _decode_tokens(tokens)))
+
+                # Persist only what changed
+                removed_dirs = [d for d in stored_dirs if d not in seen_dirs]
+                for rel_dir in removed_dirs:
+                    conn.execute("DELETE FROM dirs WHERE root = ? AND rel_dir = ?", (root, rel_dir))
+                    conn.execute("DELETE FROM files WHERE root = ? AND rel_dir = ?", (root, rel_dir))
+
+                for rel_dir, (parent, mtime_ns) in seen_dirs.items():
+                    if stored_dirs.get(rel_dir) != mtime_ns or rel_dir in changed_dirs:
+                        conn.execute("INSERT OR REPLACE INTO dirs (root, rel_dir, parent, mtime_ns) VALUES (?, ?, ?, ?)",
+                                     (root, rel_dir, parent, mtime_ns))
+
+                for rel_dir, files in changed_dirs.items():
+                    conn.execute("DELETE FROM files WHERE root = ? AND rel_dir = ?", (root, rel_dir))
+                    conn.executemany(
+                        "INSERT INTO files (root, rel_dir, name, size, mtime_ns, tokens) VALUES (?, ?, ?, ?, ?, ?)",
+                        [(root, rel_dir, name, size, mtime_ns, tokens) for name, (size, mtime_ns, tokens) in files.items()])
+        finally:
+            conn.close()
+
+    return entries
@@ -0,0 +1,271 @@
+import os
+import re
+import time
+import random
+import asyncio
+import threading
+import requests
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from zhconv import convert
+
+# Overridable through config 'lrclib_base_url' (e.g. a mirror or a local stub)
+DEFAULT_LRCLIB_BASE = 'https://lrclib.net'
+LRCLIB_BASE = DEFAULT_LRCLIB_BASE
+LRCLIB_HEADERS = {'User-Agent': 'PlaylistAdministrator/2.0'}
+
+# Suffixes that confuse the lyrics search (video tags, bracketed notes...)
+_SUFFIX_RES = [re.compile(p, re.IGNORECASE) for p in (
+    r'\s*\(.*?\)', r'\s*\[.*?\]', r'\s*【.*?】',
+    r'\s*-?\s*Official\s*Video', r'\s*-?\s*Music\s*Video',
+    r'\s*-?\s*TV\s*Version', r'\s*-?\s*MV', r'\s*-?\s*Lyrics',
+    r'\s*-?\s*HD', r'\s*-?\s*4K'
+)]
+
+MAX_RETRIES = 3
+
+# text is the raw lrclib payload; source is 'get' or 'search', query the search text that hit
+LyricsResult = namedtuple('LyricsResult', ['text', 'error', 'source', 'query'])
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Returns the shared keep-alive session used for all lrclib requests"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            session.headers.update(LRCLIB_HEADERS)
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=32)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+def configure(config):
+    """Applies lyrics-related config values"""
+    global LRCLIB_BASE
+    LRCLIB_BASE = (config.get('lrclib_base_url') or DEFAULT_LRCLIB_BASE).rstrip('/')
+
+def read_track_info(song_name, audio_path=None):
+    """Artist/title/album/duration for the exact lrclib lookup, or None if it cannot be made.
+
+    Tags and duration come from the audio file when it is readable; otherwise
+    artist and title are taken from the "Artist - Title" song name. lrclib's get
+    endpoint matches on duration, so without a readable file there is no lookup.
+    """
+    info = {'artist': None, 'title': None, 'album': None, 'duration': None}
+    if audio_path and os.path.exists(audio_path):
+        try:
+            import mutagen
+            audio = mutagen.File(audio_path, easy=True)
+            if audio is not None:
+                tags = audio.tags or {}
+                for key, tag in (('artist', 'artist'), ('title', 'title'), ('album', 'album')):
+                    values = tags.get(tag) if hasattr(tags, 'get') else None
+                    if values:
+                        info[key] = values[0] if isinstance(values, list) else str(values)
+                if audio.info and getattr(audio.info, 'length', None):
+                    info['duration'] = int(round(audio.info.length))
+        except Exception:
+            pass
+
+    if not (info['artist'] and info['title']) and ' - ' in song_name:
+        artist, title = song_name.split(' - ', 1)
+        info['artist'] = info['artist'] or artist.strip()
+        info['title'] = info['title'] or title.strip()
+
+    if not (info['artist'] and info['title'] and info['duration']):
+        return None
+    return info
+
+def get_lyrics(info, timeout=10):
+    """Exact lrclib lookup by artist/title/duration (album when known).
+
+    Returns None on a miss and on any failure (timeout, 5xx, bad payload): search
+    is the fallback either way, so an unreliable get never costs the song its lyrics.
+    """
+    params = {'artist_name': info['artist'], 'track_name': info['title'], 'duration': info['duration']}
+    if info.get('album'):
+        params['album_name'] = info['album']
+    try:
+        resp = get_session().get(f"{LRCLIB_BASE}/api/get", params=params, timeout=timeout)
+        if resp.status_code != 200:
+            return None
+        data = resp.json()
+    except (requests.RequestException, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    return data.get('syncedLyrics') or data.get('plainLyrics')
+
+def build_queries(song_name):
+    """Search queries to try for a song, most specific first"""
+    clean_query = song_name
+    for pattern in _SUFFIX_RES:
+        clean_query = pattern.sub('', clean_query)
+    clean_query = clean_query.strip()
+
+    # Splitting by ' - ' and searching for parts caused incorrect matches
+    # (searching for the title only can return a completely different song)
+    queries = [clean_query]
+    alt_query = re.sub(r'[^\w\s]', ' ', clean_query)
+    alt_query = re.sub(r'\s+', ' ', alt_query).strip()
+    if alt_query and alt_query != clean_query:
+        queries.append(alt_query)
+    return queries
+
+def pick_lyrics(data):
+    """Best lyrics text in an lrclib search response: synced lyrics first, plain as a fallback"""
+    if not isinstance(data, list):
+        return None
+    best_match = None
+    for track in data:
+        if track.get('syncedLyrics'):
+            return track['syncedLyrics']
+        if not best_match and track.get('plainLyrics'):
+            best_match = track['plainLyrics']
+    return best_match
+
+def search_lyrics(query, timeout=10):
+    """One blocking lrclib search request over the shared session"""
+    resp = get_session().get(f"{LRCLIB_BASE}/api/search", params={'q': query}, timeout=timeout)
+    resp.raise_for_status()
+    return pick_lyrics(resp.json())
+
+def is_network_error(e):
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    status = getattr(getattr(e, 'response', None), 'status_code', None)
+    if status == 429 or (status and status >= 500):
+        return True
+    error_msg = str(e).lower()
+    return any(k in error_msg for k in ['timeout', 'timed out', 'reset', 'aborted', 'eof', 'ssl'])
+
+def save_lrc(lrc_text, output_path, converted=False):
+    """Writes lyrics converted to Traditional Chinese and returns the written text"""
+    if not converted:
+        lrc_text = convert(lrc_text, 'zh-tw')
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(lrc_text)
+    return lrc_text
+
+class ThreadedLyricsFetcher:
+    """Backfills lyrics for many songs, scheduled from one asyncio loop.
+
+    The HTTP calls themselves are the blocking `requests` helpers (search_lyrics,
+    get_lyrics) run through asyncio.to_thread on a pool of `concurrency` threads
+    sharing one pooled session, so concurrency is bounded by that thread pool, not
+    by the event loop. The loop only does the scheduling: `rate_per_second` spaces
+    request starts globally, so lrclib sees a steady stream instead of bursts,
+    backoff waits are asyncio sleeps that do not hold a thread, and setting
+    stop_event cancels everything still pending.
+    """
+    def __init__(self, concurrency=8, rate_per_second=5.0, stop_event=None, pause_event=None):
+        self.concurrency = max(1, int(concurrency))
+        self.interval = 1.0 / max(0.1, float(rate_per_second))
+        self.stop_event = stop_event
+        self.pause_event = pause_event
+        self.requests_made = 0
+        self.exact_hits = 0
+
+    def is_stopped(self):
+        return bool(self.stop_event and self.stop_event.is_set())
+
+    async def _throttle(self):
+        # Reserve the next start slot under the lock, then sleep outside it
+        async with self._rate_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + self.interval
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    async def _wait_if_paused(self):
+        while self.pause_event and not self.pause_event.is_set():
+            if self.is_stopped():
+                return
+            await asyncio.sleep(0.5)
+
+    async def _request(self, query, timeout):
+        async with self._semaphore:
+            await self._throttle()
+            self.requests_made += 1
+            return await asyncio.to_thread(search_lyrics, query, timeout)
+
+    async def _request_get(self, info, timeout):
+        async with self._semaphore:
+            await self._throttle()
+            self.requests_made += 1
+            return await asyncio.to_thread(get_lyrics, info, timeout)
+
+    async def fetch(self, song_name, audio_path=None):
+        """Returns a LyricsResult for one song.
+        Tries the exact artist/title/duration lookup first and falls back to search on a miss."""
+        info = await asyncio.to_thread(read_track_info, song_name, audio_path)
+        queries = build_queries(song_name)
+        last_error = None
+        for attempt in range(MAX_RETRIES):
+            if attempt > 0:
+                await asyncio.sleep((2 ** attempt) + random.uniform(1, 3))
+            await self._wait_if_paused()
+            try:
+                if info:
+                    lrc_text = await self._request_get(info, timeout=10 + attempt * 5)
+                    if lrc_text:
+                        self.exact_hits += 1
+                        return LyricsResult(lrc_text, None, 'get', None)
+                    # Missed or failed: search from here on, also on network retries
+                    info = None
+                for query in queries:
+                    lrc_text = await self._request(query, timeout=10 + attempt * 5)
+                    if lrc_text:
+                        return LyricsResult(lrc_text, None, 'search', query)
+                return LyricsResult(None, None, None, queries[0])
+            except Exception as e:
+                if not is_network_error(e):
+                    return LyricsResult(None, e, None, queries[0])
+                last_error = e
+        return LyricsResult(None, last_error, None, queries[0])
+
+    async def _watch_stop(self, tasks):
+        while not all(t.done() for t in tasks):
+            if self.is_stopped():
+                for t in tasks:
+                    t.cancel()
+                return
+            await asyncio.sleep(0.2)
+
+    async def _run(self, items, on_result):
+        # asyncio.to_thread runs on the loop's default executor
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='lyrics'))
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._rate_lock = asyncio.Lock()
+        self._next_start = time.monotonic()
+
+        async def one(item):
+            key, song_name, output_path, audio_path = item
+            result = await self.fetch(song_name, audio_path)
+            if result.text:
+                result = result._replace(text=await asyncio.to_thread(save_lrc, result.text, output_path))
+            # Callbacks run on the loop thread, one at a time
+            if on_result(key, song_name, output_path, result) is False:
+                for t in tasks:
+                    t.cancel()
+
+        tasks = [asyncio.ensure_future(one(item)) for item in items]
+        watcher = asyncio.ensure_future(self._watch_stop(tasks))
+        await asyncio.gather(*tasks, return_exceptions=True)
+        watcher.cancel()
+
+    def run(self, items, on_result):
+        """Fetches lyrics for items [(key, song_name, lrc_path, audio_path_or_None), ...].
+
+        on_result(key, song_name, lrc_path, LyricsResult) is called as each song completes,
+        with the text already converted and saved; returning False aborts the remaining songs.
+        """
+        if items:
+            asyncio.run(self._run(list(items), on_result))
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from utils.config import CONFIG_DIR
+
+# Every lyrics lookup result, keyed by normalized song name (see store_key): the LRC text for
+# hits (so .lrc files can be regenerated without refetching) and timestamped misses, which
+# expire after a TTL.
+DB_FILE = os.path.join(CONFIG_DIR, 'lyrics.db')
+
+STATUS_FOUND = 'found'
+STATUS_NOT_FOUND = 'not_found'
+STATUS_ERROR = 'error'
+
+# Network errors say little about whether lyrics exist, so they are retried sooner than clean misses
+ERROR_TTL_SECONDS = 24 * 3600
+
+_db_lock = threading.Lock()
+
+def store_key(name):
+    """Key under which a song is stored: its normalized name tokens, so the playlist name a
+    download is recorded under and the sanitized file stem it is later looked up by agree"""
+    from core.library import get_normalized_tokens
+    return ' '.join(get_normalized_tokens(name)) or str(name)
+
+def _connect():
+    os.makedirs(os.path.dirname(DB_FILE) or '.', exist_ok=True)
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS lyrics (
+            name TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            lrc TEXT,
+            source TEXT,
+            query TEXT,
+            fetched_at REAL,
+            checked_at REAL NOT NULL
+        )
+    """)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+        # Rows written before store_key existed are keyed by the raw song name
+        with conn:
+            for name, in conn.execute("SELECT name FROM lyrics").fetchall():
+                key = store_key(name)
+                if key != name:
+                    conn.execute("UPDATE OR IGNORE lyrics SET name = ? WHERE name = ?", (key, name))
+                    conn.execute("DELETE FROM lyrics WHERE name = ?", (name,))
+            conn.execute("PRAGMA user_version = 1")
+    return conn
+
+def _execute(sql, params=()):
+    with _db_lock:
+        conn = _connect()
+        try:
+            with conn:
+                return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+def store_found(name, lrc_text, source, query=None):
+    """Remembers fetched lyrics (already converted to Traditional Chinese)"""
+    now = time.time()
+    _execute("INSERT OR REPLACE INTO lyrics (name, status, lrc, source, query, fetched_at, checked_at) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?)", (store_key(name), STATUS_FOUND, lrc_text, source, query, now, now))
+
+def store_miss(name, status=STATUS_NOT_FOUND, query=None, checked_at=None):
+    """Remembers a failed lookup; it is retried once its TTL has passed"""
+    _execute("INSERT OR REPLACE INTO lyrics (name, status, lrc, source, query, fetched_at, checked_at) "
+             "VALUES (?, ?, NULL, NULL, ?, NULL, ?)", (store_key(name), status, query, checked_at or time.time()))
+
+def get_entries(names):
+    """Returns {name: (status, lrc, checked_at)} for the names present in the store"""
+    by_key = {}
+    for name in names:
+        by_key.setdefault(store_key(name), []).append(name)
+    keys = list(by_key)
+    result = {}
+    with _db_lock:
+        conn = _connect()
+        try:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT name, status, lrc, checked_at FROM lyrics WHERE name IN ({','.join('?' * len(chunk))})",
+                    chunk).fetchall()
+                for key, status, lrc, checked_at in rows:
+                    for name in by_key.get(key, ()):
+                        result[name] = (status, lrc, checked_at)
+        finally:
+            conn.close()
+    return result
+
+def is_miss_fresh(status, checked_at, negative_ttl_seconds, now=None):
+    """True while a remembered miss should still suppress a new lookup"""
+    now = now or time.time()
+    if status == STATUS_NOT_FOUND:
+        return now - checked_at < negative_ttl_seconds
+    if status == STATUS_ERROR:
+        return now - checked_at < min(ERROR_TTL_SECONDS, negative_ttl_seconds)
+    return False
+
+def migrate_failed_json(json_path):
+    """Imports the legacy failed_lyrics.json as misses and renames it so it is only imported once.
+    Returns the number of imported entries."""
+    if not os.path.exists(json_path):
+        return 0
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+    except (OSError, ValueError):
+        return 0
+
+    rows = []
+    for entry in legacy.values() if isinstance(legacy, dict) else []:
+        if isinstance(entry, dict) and entry.get('name'):
+            status = STATUS_ERROR if entry.get('reason') == 'error' else STATUS_NOT_FOUND
+            rows.append((store_key(entry['name']), status, entry.get('timestamp') or time.time()))
+
+    with _db_lock:
+        conn = _connect()
+        try:
+            with conn:
+                # Never overwrite newer knowledge (e.g. lyrics found since)
+                conn.executemany("INSERT OR IGNORE INTO lyrics (name, status, checked_at) VALUES (?, ?, ?)", rows)
+        finally:
+            conn.close()
+    try:
+        os.replace(json_path, json_path + '.migrated')
+    except OSError:
+        pass
+    return len(rows)
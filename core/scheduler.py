@@ -0,0 +1,125 @@
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all download workers.
+
+    Replaces the old fixed per-song sleeps: workers may start up to `capacity`
+    jobs in a burst, after which new jobs are admitted at `rate_per_minute`.
+    """
+    def __init__(self, rate_per_minute, capacity=1):
+        self.rate = max(0.01, float(rate_per_minute)) / 60.0  # tokens per second
+        self.capacity = max(1, int(capacity))
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, stop_event=None):
+        """Blocks until a token is available. Returns False if stop_event fired while waiting."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+
+            if stop_event:
+                # Event.wait returns True as soon as the event is set
+                if stop_event.wait(min(wait, 0.5)):
+                    return False
+            else:
+                time.sleep(min(wait, 0.5))
+
+class DownloadScheduler:
+    """Bounded worker pool that runs download jobs concurrently.
+
+    Every job start goes through a shared TokenBucket, and workers honour the
+    same pause_event / stop_event pair the rest of the update logic uses.
+    """
+    def __init__(self, max_workers=4, rate_per_minute=12, stop_event=None, pause_event=None, log_func=None):
+        self.max_workers = max(1, int(max_workers))
+        self.log_func = log_func
+        self.bucket = TokenBucket(rate_per_minute, capacity=self.max_workers)
+        self.stop_event = stop_event
+        self.pause_event = pause_event
+
+    def _report_error(self, item, e):
+        import traceback
+        from utils.i18n import _
+        message = _('job_error', item, e)
+        if self.log_func:
+            self.log_func(message)
+        else:
+            print(message)
+        traceback.print_exc()
+
+    def is_stopped(self):
+        return bool(self.stop_event and self.stop_event.is_set())
+
+    def wait_if_paused(self):
+        """Blocks while paused; returns False if the task was stopped meanwhile"""
+        if not self.pause_event:
+            return not self.is_stopped()
+        while not self.pause_event.wait(0.5):
+            if self.is_stopped():
+                return False
+        return not self.is_stopped()
+
+    def run(self, items, job_func, on_start=None, on_done=None):
+        """Runs job_func(index, item) for every item using the worker pool.
+
+        on_start(index, item) is called right before a job begins and
+        on_done(index, item, result) right after it finishes. Both callbacks
+        are serialized with a lock, so they may safely update shared state.
+        Exceptions from the job or a callback are logged and the worker moves on
+        to the next item (a failed job reports None to on_done).
+        Returns False if the run was interrupted by stop_event.
+        """
+        jobs = queue.Queue()
+        for i, item in enumerate(items):
+            jobs.put((i, item))
+
+        callback_lock = threading.Lock()
+
+        def worker():
+            while True:
+                if self.is_stopped():
+                    return
+                try:
+                    i, item = jobs.get_nowait()
+                except queue.Empty:
+                    return
+
+                if not self.wait_if_paused():
+                    return
+                if not self.bucket.acquire(self.stop_event):
+                    return
+
+                try:
+                    if on_start:
+                        with callback_lock:
+                            on_start(i, item)
+                    result = job_func(i, item)
+                except Exception as e:
+                    self._report_error(item, e)
+                    result = None
+                if on_done:
+                    try:
+                        with callback_lock:
+                            on_done(i, item, result)
+                    except Exception as e:
+                        self._report_error(item, e)
+
+        workers = min(self.max_workers, max(1, len(items)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(worker) for _ in range(workers)]
+        # Surface anything that still escaped a worker instead of dropping it with the future
+        for future in futures:
+            future.result()
+
+        return not self.is_stopped()
@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from utils.config import CONFIG_DIR
+
+# Persistent query -> search hits cache, so retries and re-runs after failures
+# do not have to ask YouTube the same search again.
+DB_FILE = os.path.join(CONFIG_DIR, 'search_cache.db')
+
+# Search results drift slowly (new uploads, removed videos); re-resolve after this long
+CACHE_TTL_SECONDS = 14 * 24 * 3600
+# A search that found nothing is often a transient hiccup, so it is retried much sooner
+EMPTY_TTL_SECONDS = 6 * 3600
+
+_db_lock = threading.Lock()
+_initialized = False
+
+def _connect():
+    """Opens the cache; the schema and journal mode are set up once per process"""
+    global _initialized
+    os.makedirs(os.path.dirname(DB_FILE) or '.', exist_ok=True)
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS searches (
+                query TEXT PRIMARY KEY,
+                hits TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS search_videos (
+                query TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                PRIMARY KEY (video_id, query)
+            );
+        """)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            # Caches written before search_videos existed: index their video ids once
+            with conn:
+                for query, hits in conn.execute("SELECT query, hits FROM searches").fetchall():
+                    conn.executemany("INSERT OR IGNORE INTO search_videos (query, video_id) VALUES (?, ?)",
+                                     [(query, vid) for vid in _video_ids(hits)])
+                conn.execute("PRAGMA user_version = 1")
+        _initialized = True
+    return conn
+
+def _video_ids(hits_json):
+    try:
+        return {hit['id'] for hit in json.loads(hits_json) if isinstance(hit, dict) and hit.get('id')}
+    except (ValueError, TypeError):
+        return set()
+
+def _key(query, count):
+    return f"{count}:{' '.join(query.lower().split())}"
+
+def get_cached_hits(query, count):
+    """Returns the cached list of hit dicts for query, or None if missing or expired"""
+    with _db_lock:
+        conn = _connect()
+        try:
+            row = conn.execute("SELECT hits, fetched_at FROM searches WHERE query = ?",
+                               (_key(query, count),)).fetchone()
+        finally:
+            conn.close()
+    if not row:
+        return None
+    try:
+        hits = json.loads(row[0])
+    except ValueError:
+        return None
+    ttl = CACHE_TTL_SECONDS if hits else EMPTY_TTL_SECONDS
+    if time.time() - row[1] > ttl:
+        return None
+    return hits
+
+def store_hits(query, count, hits):
+    """Stores the hit dicts ({'id', 'url', 'title', 'channel', 'duration'}) for query"""
+    key = _key(query, count)
+    hits_json = json.dumps(hits, ensure_ascii=False)
+    with _db_lock:
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO searches (query, hits, fetched_at) VALUES (?, ?, ?)",
+                             (key, hits_json, time.time()))
+                conn.execute("DELETE FROM search_videos WHERE query = ?", (key,))
+                conn.executemany("INSERT OR IGNORE INTO search_videos (query, video_id) VALUES (?, ?)",
+                                 [(key, vid) for vid in _video_ids(hits_json)])
+        finally:
+            conn.close()
+
+def forget_video(video_id):
+    """Drops every cached search that returned video_id (e.g. it turned out to be unavailable)"""
+    with _db_lock:
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM searches WHERE query IN (SELECT query FROM search_videos WHERE video_id = ?)",
+                             (video_id,))
+                conn.execute("DELETE FROM search_videos WHERE query IN "
+                             "(SELECT query FROM search_videos WHERE video_id = ?)", (video_id,))
+        finally:
+            conn.close()
@@ -1,13 +1,54 @@
 import os
 import json
+import threading
 import requests
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 from zhconv import convert
-from utils.helpers import sanitize_filename
+from utils.helpers import sanitize_filename, write_file_if_changed
 from utils.config import ensure_dirs
 
-def get_spotify_name(sp_url):
-    """Helper to fetch ONLY the name of a Spotify playlist, artist, or album from its embed page"""
+EMBED_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Concurrent embed fetches allowed per host (all embed pages live on open.spotify.com)
+PER_HOST_CONCURRENCY = 4
+
+_session = None
+_session_lock = threading.Lock()
+_host_semaphores = {}
+
+def get_session():
+    """Returns the shared keep-alive session used for all Spotify requests"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            session.headers.update(EMBED_HEADERS)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(PER_HOST_CONCURRENCY, 10))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+def _host_semaphore(url):
+    host = urlparse(url).netloc
+    with _session_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(PER_HOST_CONCURRENCY)
+        return _host_semaphores[host]
+
+def get_embed_url(sp_url):
+    """Returns (sp_id, embed_url) for a Spotify playlist/album/artist/track URL or bare playlist id"""
     sp_id = None
     is_artist = "artist/" in sp_url
     is_album = "album/" in sp_url
@@ -15,23 +56,24 @@ def get_spotify_name(sp_url):
     if is_artist:
         try:
             sp_id = sp_url.split('?')[0].split('artist/')[-1]
-        except: return None
+        except: pass
     elif is_album:
         try:
             sp_id = sp_url.split('?')[0].split('album/')[-1]
-        except: return None
+        except: pass
     elif "playlist/" in sp_url:
         try:
+            # Remove query params
             sp_id = sp_url.split('?')[0].split('playlist/')[-1]
-        except: return None
+        except: pass
     elif "track/" in sp_url:
         try:
             sp_id = sp_url.split('?')[0].split('track/')[-1]
-        except: return None
+        except: pass
     else: 
         sp_id = sp_url.strip()
     
-    if not sp_id: return None
+    if not sp_id: return None, None
     
     if is_artist:
         type_path = "artist"
@@ -42,33 +84,109 @@ def get_spotify_name(sp_url):
     else:
         type_path = "playlist"
     
-    embed_url = f"https://open.spotify.com/embed/{type_path}/{sp_id}"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept-Language': 'zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
+    return sp_id, f"https://open.spotify.com/embed/{type_path}/{sp_id}"
+
+def fetch_embed_response(embed_url, timeout=10):
+    """Fetches an embed page over the shared session, honouring the per-host concurrency limit.
+    Goes through the on-disk HTTP cache, so unchanged pages are revalidated with ETag /
+    Last-Modified and flagged as unchanged (the hash covers the __NEXT_DATA__ payload),
+    which lets scrape_via_spotify_embed reuse the track list parsed from it last time."""
+    from core.http_cache import fetch_cached
+    with _host_semaphore(embed_url):
+        return fetch_cached(get_session(), embed_url, timeout=timeout, hash_source=find_next_data)
+
+def fetch_embed_page(embed_url, timeout=10):
+    """Returns the raw response bytes; decoding is left to whichever parser needs it"""
+    return fetch_embed_response(embed_url, timeout).content
+
+_NEXT_DATA_MARKERS = (b'id="__NEXT_DATA__"', b"id='__NEXT_DATA__'", b'id=__NEXT_DATA__')
+
+def find_next_data(page):
+    """Slices the raw __NEXT_DATA__ JSON payload straight out of the page bytes.
+    Returns None when the script tag is absent, so callers can fall back to HTML parsing."""
+    if isinstance(page, str):
+        page = page.encode('utf-8')
+    for marker in _NEXT_DATA_MARKERS:
+        pos = page.find(marker)
+        if pos != -1:
+            break
+    else:
+        return None
+
+    # Make sure the marker belongs to a <script> tag and skip to the end of its opening tag
+    tag_start = page.rfind(b'<', 0, pos)
+    if tag_start == -1 or page[tag_start:tag_start + 7].lower() != b'<script':
+        return None
+    start = page.find(b'>', pos)
+    end = page.find(b'</script>', start)
+    if start == -1 or end == -1:
+        return None
+    payload = page[start + 1:end].strip()
+    return payload or None
+
+def _soup(page):
+    """Full HTML parse, only used when the __NEXT_DATA__ fast path has nothing to offer"""
+    if isinstance(page, bytes):
+        page = page.decode('utf-8', errors='replace')
+    return BeautifulSoup(page, 'html.parser')
+
+def fetch_embed_pages(embed_urls, stats=None, max_workers=8):
+    """Fetches several embed pages concurrently.
+    Returns {embed_url: CachedResponse or Exception}; URLs skipped because of cancellation are absent."""
+    results = {}
+    embed_urls = list(dict.fromkeys(embed_urls))
+    if not embed_urls:
+        return results
+
+    def fetch(embed_url):
+        stop_event = getattr(stats, 'stop_event', None) if stats else None
+        pause_event = getattr(stats, 'pause_event', None) if stats else None
+        # Wait while paused, but give up as soon as the task is stopped
+        if pause_event:
+            while not pause_event.wait(0.5):
+                if stop_event and stop_event.is_set():
+                    return embed_url, None
+        # Check for cancellation before making request
+        if stop_event and stop_event.is_set():
+            return embed_url, None
+        try:
+            return embed_url, fetch_embed_response(embed_url)
+        except Exception as e:
+            return embed_url, e
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(embed_urls))) as executor:
+        for embed_url, result in executor.map(fetch, embed_urls):
+            if result is not None:
+                results[embed_url] = result
+    return results
+
+def get_spotify_name(sp_url):
+    """Helper to fetch ONLY the name of a Spotify playlist, artist, or album from its embed page"""
+    sp_id, embed_url = get_embed_url(sp_url)
+    if not sp_id: return None
     
     try:
-        resp = requests.get(embed_url, headers=headers, timeout=10)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        # Revalidated against the cache (ETag / Last-Modified), so an unchanged page costs a
+        # 304 while a renamed playlist is picked up; offline the cached payload still answers
+        from core.http_cache import load_cached
+        try:
+            page = fetch_embed_page(embed_url)
+        except Exception:
+            cached = load_cached(embed_url)
+            if not cached:
+                raise
+            page = cached.content
         
-        # Try NEXT_DATA
-        next_data_tag = soup.find("script", {"id": "__NEXT_DATA__"})
-        if next_data_tag:
-            data = json.loads(next_data_tag.string)
+        # Try NEXT_DATA (sliced from the raw bytes, no DOM needed)
+        next_data = find_next_data(page)
+        if next_data:
+            data = json.loads(next_data)
             entity = data.get('props', {}).get('pageProps', {}).get('state', {}).get('data', {}).get('entity', {})
             if entity and 'name' in entity:
                 return convert(entity['name'], 'zh-tw')
         
         # Try meta tag as fallback for name
-        meta_title = soup.find("meta", property="og:title")
+        meta_title = _soup(page).find("meta", property="og:title")
         if meta_title:
              raw_name = meta_title.get("content", "")
              if "on Spotify" in raw_name: raw_name = raw_name.split("on Spotify")[0].strip()
@@ -77,6 +195,125 @@ def get_spotify_name(sp_url):
     except: pass
     return None
 
+def parse_embed_tracks(page, sp_url, sp_id, log_func):
+    """Extracts (pl_name, tracks) from an embed page, from __NEXT_DATA__ with an HTML fallback"""
+    from utils.i18n import _
+    is_artist = "artist/" in sp_url
+    is_album = "album/" in sp_url
+    next_data = find_next_data(page)
+    pl_name = None
+    tracks = []
+
+    # Special handling for single tracks
+    if "track/" in sp_url:
+        # For single tracks, extract the track info and add directly to download list
+        if next_data:
+            try:
+                data = json.loads(next_data)
+                entity = data.get('props', {}).get('pageProps', {}).get('state', {}).get('data', {}).get('entity', {})
+                if entity:
+                    track_name = entity.get('name')
+                    artists = entity.get('artists', [])
+                    if track_name and artists:
+                        artist_name = artists[0].get('name')
+                        full_track_name = f"{artist_name} - {track_name}"
+                        tracks.append(full_track_name)
+                        pl_name = sanitize_filename(full_track_name)
+                        log_func(f" -> 找到單曲: {full_track_name}")
+            except Exception as e:
+                log_func(_('json_error', e))
+
+        # Fallback to HTML parsing if JSON fails
+        if not tracks:
+            try:
+                soup = _soup(page)
+                title_tag = soup.find("h1")
+                artist_tag = soup.find("h2") or soup.find("a", {"data-testid": "entity-title"})
+                if title_tag and artist_tag:
+                    title = title_tag.get_text(strip=True)
+                    artist = artist_tag.get_text(strip=True)
+                    full_track_name = f"{artist} - {title}"
+                    tracks.append(full_track_name)
+                    pl_name = sanitize_filename(full_track_name)
+                    log_func(f" -> 找到單曲 (HTML): {full_track_name}")
+            except Exception as e:
+                log_func(f" -> 單曲解析錯誤: {e}")
+    else:
+        # Regular playlist/album/artist processing
+        if is_artist:
+            prefix = "Artist"
+        elif is_album:
+            prefix = "Album"
+        else:
+            prefix = "Spotify"
+        pl_name = f"{prefix}_{sp_id}"
+
+    # Skip regular processing for single tracks since they're already handled above
+    if "track/" not in sp_url:
+        if next_data:
+            try:
+                data = json.loads(next_data)
+                def get_path(obj, keys):
+                    curr = obj
+                    for k in keys:
+                        if isinstance(curr, dict) and k in curr: curr = curr[k]
+                        else: return None
+                    return curr
+
+                entity = get_path(data, ['props', 'pageProps', 'state', 'data', 'entity'])
+                if entity:
+                    if 'name' in entity: 
+                        raw_name = convert(entity['name'], 'zh-tw')
+                        pl_name = sanitize_filename(raw_name)
+
+                    track_list = entity.get('trackList') or \
+                                entity.get('topTracks') or \
+                                (entity.get('tracks') and entity.get('tracks').get('items')) or \
+                                (entity.get('tracks') and entity.get('tracks').get('data'))
+
+                    if track_list:
+                        import re
+                        def clean_artist_name(name):
+                            # Remove "E" prefix (Explicit tag artifact)
+                            # e.g. "EYosebe" -> "Yosebe", "E王ADEN" -> "王ADEN"
+                            if not name: return name
+                            return re.sub(r'^E(?=[A-Z\u4e00-\u9fff\u3040-\u30ff])', '', name)
+
+                        for item in track_list:
+                            track = item.get('track', item)
+                            name = track.get('name')
+                            artists = track.get('artists', [])
+                            if name and artists:
+                                artist_name = clean_artist_name(artists[0].get('name'))
+                                tracks.append(f"{artist_name} - {name}")
+            except Exception as e:
+                log_func(_('json_error', e))
+
+    # HTML fallback for playlists/albums/artists only
+    if not tracks and "track/" not in sp_url:
+         rows = _soup(page).find_all("li", class_=lambda x: x and "TracklistRow_trackListRow" in x)
+         if rows:
+             log_func(_('html_fallback', len(rows)))
+             import re
+             def clean_html_text(text):
+                 # Aggressively clean "E" prefix which often appears in HTML scraping
+                 if not text: return text
+                 return re.sub(r'^E(?=[A-Z\u4e00-\u9fff\u3040-\u30ff])', '', text)
+
+             for row in rows:
+                 t_tag = row.find("h3", class_=lambda x: x and "TracklistRow_title" in x)
+                 a_tag = row.find("h4", class_=lambda x: x and "TracklistRow_subtitle" in x)
+
+                 if t_tag and a_tag:
+                     # Try to get direct text if possible, but get_text is safer for coverage
+                     artist_text = a_tag.get_text(strip=True)
+                     title_text = t_tag.get_text(strip=True)
+
+                     artist_clean = clean_html_text(artist_text)
+                     tracks.append(f"{artist_clean} - {title_text}")
+
+    return pl_name, tracks
+
 def scrape_via_spotify_embed(config, stats, log_func):
     from utils.i18n import _
     target_urls = config.get('spotify_urls', [])
@@ -91,6 +328,22 @@ def scrape_via_spotify_embed(config, stats, log_func):
     today = datetime.datetime.now().strftime('%Y-%m-%d')
     last_updated = config.get('last_updated', {})
 
+    # Fetch stage: every URL that needs a sync is downloaded concurrently over one session
+    pending = {}
+    for sp_url in target_urls:
+        if last_updated.get(sp_url) != today:
+            sp_id, embed_url = get_embed_url(sp_url)
+            if sp_id:
+                pending[sp_url] = embed_url
+    if pending:
+        log_func(_('connecting_spotify'))
+    pages = fetch_embed_pages(pending.values(), stats, max_workers=config.get('max_threads', 4) * 2)
+
+    # Shared library index for resolving M3U paths, built lazily once per run
+    from core.library import load_library_index, resolve_song, get_fuzzy_threshold, format_extension
+    lib_index = None
+
+    # Parse stage: results are processed serially in config order
     for sp_url in target_urls:
         if stats and stats.stop_event and stats.stop_event.is_set():
             return
@@ -104,181 +357,34 @@ def scrape_via_spotify_embed(config, stats, log_func):
                 stats.playlist_changes[name] = {'added': [], 'removed': []}
             continue
 
-        sp_id = None
-        is_artist = "artist/" in sp_url
-        is_album = "album/" in sp_url
-        
-        if is_artist:
-            try:
-                sp_id = sp_url.split('?')[0].split('artist/')[-1]
-            except: pass
-        elif is_album:
-            try:
-                sp_id = sp_url.split('?')[0].split('album/')[-1]
-            except: pass
-        elif "playlist/" in sp_url:
-            try:
-                # Remove query params
-                clean_url = sp_url.split('?')[0]
-                sp_id = clean_url.split('playlist/')[-1]
-            except: pass
-        elif "track/" in sp_url:
-            try:
-                # Remove query params
-                clean_url = sp_url.split('?')[0]
-                sp_id = clean_url.split('track/')[-1]
-            except: pass
-        else:
-             sp_id = sp_url.strip()
+        sp_id, embed_url = get_embed_url(sp_url)
 
         if not sp_id:
             log_func(_('skip_invalid', sp_url))
             continue
 
-        if is_artist:
-            type_path = "artist"
-        elif is_album:
-            type_path = "album"
-        elif "track/" in sp_url:
-            type_path = "track"
-        else:
-            type_path = "playlist"
-            
-        embed_url = f"https://open.spotify.com/embed/{type_path}/{sp_id}"
         log_func(_('scanning_pl', sp_id))
-        log_func(_('connecting_spotify'))
         
         try:
-            if stats and hasattr(stats, 'pause_event'):
-                 stats.pause_event.wait()
-            
-            # Check for cancellation before making request
-            if stats and stats.stop_event and stats.stop_event.is_set():
+            page = pages.get(embed_url)
+            if page is None:
+                # Fetch was skipped because the task was cancelled
                 return
+            if isinstance(page, Exception):
+                raise page
 
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept-Language': 'zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
-            resp = requests.get(embed_url, headers=headers, timeout=10)  # Add timeout
-            resp.raise_for_status()
-            
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            tracks = []
-            
-            # Special handling for single tracks
-            if "track/" in sp_url:
-                # For single tracks, extract the track info and add directly to download list
-                next_data_tag = soup.find("script", {"id": "__NEXT_DATA__"})
-                if next_data_tag:
-                    try:
-                        data = json.loads(next_data_tag.string)
-                        entity = data.get('props', {}).get('pageProps', {}).get('state', {}).get('data', {}).get('entity', {})
-                        if entity:
-                            track_name = entity.get('name')
-                            artists = entity.get('artists', [])
-                            if track_name and artists:
-                                artist_name = artists[0].get('name')
-                                full_track_name = f"{artist_name} - {track_name}"
-                                tracks.append(full_track_name)
-                                pl_name = sanitize_filename(full_track_name)
-                                log_func(f" -> 找到單曲: {full_track_name}")
-                    except Exception as e:
-                        log_func(_('json_error', e))
-                
-                # Fallback to HTML parsing if JSON fails
-                if not tracks:
-                    try:
-                        title_tag = soup.find("h1")
-                        artist_tag = soup.find("h2") or soup.find("a", {"data-testid": "entity-title"})
-                        if title_tag and artist_tag:
-                            title = title_tag.get_text(strip=True)
-                            artist = artist_tag.get_text(strip=True)
-                            full_track_name = f"{artist} - {title}"
-                            tracks.append(full_track_name)
-                            pl_name = sanitize_filename(full_track_name)
-                            log_func(f" -> 找到單曲 (HTML): {full_track_name}")
-                    except Exception as e:
-                        log_func(f" -> 單曲解析錯誤: {e}")
+            # An unchanged payload reuses the track list parsed last time (keyed by its hash),
+            # skipping json.loads and extraction. The M3U text is still rebuilt below since entry
+            # paths depend on the library; write_file_if_changed skips the write if nothing differs
+            from core.http_cache import load_parsed, store_parsed
+            parsed = load_parsed(page) if page.unchanged else None
+            if parsed:
+                pl_name, tracks = parsed
+                log_func(_('payload_unchanged', pl_name))
             else:
-                # Regular playlist/album/artist processing
-                if is_artist:
-                    prefix = "Artist"
-                elif is_album:
-                    prefix = "Album"
-                else:
-                    prefix = "Spotify"
-                pl_name = f"{prefix}_{sp_id}"
-
-            # Skip regular processing for single tracks since they're already handled above
-            if "track/" not in sp_url:
-                next_data_tag = soup.find("script", {"id": "__NEXT_DATA__"})
-                if next_data_tag:
-                    try:
-                        data = json.loads(next_data_tag.string)
-                        def get_path(obj, keys):
-                            curr = obj
-                            for k in keys:
-                                if isinstance(curr, dict) and k in curr: curr = curr[k]
-                                else: return None
-                            return curr
-
-                        entity = get_path(data, ['props', 'pageProps', 'state', 'data', 'entity'])
-                        if entity:
-                            if 'name' in entity: 
-                                raw_name = convert(entity['name'], 'zh-tw')
-                                pl_name = sanitize_filename(raw_name)
-                            
-                            track_list = entity.get('trackList') or \
-                                        entity.get('topTracks') or \
-                                        (entity.get('tracks') and entity.get('tracks').get('items')) or \
-                                        (entity.get('tracks') and entity.get('tracks').get('data'))
-                            
-                            if track_list:
-                                import re
-                                def clean_artist_name(name):
-                                    # Remove "E" prefix (Explicit tag artifact)
-                                    # e.g. "EYosebe" -> "Yosebe", "E王ADEN" -> "王ADEN"
-                                    if not name: return name
-                                    return re.sub(r'^E(?=[A-Z\u4e00-\u9fff\u3040-\u30ff])', '', name)
-
-                                for item in track_list:
-                                    track = item.get('track', item)
-                                    name = track.get('name')
-                                    artists = track.get('artists', [])
-                                    if name and artists:
-                                        artist_name = clean_artist_name(artists[0].get('name'))
-                                        tracks.append(f"{artist_name} - {name}")
-                    except Exception as e:
-                        log_func(_('json_error', e))
-
-            # HTML fallback for playlists/albums/artists only
-            if not tracks and "track/" not in sp_url:
-                 rows = soup.find_all("li", class_=lambda x: x and "TracklistRow_trackListRow" in x)
-                 if rows:
-                     log_func(_('html_fallback', len(rows)))
-                     import re
-                     def clean_html_text(text):
-                         # Aggressively clean "E" prefix which often appears in HTML scraping
-                         if not text: return text
-                         return re.sub(r'^E(?=[A-Z\u4e00-\u9fff\u3040-\u30ff])', '', text)
-
-                     for row in rows:
-                         t_tag = row.find("h3", class_=lambda x: x and "TracklistRow_title" in x)
-                         a_tag = row.find("h4", class_=lambda x: x and "TracklistRow_subtitle" in x)
-                         
-                         if t_tag and a_tag:
-                             # Try to get direct text if possible, but get_text is safer for coverage
-                             artist_text = a_tag.get_text(strip=True)
-                             title_text = t_tag.get_text(strip=True)
-                             
-                             artist_clean = clean_html_text(artist_text)
-                             tracks.append(f"{artist_clean} - {title_text}")
+                pl_name, tracks = parse_embed_tracks(page.content, sp_url, sp_id, log_func)
+                if tracks:
+                    store_parsed(page, (pl_name, tracks))
 
             if tracks:
                 # Save name to config mapping
@@ -333,41 +439,43 @@ def scrape_via_spotify_embed(config, stats, log_func):
 
                     # Get library path from config to calculate relative path
                     library_path = config.get('library_path', 'Music')
+                    # Extension used for songs that are not downloaded yet
+                    placeholder_ext = format_extension(config.get('audio_format', 'mp3'))
                     
-                    # Build index to resolve actual filenames (handles "E" prefix and diff extensions)
-                    log_func(_('scanning_lib'))
-                    import glob
-                    search_pattern = os.path.join(library_path, "**", "*")
-                    all_files = glob.glob(search_pattern, recursive=True)
-                    audio_cache = [f for f in all_files if f.lower().endswith(('.mp3', '.m4a', '.flac', '.wav', '.webm'))]
-                    from core.library import build_library_index, find_song_in_library
-                    lib_index = build_library_index(audio_cache)
+                    # Build index once per run to resolve actual filenames (handles "E" prefix and diff extensions)
+                    if lib_index is None:
+                        log_func(_('scanning_lib'))
+                        lib_index = load_library_index(library_path)
 
                 # Only write M3U files for playlists/albums/artists
                 if "track/" not in sp_url:
-                    with open(m3u_path, 'w', encoding='utf-8-sig', newline='') as f:
-                        f.write("#EXTM3U\r\n")
-                        for track in tracks:
-                            clean_track = track.strip()
-                            
-                            # Find actual file in library
-                            actual_path = find_song_in_library(clean_track, lib_index)
-                            
-                            # Ensure all paths are absolute and normalized first
-                            abs_song_path = os.path.normpath(os.path.abspath(actual_path if actual_path else os.path.join(library_path, f"{clean_track}.mp3")))
-                            abs_playlists_path = os.path.normpath(os.path.abspath(playlists_path))
-                            
-                            # Calculate relative path from Playlists folder to Music folder (e.g. ../Music/Song.mp3)
-                            # rel_path will generate the necessary '..' prefix automatically.
-                            rel_path = os.path.relpath(abs_song_path, start=abs_playlists_path)
-                            
-                            # Standardization: Forward slashes (/) are best for M3U8 and avoid separator issues
-                            m3u_entry_path = rel_path.replace('\\', '/')
-                            
-                            # Write EXTINF and the relative path with CRLF
-                            f.write(f"#EXTINF:-1,{clean_track}\r\n")
-                            f.write(f"{m3u_entry_path}\r\n")
-                    log_func(_('saved_tracks', len(tracks), os.path.basename(m3u_path)))
+                    abs_playlists_path = os.path.normpath(os.path.abspath(playlists_path))
+                    lines = ["#EXTM3U"]
+                    for track in tracks:
+                        clean_track = track.strip()
+                        
+                        # Find actual file in library; fuzzy hits are remembered as aliases
+                        actual_path = resolve_song(clean_track, lib_index, get_fuzzy_threshold(config), library_path)[0]
+                        
+                        # Ensure all paths are absolute and normalized first
+                        abs_song_path = os.path.normpath(os.path.abspath(actual_path if actual_path else os.path.join(library_path, clean_track + placeholder_ext)))
+                        
+                        # Calculate relative path from Playlists folder to Music folder (e.g. ../Music/Song.mp3)
+                        # rel_path will generate the necessary '..' prefix automatically.
+                        rel_path = os.path.relpath(abs_song_path, start=abs_playlists_path)
+                        
+                        # Standardization: Forward slashes (/) are best for M3U8 and avoid separator issues
+                        m3u_entry_path = rel_path.replace('\\', '/')
+                        
+                        lines.append(f"#EXTINF:-1,{clean_track}")
+                        lines.append(m3u_entry_path)
+
+                    # EXTINF and relative paths with CRLF; the file is only rewritten if its content changed
+                    content = "\r\n".join(lines) + "\r\n"
+                    if write_file_if_changed(m3u_path, content, encoding='utf-8-sig'):
+                        log_func(_('saved_tracks', len(tracks), os.path.basename(m3u_path)))
+                    else:
+                        log_func(_('playlist_unchanged', os.path.basename(m3u_path)))
                     if stats: stats.playlists_scanned += 1
                 else:
                     # For single tracks, just log that they were processed
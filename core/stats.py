@@ -0,0 +1,215 @@
+import os
+import glob
+import heapq
+import datetime
+import threading
+
+# Running aggregates behind the statistics panel. Library files and playlists are
+# diffed against what was seen last time and only the differences are applied, so a
+# refresh after a download costs a stat of the new files instead of the whole library.
+
+RECENT_COUNT = 5
+
+class LibraryStats:
+    """Incrementally maintained numbers for get_detailed_stats.
+
+    Library side: per-file (size, mtime, tokens), the total size, a min-heap holding
+    the RECENT_COUNT newest files and a tokens -> files map. Playlist side: per-playlist
+    parsed songs keyed by the playlist's (mtime, size), per-name and per-token
+    occurrence counts. The savings figure is kept as a sum of per-token contributions
+    and adjusted only for tokens touched by a change.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = {}  # path -> (size or None if unreadable, mtime, tokens)
+        self.total_bytes = 0
+        self.recent = []  # min-heap of (mtime, path)
+        self.token_files = {}  # tokens -> [paths]
+        self.playlists = {}  # pl_file -> (stat_key, [song names], [tokens])
+        self.name_counts = {}
+        self.token_occurrences = {}
+        self.total_entries = 0
+        self.savings_bytes = 0
+        self.index_state = None  # (uid, generation, file count) of the last LibraryIndex seen
+
+    # --- savings bookkeeping ---
+
+    def _contribution(self, tokens):
+        occurrences = self.token_occurrences.get(tokens, 0)
+        if occurrences <= 1:
+            return 0
+        # Same rule as before: the first readable file with these tokens
+        for path in self.token_files.get(tokens, ()):
+            size = self.files[path][0]
+            if size is not None:
+                return (occurrences - 1) * size
+        return 0
+
+    # --- library side ---
+
+    def _add_file(self, path, size, mtime, tokens):
+        if not tokens:
+            self.files[path] = (size, mtime, tokens)
+        else:
+            before = self._contribution(tokens)
+            self.files[path] = (size, mtime, tokens)
+            self.token_files.setdefault(tokens, []).append(path)
+            self.savings_bytes += self._contribution(tokens) - before
+        if size is not None:
+            self.total_bytes += size
+            if len(self.recent) < RECENT_COUNT:
+                heapq.heappush(self.recent, (mtime, path))
+            elif (mtime, path) > self.recent[0]:
+                heapq.heapreplace(self.recent, (mtime, path))
+
+    def _remove_file(self, path):
+        size, mtime, tokens = self.files[path]
+        if tokens:
+            before = self._contribution(tokens)
+            del self.files[path]
+            paths = self.token_files[tokens]
+            paths.remove(path)
+            if not paths:
+                del self.token_files[tokens]
+            self.savings_bytes += self._contribution(tokens) - before
+        else:
+            del self.files[path]
+        if size is not None:
+            self.total_bytes -= size
+            if (mtime, path) in self.recent:
+                # One of the newest files went away: refill from the remaining files (rare)
+                self.recent = heapq.nlargest(RECENT_COUNT, ((m, p) for p, (s, m, _t) in self.files.items() if s is not None))
+                heapq.heapify(self.recent)
+
+    def _stat_and_add(self, paths):
+        from core.library import _normalize_tokens
+        for path in paths:
+            try:
+                st = os.stat(path)
+                size, mtime = st.st_size, st.st_mtime
+            except OSError:
+                size, mtime = None, 0
+            tokens = _normalize_tokens(os.path.splitext(os.path.basename(path))[0])
+            self._add_file(path, size, mtime, tokens)
+
+    def sync_entries(self, entries):
+        """Applies a library_db scan: only added, removed or modified files are touched"""
+        current = {e.path: e for e in entries}
+        for path in [p for p in self.files if p not in current]:
+            self._remove_file(path)
+        for path, entry in current.items():
+            known = self.files.get(path)
+            if known is not None and known[0] == entry.size and known[1] == entry.mtime:
+                continue
+            if known is not None:
+                self._remove_file(path)
+            self._add_file(path, entry.size, entry.mtime, tuple(entry.tokens))
+        self.index_state = None
+
+    def sync_files(self, audio_files):
+        """Applies a file list or LibraryIndex. A LibraryIndex already seen only contributes
+        the files appended since; anything else is diffed by path."""
+        from core.library import LibraryIndex
+        if isinstance(audio_files, LibraryIndex):
+            files = list(audio_files)
+            state = self.index_state
+            if state and state[0] == audio_files.uid and state[2] <= len(files):
+                if state[1] != audio_files.generation:
+                    self._stat_and_add(p for p in files[state[2]:] if p not in self.files)
+                self.index_state = (audio_files.uid, audio_files.generation, len(files))
+                return
+            self.index_state = (audio_files.uid, audio_files.generation, len(files))
+        else:
+            files = list(audio_files)
+            self.index_state = None
+
+        current = set(files)
+        for path in [p for p in self.files if p not in current]:
+            self._remove_file(path)
+        self._stat_and_add(p for p in dict.fromkeys(files) if p not in self.files)
+
+    # --- playlist side ---
+
+    def _count_playlist(self, songs, tokens_list, sign):
+        for name in songs:
+            count = self.name_counts.get(name, 0) + sign
+            if count:
+                self.name_counts[name] = count
+            else:
+                del self.name_counts[name]
+        self.total_entries += sign * len(songs)
+
+        touched = {}
+        for tokens in tokens_list:
+            if tokens:
+                touched[tokens] = touched.get(tokens, 0) + 1
+        for tokens, n in touched.items():
+            before = self._contribution(tokens)
+            count = self.token_occurrences.get(tokens, 0) + sign * n
+            if count:
+                self.token_occurrences[tokens] = count
+            else:
+                del self.token_occurrences[tokens]
+            self.savings_bytes += self._contribution(tokens) - before
+
+    def sync_playlists(self, pl_files):
+        """Re-parses only playlists whose (mtime, size) changed; removed playlists are subtracted"""
+        from core.library import parse_playlist, _normalize_tokens, _playlist_stat_key
+        current = set(pl_files)
+        for pl_file in [p for p in self.playlists if p not in current]:
+            _key, songs, tokens_list = self.playlists.pop(pl_file)
+            self._count_playlist(songs, tokens_list, -1)
+
+        for pl_file in pl_files:
+            stat_key = _playlist_stat_key(pl_file)
+            known = self.playlists.get(pl_file)
+            if known is not None and known[0] == stat_key:
+                continue
+            if known is not None:
+                self._count_playlist(known[1], known[2], -1)
+            songs = parse_playlist(pl_file)
+            tokens_list = [_normalize_tokens(str(name)) for name in songs]
+            self.playlists[pl_file] = (stat_key, songs, tokens_list)
+            self._count_playlist(songs, tokens_list, 1)
+
+    def snapshot(self):
+        recent = []
+        for mtime, path in sorted(self.recent, reverse=True):
+            recent.append((os.path.basename(path), datetime.datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')))
+        unique = len(self.name_counts)
+        return {
+            'total_songs': len(self.files),
+            'total_size_mb': self.total_bytes / (1024 * 1024),
+            'recent_5': recent,
+            'total_playlist_entries': self.total_entries,
+            'unique_playlist_entries': unique,
+            'duplicates_count': self.total_entries - unique,
+            'savings_mb': self.savings_bytes / (1024 * 1024),
+        }
+
+_stats = {}  # (library_path, playlists_path) -> LibraryStats
+_stats_lock = threading.Lock()
+
+def get_library_stats(library_path, playlists_path):
+    """Returns the shared LibraryStats for this library/playlists pair"""
+    key = (os.path.normcase(os.path.abspath(library_path or '.')), os.path.normcase(os.path.abspath(playlists_path or '.')))
+    with _stats_lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = LibraryStats()
+        return stats
+
+def refresh_stats(library_path, playlists_path, audio_files=None):
+    """Brings the aggregates up to date and returns the stats dictionary"""
+    from core.library_db import scan_library
+    stats = get_library_stats(library_path, playlists_path)
+    pl_files = glob.glob(os.path.join(playlists_path, "*.m3u8")) + \
+               glob.glob(os.path.join(playlists_path, "*.m3u")) + \
+               glob.glob(os.path.join(playlists_path, "*.txt"))
+    with stats.lock:
+        if audio_files is None:
+            stats.sync_entries(scan_library(library_path))
+        else:
+            stats.sync_files(audio_files)
+        stats.sync_playlists(pl_files)
+        return stats.snapshot()
@@ -0,0 +1,179 @@
+import os
+import sys
+import shutil
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# ffmpeg arguments per target format, matching what FFmpegExtractAudio used to produce
+CODEC_ARGS = {
+    'mp3': ['-c:a', 'libmp3lame', '-b:a', '320k', '-f', 'mp3'],
+    'flac': ['-c:a', 'flac', '-f', 'flac'],
+    'm4a': ['-c:a', 'aac', '-b:a', '320k', '-f', 'ipod'],
+    'wav': ['-c:a', 'pcm_s16le', '-f', 'wav'],
+}
+
+# Passthrough ("native") mode: containers yt-dlp hands over that only need a remux into an
+# audio container. Tried in order, e.g. a webm holding vorbis instead of opus ends up as .ogg
+NATIVE_REMUX = {
+    '.webm': ['opus', 'ogg'],
+}
+
+class TranscodeError(Exception):
+    pass
+
+def find_ffmpeg():
+    """Returns the ffmpeg executable next to the app (PyInstaller builds) or on PATH, or None"""
+    base_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.getcwd()
+    for name in ('ffmpeg.exe', 'ffmpeg'):
+        candidate = os.path.join(base_dir, name)
+        if os.path.isfile(candidate):
+            return candidate
+    return shutil.which('ffmpeg')
+
+def transcode(src, audio_format, stop_event=None, ffmpeg=None):
+    """Converts src to audio_format next to it and removes src. Returns the new path.
+
+    The output is written to a temporary name and renamed on success, so an
+    interrupted conversion never leaves a truncated file with the final extension.
+    """
+    from core.library import NATIVE_FORMAT
+    base, ext = os.path.splitext(src)
+    if audio_format == NATIVE_FORMAT:
+        containers = NATIVE_REMUX.get(ext.lower())
+        if not containers:
+            return src
+        last_error = None
+        for container in containers:
+            try:
+                return _run_ffmpeg(src, base + '.' + container, ['-c:a', 'copy', '-f', container], stop_event, ffmpeg)
+            except TranscodeError as e:
+                if stop_event and stop_event.is_set():
+                    raise
+                last_error = e
+        raise last_error
+
+    if ext.lower().lstrip('.') == audio_format:
+        return src
+    if audio_format not in CODEC_ARGS:
+        raise TranscodeError(f"Unsupported format: {audio_format}")
+    return _run_ffmpeg(src, base + '.' + audio_format, CODEC_ARGS[audio_format], stop_event, ffmpeg)
+
+def _run_ffmpeg(src, dst, codec_args, stop_event=None, ffmpeg=None):
+    ffmpeg = ffmpeg or find_ffmpeg()
+    if not ffmpeg:
+        raise TranscodeError("ffmpeg not found")
+
+    tmp = dst + '.part'
+    cmd = [ffmpeg, '-y', '-nostdin', '-loglevel', 'error', '-i', src, '-vn'] + codec_args + [tmp]
+
+    kwargs = {}
+    if os.name == 'nt':
+        kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, **kwargs)
+    try:
+        while True:
+            try:
+                _, err = proc.communicate(timeout=0.5)
+                break
+            except subprocess.TimeoutExpired:
+                if stop_event and stop_event.is_set():
+                    proc.kill()
+                    proc.communicate()
+                    raise TranscodeError("Task aborted by user")
+        if proc.returncode != 0:
+            raise TranscodeError(err.decode('utf-8', 'replace').strip()[-200:] or f"ffmpeg exited with {proc.returncode}")
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    try:
+        os.remove(src)
+    except OSError:
+        pass
+    return dst
+
+def _discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class TranscodePool:
+    """CPU stage of the download pipeline.
+
+    Network workers hand finished downloads to submit() and go fetch the next song
+    while up to max_workers ffmpeg processes convert in parallel. At most max_pending
+    files may be waiting or converting; submit() blocks beyond that, so a fast
+    network cannot pile up unconverted files faster than the CPU can drain them.
+    Threads are enough here because every conversion runs in its own ffmpeg process.
+
+    Network work that has to wait for a conversion (e.g. a lyrics lookup that reads the
+    converted file's tags) is chained with after() and runs on a separate I/O executor,
+    so it never holds an ffmpeg slot.
+    """
+    def __init__(self, max_workers=None, max_pending=None, stop_event=None, io_workers=4):
+        self.max_workers = max(1, int(max_workers or os.cpu_count() or 2))
+        self.slots = threading.BoundedSemaphore(max(self.max_workers, int(max_pending or self.max_workers * 2)))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='transcode')
+        self.io_executor = ThreadPoolExecutor(max_workers=max(1, int(io_workers)), thread_name_prefix='transcode-io')
+        self.stop_event = stop_event
+        self.ffmpeg = find_ffmpeg()
+
+    @property
+    def available(self):
+        return self.ffmpeg is not None
+
+    def submit(self, src, audio_format):
+        """Queues src for conversion and returns a Future resolving to the converted path.
+        Returns None if the task was stopped while waiting for a free slot.
+
+        src is the raw download and is deleted whenever it does not end up converted
+        (ffmpeg failed, the task was stopped or the queued conversion was cancelled),
+        so no unconverted stream is left in the library to be matched later."""
+        while not self.slots.acquire(timeout=0.5):
+            if self.stop_event and self.stop_event.is_set():
+                _discard(src)
+                return None
+
+        def run():
+            try:
+                return transcode(src, audio_format, self.stop_event, self.ffmpeg)
+            except BaseException:
+                _discard(src)
+                raise
+            finally:
+                self.slots.release()
+
+        try:
+            future = self.executor.submit(run)
+        except RuntimeError:
+            self.slots.release()
+            _discard(src)
+            raise
+        future.add_done_callback(lambda f: f.cancelled() and _discard(src))
+        return future
+
+    def after(self, future, func, *args):
+        """Runs func(converted_path, *args) on the I/O executor once future converted successfully"""
+        def chain(f):
+            if f.cancelled() or f.exception() is not None:
+                return
+            if self.stop_event and self.stop_event.is_set():
+                return
+            try:
+                self.io_executor.submit(func, f.result(), *args)
+            except RuntimeError:
+                pass  # Shut down meanwhile
+        future.add_done_callback(chain)
+
+    def shutdown(self, cancel=False):
+        """Waits for queued conversions and their follow-ups to finish (or drops the queued ones if cancel)"""
+        # Conversions first: their done callbacks may still queue follow-ups
+        self.executor.shutdown(wait=True, cancel_futures=cancel)
+        self.io_executor.shutdown(wait=True, cancel_futures=cancel)
@@ -25,6 +25,14 @@ class PlaylistApp:
         self.last_full_refresh = 0
         self.songs_since_last_refresh = 0
 
+        # --- URL list refresh worker (see refresh_url_list) ---
+        self.refresh_lock = threading.Lock()
+        self.refresh_seq = 0
+        self.refresh_pending = None
+        self.refresh_running = False
+        self.player_load_seq = 0  # Newest playlist handed to the player (see load_playlist_into_player)
+        self.pl_urls, self.al_urls, self.ar_urls, self.st_urls = [], [], [], []
+
         # Prompt for base path if not set
         if 'base_path' not in self.config or not self.config['base_path']:
             if not prompt_and_set_base_path(self.config):
@@ -37,6 +45,7 @@ class PlaylistApp:
         self.pause_event = threading.Event()
         self.pause_event.set() 
         self.stop_event = threading.Event()
+        self.export_stop_event = threading.Event()
         
         self.create_widgets()
         self.refresh_url_list()
@@ -344,6 +353,10 @@ class PlaylistApp:
         
         self.space_saved_lbl = tk.Label(stats_container, text=_('space_saved', _('loading')), font=("Microsoft JhengHei", 10), fg="#4CAF50")
         self.space_saved_lbl.grid(row=0, column=2, sticky="w", padx=20)
+
+        self.dedup_btn = tk.Button(stats_container, text=_('dedup_btn'), command=self.find_duplicate_files, font=("Microsoft JhengHei", 9))
+        self.dedup_btn.grid(row=0, column=3, sticky="e", padx=5)
+        stats_container.columnconfigure(3, weight=1)
         
         self.recent_lbl = tk.Label(self.stats_frame, text=_('recent_added', ""), font=("Microsoft JhengHei", 9), fg="#666")
         self.recent_lbl.pack(side="top", anchor="w", padx=15, pady=(0, 5))
@@ -554,42 +567,76 @@ class PlaylistApp:
         self.cancel_btn.config(text=_('cancel_btn'))
         self.export_btn.config(text=_('export_usb_btn'))
         self.stats_frame.config(text=_('stats_title'))
+        self.dedup_btn.config(text=_('dedup_btn'))
         self.log_frame.config(text=_('log_title'))
         self.settings_btn.config(text="⚙️ " + _('set_base_folder_btn')) # Reuse key for now or add new one
         self.player_frame.config(text=_('player_title'))
         self.vol_lbl.config(text=_('player_volume', int(self.vol_var.get())))
 
     def refresh_url_list(self, audio_cache=None):
-        # Save current selections and scroll positions
-        lists = [self.pl_listbox, self.al_listbox, self.ar_listbox, self.st_listbox]
-        saves = []
-        for lb in lists:
-            saves.append({
-                'selection': lb.curselection(),
-                'yview': lb.yview()
-            })
-
-        self.pl_listbox.delete(0, tk.END)
-        self.al_listbox.delete(0, tk.END)
-        self.ar_listbox.delete(0, tk.END)
-        self.st_listbox.delete(0, tk.END)
-        url_names = self.config.get('url_names', {})
-        last_updated = self.config.get('last_updated', {})
-        
+        """Schedules a recompute of the URL list statuses on a background worker.
+
+        Requests are coalesced: while the worker is busy only the newest request is
+        kept, and a result that was overtaken by a newer request is never shown.
+        The listboxes are updated on the Tk thread via root.after.
+        """
+        # Snapshot what the worker needs so it never reads config while the UI mutates it
+        request = {
+            'urls': list(self.config.get('spotify_urls', [])),
+            'url_names': dict(self.config.get('url_names', {})),
+            'last_updated': dict(self.config.get('last_updated', {})),
+            'playlists_path': self.config['playlists_path'],
+            'library_path': self.config['library_path'],
+            'audio_cache': audio_cache,
+        }
+        with self.refresh_lock:
+            self.refresh_seq += 1
+            self.refresh_pending = (self.refresh_seq, request)
+            if self.refresh_running:
+                return
+            self.refresh_running = True
+        threading.Thread(target=self._refresh_url_list_worker, daemon=True).start()
+
+    def _refresh_url_list_worker(self):
+        while True:
+            with self.refresh_lock:
+                pending = self.refresh_pending
+                self.refresh_pending = None
+                if pending is None:
+                    self.refresh_running = False
+                    return
+            seq, request = pending
+            try:
+                result = self._compute_url_list(request)
+            except Exception as e:
+                self.log(f"Refresh Error: {e}")
+                continue
+            try:
+                self.root.after(0, lambda seq=seq, result=result: self._apply_url_list(seq, result))
+            except RuntimeError:
+                # Window already destroyed
+                with self.refresh_lock:
+                    self.refresh_running = False
+                return
+
+    def _compute_url_list(self, request):
+        """Builds the status line of every URL (runs on the refresh worker)"""
         import datetime
-        import os
+        from core.library import get_playlist_completeness_report, AUDIO_EXTENSIONS
         today = datetime.datetime.now().strftime('%Y-%m-%d')
-        
-        from core.library import get_playlist_completeness_report
-        playlists_path = self.config['playlists_path']
-        library_path = self.config['library_path']
-        
-        urls = self.config.get('spotify_urls', [])
-        
-        self.pl_urls = [u for u in urls if "artist/" not in u and "album/" not in u and "track/" not in u]  # 只有播放清單
-        self.al_urls = [u for u in urls if "album/" in u]  # 只有專輯
-        self.ar_urls = [u for u in urls if "artist/" in u]  # 只有藝人
-        self.st_urls = [u for u in urls if "track/" in u]  # 只有單曲
+        urls = request['urls']
+        url_names = request['url_names']
+        last_updated = request['last_updated']
+        playlists_path = request['playlists_path']
+        library_path = request['library_path']
+
+        result = {
+            'pl_urls': [u for u in urls if "artist/" not in u and "album/" not in u and "track/" not in u],  # 只有播放清單
+            'al_urls': [u for u in urls if "album/" in u],  # 只有專輯
+            'ar_urls': [u for u in urls if "artist/" in u],  # 只有藝人
+            'st_urls': [u for u in urls if "track/" in u],  # 只有單曲
+            'pl': [], 'al': [], 'ar': [], 'st': [],
+        }
         
         pl_files = []
         # 直接獲取所有存在的播放清單檔案，不依賴 URL 列表
@@ -597,18 +644,18 @@ class PlaylistApp:
             pl_files.extend(glob.glob(os.path.join(playlists_path, f"*{ext}")))
         
         # Batch check completeness
-        report = get_playlist_completeness_report(pl_files, library_path, audio_files_cache=audio_cache)
+        report = get_playlist_completeness_report(pl_files, library_path, audio_files_cache=request['audio_cache'])
 
         for url in urls:
             name = url_names.get(url, url)
             status_text = ""
             is_synced_today = last_updated.get(url) == today
             
-            # For single tracks, check if MP3 file exists instead of playlist file
+            # For single tracks, check if the audio file exists instead of playlist file
             if "track/" in url:
-                # Single track - check for MP3 file
-                mp3_file = os.path.join(library_path, f"{name}.mp3")
-                if os.path.exists(mp3_file):
+                # Single track - any supported format counts (mp3/flac/native opus...)
+                track_base = os.path.join(library_path, name)
+                if any(os.path.exists(track_base + ext) for ext in AUDIO_EXTENSIONS):
                     status_text = f"✅ {name}" if is_synced_today else f"📦 {name} ({_('local_complete')})"
                 else:
                     status_text = f"🔄 {name}" if is_synced_today else f"⏳ {name} ({_('wait_download')})"
@@ -644,24 +691,41 @@ class PlaylistApp:
                         status_text = f"⏳ {name} ({_('wait_sync')})"
             
             # Display in appropriate listbox based on URL type
-            if url in self.pl_urls:
-                self.pl_listbox.insert(tk.END, status_text)
-            elif url in self.al_urls:
-                self.al_listbox.insert(tk.END, status_text)
-            elif url in self.st_urls:
-                self.st_listbox.insert(tk.END, status_text)
+            if url in result['pl_urls']:
+                result['pl'].append(status_text)
+            elif url in result['al_urls']:
+                result['al'].append(status_text)
+            elif url in result['st_urls']:
+                result['st'].append(status_text)
             else:
-                self.ar_listbox.insert(tk.END, status_text)
+                result['ar'].append(status_text)
+        return result
+
+    def _apply_url_list(self, seq, result):
+        """Fills the listboxes with a computed result (Tk thread only)"""
+        if seq != self.refresh_seq:
+            return  # A newer refresh is on its way
 
-        # Restore positions and selections
-        for i, lb in enumerate(lists):
-            s = saves[i]
+        # Save current selections and scroll positions
+        lists = [(self.pl_listbox, 'pl'), (self.al_listbox, 'al'), (self.ar_listbox, 'ar'), (self.st_listbox, 'st')]
+        for lb, key in lists:
+            selection = lb.curselection()
+            yview = lb.yview()
+            lb.delete(0, tk.END)
+            if result[key]:
+                lb.insert(tk.END, *result[key])
             # Restore selection
-            for idx in s['selection']:
+            for idx in selection:
                 if idx < lb.size():
                     lb.selection_set(idx)
             # Restore scroll position
-            lb.yview_moveto(s['yview'][0])
+            lb.yview_moveto(yview[0])
+
+        # URL lists are swapped together with the rows so listbox indices always map correctly
+        self.pl_urls = result['pl_urls']
+        self.al_urls = result['al_urls']
+        self.ar_urls = result['ar_urls']
+        self.st_urls = result['st_urls']
 
     def reset_update_status(self):
         self.config['last_updated'] = {}
@@ -770,6 +834,45 @@ class PlaylistApp:
 
         threading.Thread(target=_check_and_add, daemon=True).start()
 
+    def find_duplicate_files(self):
+        """Scans the library for identical files in the background and offers to merge them"""
+        from core.library import find_library_duplicates, merge_library_duplicates
+        self.dedup_btn.config(state="disabled")
+
+        def finish():
+            self.dedup_btn.config(state="normal")
+            self.refresh_url_list()
+            self.update_stats_ui()
+
+        def confirm(plan):
+            from tkinter import messagebox
+            duplicates = [d for _keeper, dups in plan for d in dups]
+            size_mb = sum(os.path.getsize(d) for d in duplicates if os.path.exists(d)) / (1024 * 1024)
+            if not messagebox.askyesno(_('dedup_confirm_title'), _('dedup_confirm_msg', len(duplicates), size_mb)):
+                self.dedup_btn.config(state="normal")
+                return
+            threading.Thread(target=merge, args=(plan,), daemon=True).start()
+
+        def merge(plan):
+            try:
+                merge_library_duplicates(self.config, plan, self.log)
+            except Exception as e:
+                self.log(_('dedup_error', e))
+            self.root.after(0, finish)
+
+        def scan():
+            try:
+                plan = find_library_duplicates(self.config, self.log)
+            except Exception as e:
+                self.log(_('dedup_error', e))
+                plan = []
+            if plan:
+                self.root.after(0, lambda: confirm(plan))
+            else:
+                self.root.after(0, lambda: self.dedup_btn.config(state="normal"))
+
+        threading.Thread(target=scan, daemon=True).start()
+
     def deduplicate_urls(self):
         """Removes duplicate Spotify URLs by normalizing them and keeping only the first occurrence."""
         urls = self.config.get('spotify_urls', [])
@@ -886,6 +989,7 @@ class PlaylistApp:
     def run_cancel(self):
         if messagebox.askyesno(_('cancel_confirm_title'), _('cancel_confirm_msg')):
             self.stop_event.set()
+            self.export_stop_event.set()
             self.pause_event.set() # Unpause if it was paused to let it exit
             self.cancel_btn.config(state="disabled", text=_('loading'))
             self.log(_('cancelling'))
@@ -934,20 +1038,9 @@ class PlaylistApp:
         self.root.after(0, lambda: self.speed_label.config(text="準備就緒"))
         self.root.after(0, lambda: self.progress_label.config(text=""))
         
-        # Final refresh with updated audio cache
-        def final_refresh():
-            # Get fresh audio files list after download completion
-            import glob
-            import os
-            library_path = self.config['library_path']
-            search_pattern = os.path.join(library_path, "**", "*")
-            all_files = glob.glob(search_pattern, recursive=True)
-            audio_files_cache = [f for f in all_files if f.lower().endswith(('.mp3', '.m4a', '.flac', '.wav', '.webm'))]
-            
-            self.refresh_url_list(audio_files_cache)
-            self.update_stats_ui(audio_files_cache)
-        
-        self.root.after(0, final_refresh)
+        # Final refresh: without a cache both workers load the fresh library index themselves
+        self.root.after(0, self.refresh_url_list)
+        self.root.after(0, self.update_stats_ui)
         
         # --- Orphaned Playlists & Backups Cleanup ---
         try:
@@ -1054,10 +1147,6 @@ class PlaylistApp:
         files = glob.glob(os.path.join(playlists_path, "*.m3u8")) + \
                 glob.glob(os.path.join(playlists_path, "*.m3u")) + \
                 glob.glob(os.path.join(playlists_path, "*.txt"))
-        
-        # New: Check completeness first
-        from core.library import get_playlist_completeness_report
-        report = get_playlist_completeness_report(files, self.config['library_path'])
 
         cb_frame = tk.Frame(win)
         cb_frame.pack(fill='both', expand=True, padx=10)
@@ -1073,6 +1162,54 @@ class PlaylistApp:
         
         self.export_files_map = {}
         self.completeness_map = {} # Map index to (is_complete, missing, total)
+        self.export_lb.insert(tk.END, _('loading'))
+
+        # Export target: empty keeps the default USB_Output folder, or pick a USB drive directly
+        target_frame = tk.Frame(win)
+        target_frame.pack(fill='x', padx=10, pady=5)
+        tk.Label(target_frame, text=_('export_target_label'), font=("Microsoft JhengHei", 9)).pack(side="left")
+        self.export_target_var = tk.StringVar(value=self.config.get('export_target') or self.config['export_path'])
+        tk.Entry(target_frame, textvariable=self.export_target_var, state="readonly", font=("Consolas", 9)).pack(side="left", fill="x", expand=True, padx=5)
+
+        def browse_target():
+            from tkinter import filedialog
+            new_path = filedialog.askdirectory(parent=win, initialdir=self.export_target_var.get())
+            if new_path:
+                self.export_target_var.set(new_path)
+
+        tk.Button(target_frame, text="...", command=browse_target, width=3).pack(side="left")
+
+        # 4. Buttons Section
+        btn_frame = tk.Frame(win)
+        btn_frame.pack(fill='x', padx=10, pady=5)
+        
+        tk.Button(btn_frame, text=_('export_all'), command=lambda: self.export_lb.selection_set(0, tk.END), font=("Microsoft JhengHei", 9)).pack(side="left", padx=5)
+        tk.Button(btn_frame, text=_('export_none'), command=lambda: self.export_lb.selection_clear(0, tk.END), font=("Microsoft JhengHei", 9)).pack(side="left", padx=5)
+ 
+        btn = tk.Button(win, text=_('start_export_btn'), command=lambda: self.start_selective_export(win), bg="#ffd0d0", font=("Microsoft JhengHei", 11, "bold"), state="disabled")
+        btn.pack(fill='x', padx=20, pady=10)
+
+        # Completeness needs the library index, so it is checked off the Tk thread
+        def _bg_report():
+            from core.library import get_playlist_completeness_report
+            try:
+                report = get_playlist_completeness_report(files, self.config['library_path'])
+            except Exception as e:
+                self.log(f"Completeness Error: {e}")
+                report = {}
+            try:
+                self.root.after(0, lambda: self._apply_export_report(win, btn, files, report))
+            except RuntimeError:
+                pass
+
+        threading.Thread(target=_bg_report, daemon=True).start()
+
+    def _apply_export_report(self, win, btn, files, report):
+        """Fills the export list once the completeness report is ready (Tk thread only)"""
+        if not win.winfo_exists():
+            return  # Window closed while the report was computed
+
+        self.export_lb.delete(0, tk.END)
         for i, f in enumerate(files):
             name = os.path.basename(f)
             is_complete, missing, total = report.get(f, (True, 0, 0))
@@ -1084,16 +1221,7 @@ class PlaylistApp:
             self.export_lb.insert(tk.END, display_name)
             self.export_files_map[i] = f
             self.completeness_map[i] = (is_complete, missing, total)
-
-        # 4. Buttons Section
-        btn_frame = tk.Frame(win)
-        btn_frame.pack(fill='x', padx=10, pady=5)
-        
-        tk.Button(btn_frame, text=_('export_all'), command=lambda: self.export_lb.selection_set(0, tk.END), font=("Microsoft JhengHei", 9)).pack(side="left", padx=5)
-        tk.Button(btn_frame, text=_('export_none'), command=lambda: self.export_lb.selection_clear(0, tk.END), font=("Microsoft JhengHei", 9)).pack(side="left", padx=5)
- 
-        btn = tk.Button(win, text=_('start_export_btn'), command=lambda: self.start_selective_export(win), bg="#ffd0d0", font=("Microsoft JhengHei", 11, "bold"))
-        btn.pack(fill='x', padx=20, pady=10)
+        btn.config(state="normal")
         
     def start_selective_export(self, win):
         from tkinter import messagebox
@@ -1112,15 +1240,27 @@ class PlaylistApp:
                 return
 
         selected_files = [self.export_files_map[i] for i in selections]
+        target = self.export_target_var.get()
+        target = '' if os.path.normpath(target) == os.path.normpath(self.config['export_path']) else target
+        if target != self.config.get('export_target', ''):
+            from utils.config import save_config
+            self.config['export_target'] = target
+            save_config(self.config)
         win.destroy()
         
         threading.Thread(target=self._export_thread_selective, args=(selected_files,), daemon=True).start()
 
     def _export_thread_selective(self, selected_files):
+        # The cancel button stops the export through its own event, leaving a running update alone
+        self.export_stop_event.clear()
+        self.root.after(0, lambda: self.cancel_btn.config(state="normal"))
         try:
-            export_usb_logic(self.config, selected_files, self.log)
+            export_usb_logic(self.config, selected_files, self.log, self.update_progress, self.export_stop_event)
         except Exception as e:
              self.log(_('export_error', e))
+        finally:
+            if self.update_btn.cget('state') != 'disabled':
+                self.root.after(0, lambda: self.cancel_btn.config(state="disabled", text=_('cancel_btn')))
 
     # --- Player Logic ---
     def on_listbox_select(self, event):
@@ -1141,7 +1281,7 @@ class PlaylistApp:
         if not name: return
         
         # Load playlist into player
-        threading.Thread(target=self.load_playlist_into_player, args=(name,), daemon=True).start()
+        self.load_playlist_into_player(name)
         
         # Automatically switch to Player tab
         try:
@@ -1149,44 +1289,72 @@ class PlaylistApp:
         except: pass
 
     def load_playlist_into_player(self, pl_name):
+        """Resolves a playlist's songs on a background worker and starts playback via root.after.
+
+        Only the newest request is applied, so quickly clicking through playlists
+        never lets a slower, older lookup replace the current one.
+        """
+        self.player_load_seq += 1
+        seq = self.player_load_seq
+        playlists_path = self.config['playlists_path']
+        library_path = self.config['library_path']
+
+        def _bg_load():
+            try:
+                valid_songs = self._resolve_playlist_songs(pl_name, playlists_path, library_path)
+            except Exception as e:
+                self.log(f"Player Error: {e}")
+                return
+            if not valid_songs:
+                return
+            try:
+                self.root.after(0, lambda: self._apply_player_playlist(seq, valid_songs))
+            except RuntimeError:
+                pass
+
+        threading.Thread(target=_bg_load, daemon=True).start()
+
+    def _resolve_playlist_songs(self, pl_name, playlists_path, library_path):
+        """Returns the existing library paths of a playlist's songs (runs on a worker)"""
         from core.library import parse_playlist
         # Try .m3u8 then .m3u
         pl_file = None
         for ext in ['.m3u8', '.m3u']:
-            test_file = os.path.join(self.config['playlists_path'], f"{pl_name}{ext}")
+            test_file = os.path.join(playlists_path, f"{pl_name}{ext}")
             if os.path.exists(test_file):
                 pl_file = test_file
                 break
         
-        if not pl_file: return
+        if not pl_file: return []
         
         song_names = parse_playlist(pl_file)
-        if not song_names: return
+        if not song_names: return []
         
         # Find actual file paths
-        from core.library import build_library_index, find_song_in_library
-        library_path = self.config['library_path']
-        search_pattern = os.path.join(library_path, "**", "*")
-        all_files = glob.glob(search_pattern, recursive=True)
-        audio_cache = [f for f in all_files if f.lower().endswith(('.mp3', '.m4a', '.flac', '.wav', '.webm'))]
-        lib_index = build_library_index(audio_cache)
+        from core.library import load_library_index, find_song_in_library
+        lib_index = load_library_index(library_path)
         
         valid_songs = []
         for s in song_names:
             path = find_song_in_library(s, lib_index)
             if path and os.path.exists(path):
                 valid_songs.append(path)
+        return valid_songs
+
+    def _apply_player_playlist(self, seq, valid_songs):
+        """Swaps in a resolved playlist and starts playing it (Tk thread only)"""
+        if seq != self.player_load_seq:
+            return  # Another playlist was picked meanwhile
+
+        self.original_playlist_order = list(valid_songs)
+        self.current_playlist_songs = list(valid_songs)
         
-        if valid_songs:
-            self.original_playlist_order = list(valid_songs)
-            self.current_playlist_songs = list(valid_songs)
-            
-            if self.shuffle_var.get():
-                import random
-                random.shuffle(self.current_playlist_songs)
-            
-            self.current_song_idx = 0
-            self.root.after(0, lambda: self.play_song(self.current_playlist_songs[0]))
+        if self.shuffle_var.get():
+            import random
+            random.shuffle(self.current_playlist_songs)
+        
+        self.current_song_idx = 0
+        self.play_song(self.current_playlist_songs[0])
 
     def play_song(self, song_path):
         try:
@@ -1216,7 +1384,11 @@ class PlaylistApp:
             self.load_lyrics(song_path)
             self.refresh_lyrics()
         except Exception as e:
-            self.log(f"Playback Error: {e}")
+            if os.path.splitext(song_path)[1].lower() in ('.m4a', '.aac', '.webm'):
+                # pygame's mixer has no AAC/WebM decoder; files kept by the native format mode may hit this
+                self.log(_('player_unsupported', os.path.basename(song_path)))
+            else:
+                self.log(f"Playback Error: {e}")
 
     def load_lyrics(self, song_path):
         self.current_lyrics = []
@@ -47,6 +47,12 @@ class SettingsWindow:
         self.lang_var = tk.StringVar(value=self.config.get('language', 'zh-TW'))
         lang_cb = ttk.Combobox(lf_general, textvariable=self.lang_var, values=['zh-TW', 'en'], state="readonly", width=15)
         lang_cb.grid(row=0, column=1, sticky="w", padx=5)
+
+        tk.Label(lf_general, text="音訊格式 (Audio Format):", font=("Microsoft JhengHei", 10)).grid(row=1, column=0, sticky="w", padx=5, pady=(5, 0))
+        self.format_var = tk.StringVar(value=self.config.get('audio_format', 'mp3'))
+        # 'native' keeps YouTube's original opus/aac stream without re-encoding
+        format_cb = ttk.Combobox(lf_general, textvariable=self.format_var, values=['mp3', 'flac', 'm4a', 'native'], state="readonly", width=15)
+        format_cb.grid(row=1, column=1, sticky="w", padx=5, pady=(5, 0))
         
         # 2. Storage Section
         lf_storage = tk.LabelFrame(container, text="儲存 (Storage)", font=("Microsoft JhengHei", 10, "bold"), padx=10, pady=10)
@@ -94,6 +100,12 @@ class SettingsWindow:
         self.retry_var = tk.BooleanVar(value=self.config.get('retry_failed_lyrics', False))
         tk.Checkbutton(lf_adv, text="重試失敗歌曲 (Retry Failed Scans)", variable=self.retry_var, font=("Microsoft JhengHei", 10)).pack(anchor="w", padx=5)
 
+        self.link_export_var = tk.BooleanVar(value=self.config.get('export_mode', 'copy') == 'link')
+        tk.Checkbutton(lf_adv, text="匯出使用連結，不佔額外空間 (Link Export)", variable=self.link_export_var, font=("Microsoft JhengHei", 10)).pack(anchor="w", padx=5)
+
+        self.fingerprint_var = tk.BooleanVar(value=self.config.get('fingerprint_enabled', False))
+        tk.Checkbutton(lf_adv, text="以音訊指紋找出相同錄音 (Audio Fingerprints)", variable=self.fingerprint_var, font=("Microsoft JhengHei", 10)).pack(anchor="w", padx=5)
+
         # Buttons
         btn_frame = tk.Frame(container)
         btn_frame.pack(side="bottom", fill="x", pady=10)
@@ -116,6 +128,8 @@ class SettingsWindow:
         new_threads = self.thread_var.get()
         new_lyrics = self.lyrics_var.get()
         new_retry = self.retry_var.get()
+        new_format = self.format_var.get()
+        new_export_mode = 'link' if self.link_export_var.get() else 'copy'
         
         lang_changed = new_lang != self.config.get('language')
         path_changed = new_path != self.config.get('base_path')
@@ -126,6 +140,9 @@ class SettingsWindow:
         self.config['max_threads'] = new_threads
         self.config['enable_retroactive_lyrics'] = new_lyrics
         self.config['retry_failed_lyrics'] = new_retry
+        self.config['audio_format'] = new_format
+        self.config['export_mode'] = new_export_mode
+        self.config['fingerprint_enabled'] = self.fingerprint_var.get()
         
         # Special handling for path change
         if path_changed:
@@ -137,7 +154,7 @@ class SettingsWindow:
         if lang_changed:
             I18N.set_language(new_lang)
 
-        save_config(self.config)
+        save_config(self.config, immediate=True)
         
         # Callback to main app to refresh UI
         if self.on_close:
@@ -1,5 +1,7 @@
 import tkinter as tk
+import multiprocessing
 from gui.app import PlaylistApp
+from utils.config import flush_config
 import sys
 import os
 
@@ -10,6 +12,11 @@ def main():
     root = tk.Tk()
     app = PlaylistApp(root)
     root.mainloop()
+    
+    # Write any debounced config changes before exiting
+    flush_config()
 
 if __name__ == "__main__":
+    # Fingerprinting uses worker processes, which frozen builds must be able to spawn
+    multiprocessing.freeze_support()
     main()
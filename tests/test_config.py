@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from utils import config as config_module
+
+
+class DebouncedConfigTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        config_dir = os.path.join(self.tmp.name, 'data')
+        self.config_file = os.path.join(config_dir, 'config.json')
+        self.writes = []
+
+        def record_write(path, data, encoding=None):
+            self.writes.append(json.loads(data))
+
+        for patcher in (mock.patch.object(config_module, 'CONFIG_DIR', config_dir),
+                        mock.patch.object(config_module, 'CONFIG_FILE', self.config_file),
+                        mock.patch.object(config_module, 'FLUSH_DELAY', 0.1),
+                        mock.patch.object(config_module, '_last_written_hash', None),
+                        mock.patch.object(config_module, 'write_file_atomic', side_effect=record_write)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(config_module.flush_config)
+
+    def test_saves_in_a_row_are_coalesced_into_one_write(self):
+        config = {'n': 0}
+        for i in range(10):
+            config['n'] = i
+            config_module.save_config(config)
+        self.assertEqual(self.writes, [])
+        time.sleep(0.5)
+        self.assertEqual(self.writes, [{'n': 9}])
+
+    def test_immediate_save_writes_right_away(self):
+        config_module.save_config({'a': 1}, immediate=True)
+        self.assertEqual(self.writes, [{'a': 1}])
+
+    def test_unchanged_config_is_not_rewritten(self):
+        config_module.save_config({'a': 1}, immediate=True)
+        config_module.save_config({'a': 1}, immediate=True)
+        self.assertEqual(len(self.writes), 1)
+
+    def test_flush_without_pending_changes_does_nothing(self):
+        self.assertFalse(config_module.flush_config())
+        self.assertEqual(self.writes, [])
+
+    def test_explicit_flush_writes_pending_changes_and_cancels_timer(self):
+        config_module.save_config({'a': 2})
+        self.assertTrue(config_module.flush_config())
+        time.sleep(0.3)
+        self.assertEqual(self.writes, [{'a': 2}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from core import dedup
+
+
+class FindDuplicatesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.body = os.urandom(3 * dedup.PARTIAL_CHUNK)
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_identical_files_are_grouped(self):
+        a = self.write('a.mp3', self.body)
+        b = self.write('b.mp3', self.body)
+        c = self.write('c.mp3', self.body + b'longer')
+        self.assertEqual(dedup.find_duplicates([a, b, c]), [sorted([a, b])])
+
+    def test_unique_sizes_are_never_read(self):
+        paths = [self.write(f'{i}.mp3', b'x' * (i + 1)) for i in range(5)]
+        with mock.patch.object(dedup, 'partial_hash') as partial, mock.patch.object(dedup, 'full_hash') as full:
+            self.assertEqual(dedup.find_duplicates(paths), [])
+        partial.assert_not_called()
+        full.assert_not_called()
+
+    def test_different_ends_stop_at_the_partial_hash(self):
+        a = self.write('a.mp3', self.body)
+        b = self.write('b.mp3', self.body[:-1] + bytes([self.body[-1] ^ 0xFF]))
+        with mock.patch.object(dedup, 'full_hash', wraps=dedup.full_hash) as full:
+            self.assertEqual(dedup.find_duplicates([a, b]), [])
+        full.assert_not_called()
+
+    def test_same_ends_different_middle_are_split_by_the_full_hash(self):
+        middle = len(self.body) // 2
+        a = self.write('a.mp3', self.body)
+        b = self.write('b.mp3', self.body[:middle] + bytes([self.body[middle] ^ 0xFF]) + self.body[middle + 1:])
+        self.assertEqual(dedup.partial_hash(a, len(self.body)), dedup.partial_hash(b, len(self.body)))
+        self.assertEqual(dedup.find_duplicates([a, b]), [])
+
+    def test_keeper_is_the_copy_playlists_point_at(self):
+        a = self.write('Artist - Song.mp3', self.body)
+        b = self.write('Artist - Song (1).mp3', self.body)
+        os.utime(a, (2000, 2000))
+        os.utime(b, (1000, 1000))
+        playlists = os.path.join(self.tmp.name, 'Playlists')
+        os.makedirs(playlists)
+        with open(os.path.join(playlists, 'Mix.m3u8'), 'w', encoding='utf-8') as f:
+            f.write("#EXTM3U\n#EXTINF:-1,Artist - Song\n../Artist - Song.mp3\n")
+        self.assertEqual(dedup.plan_merge(dedup.find_duplicates([a, b]), playlists), [(a, [b])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from core import exporter, library_db
+from core.library import export_usb_logic
+
+OLD = 1_600_000_000
+
+
+def write(path, data=b'x'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+class ManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+
+    def test_remove_stale_only_deletes_unplanned_manifest_files(self):
+        for rel in ('A/one.mp3', 'A/two.mp3', 'B/three.mp3', 'Photos/mine.jpg'):
+            write(os.path.join(self.root, rel))
+        exporter.save_manifest(self.root, ['A/one.mp3', 'A/two.mp3', 'B/three.mp3'])
+
+        self.assertEqual(exporter.remove_stale(self.root, ['A/one.mp3']), 2)
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'A', 'one.mp3')))
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'A', 'two.mp3')))
+        # Emptied folders are pruned, files the export never wrote are left alone
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'B')))
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'Photos', 'mine.jpg')))
+
+    def test_adopt_existing_files_seeds_a_missing_manifest_once(self):
+        write(os.path.join(self.root, 'Old', 'song.mp3'))
+        self.assertEqual(exporter.adopt_existing_files(self.root), 1)
+        self.assertEqual(exporter.load_manifest(self.root), {os.path.join('Old', 'song.mp3')})
+        write(os.path.join(self.root, 'Later', 'other.mp3'))
+        self.assertEqual(exporter.adopt_existing_files(self.root), 0)
+        self.assertEqual(exporter.load_manifest(self.root), {os.path.join('Old', 'song.mp3')})
+
+
+class SyncExportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        base = self.tmp.name
+        self.library = os.path.join(base, 'Music')
+        self.playlists = os.path.join(base, 'Playlists')
+        self.export = os.path.join(base, 'USB_Output')
+        for patcher in (mock.patch.object(library_db, 'DB_FILE', os.path.join(base, 'index.db')),
+                        mock.patch('utils.helpers.open_folder', return_value=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        write(os.path.join(self.library, 'Artist - One.mp3'), b'1')
+        write(os.path.join(self.library, 'Artist - Two.mp3'), b'22')
+        os.utime(self.library, (OLD, OLD))
+        self.config = {'library_path': self.library, 'export_path': self.export,
+                       'export_target': '', 'export_sync': True, 'export_workers': 2}
+
+    def playlist(self, name, songs):
+        path = os.path.join(self.playlists, name + '.txt')
+        write(path, '\n'.join(songs).encode('utf-8'))
+        return path
+
+    def run_export(self, playlists, config=None):
+        return export_usb_logic(config or self.config, playlists, lambda msg: None)
+
+    def exported(self, root=None):
+        root = root or self.export
+        return sorted(os.path.relpath(os.path.join(d, f), root)
+                      for d, _, files in os.walk(root) for f in files if not f.startswith('.'))
+
+    def test_deselected_playlist_is_removed_on_next_sync(self):
+        mix = self.playlist('Mix', ['Artist - One'])
+        other = self.playlist('Other', ['Artist - Two'])
+        self.assertTrue(self.run_export([mix, other]))
+        self.assertEqual(self.exported(), [os.path.join('Mix', 'Artist - One.mp3'),
+                                           os.path.join('Other', 'Artist - Two.mp3')])
+        self.assertTrue(self.run_export([mix]))
+        self.assertEqual(self.exported(), [os.path.join('Mix', 'Artist - One.mp3')])
+
+    def test_pre_manifest_default_folder_is_cleaned_up(self):
+        # Left behind by an export from before manifests existed
+        write(os.path.join(self.export, 'Gone', 'Old Song.mp3'))
+        write(os.path.join(self.export, 'Mix', 'Removed From Mix.mp3'))
+        mix = self.playlist('Mix', ['Artist - One'])
+        self.assertTrue(self.run_export([mix]))
+        self.assertEqual(self.exported(), [os.path.join('Mix', 'Artist - One.mp3')])
+
+    def test_custom_target_keeps_unrelated_files(self):
+        target = os.path.join(self.tmp.name, 'Drive')
+        write(os.path.join(target, 'Documents', 'notes.txt'))
+        mix = self.playlist('Mix', ['Artist - One'])
+        self.assertTrue(self.run_export([mix], dict(self.config, export_target=target)))
+        self.assertEqual(self.exported(target), [os.path.join('Documents', 'notes.txt'),
+                                                 os.path.join('Mix', 'Artist - One.mp3')])
+
+
+if __name__ == '__main__':
+    unittest.main()
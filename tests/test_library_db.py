@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import core.library
+from core import library_db
+
+OLD = 1_600_000_000  # Well outside the racy window
+
+
+class ScanLibraryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(library_db, 'DB_FILE', os.path.join(self.tmp.name, 'index.db'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.lib = os.path.join(self.tmp.name, 'Music')
+        self.sub = os.path.join(self.lib, 'Album')
+        os.makedirs(self.sub)
+        self.write(os.path.join(self.lib, 'Artist - One.mp3'), b'1')
+        self.write(os.path.join(self.sub, 'Artist - Two.flac'), b'22')
+        self.write(os.path.join(self.lib, 'cover.jpg'), b'x')
+        self.write(os.path.join(self.lib, '.hidden.mp3'), b'x')
+        self.age_dirs(OLD)
+
+    def write(self, path, data, mtime=OLD):
+        with open(path, 'wb') as f:
+            f.write(data)
+        os.utime(path, (mtime, mtime))
+
+    def age_dirs(self, mtime):
+        for d in (self.sub, self.lib):
+            os.utime(d, (mtime, mtime))
+
+    def scan(self):
+        return {os.path.relpath(e.path, self.lib): e for e in library_db.scan_library(self.lib)}
+
+    def test_lists_audio_files_with_tokens(self):
+        entries = self.scan()
+        self.assertEqual(sorted(entries), ['Album/Artist - Two.flac'.replace('/', os.sep), 'Artist - One.mp3'])
+        self.assertEqual(entries['Artist - One.mp3'].tokens, ('artist', 'one'))
+
+    def test_unchanged_directories_are_not_relisted_or_retokenized(self):
+        first = self.scan()
+        with mock.patch('os.scandir', wraps=os.scandir) as scandir, \
+                mock.patch.object(core.library, 'get_normalized_tokens',
+                                  wraps=core.library.get_normalized_tokens) as tokenize:
+            second = self.scan()
+        self.assertEqual(second, first)
+        scandir.assert_not_called()
+        tokenize.assert_not_called()
+
+    def test_file_rewritten_in_place_is_restatted(self):
+        self.scan()
+        path = os.path.join(self.sub, 'Artist - Two.flac')
+        self.write(path, b'rewritten', mtime=OLD + 10)
+        self.age_dirs(OLD)  # Directory mtime unchanged, as for an in-place rewrite
+        entry = self.scan()[os.path.relpath(path, self.lib)]
+        self.assertEqual((entry.size, entry.mtime), (len(b'rewritten'), OLD + 10))
+
+    def test_added_and_removed_files_in_changed_directory(self):
+        self.scan()
+        os.remove(os.path.join(self.sub, 'Artist - Two.flac'))
+        self.write(os.path.join(self.sub, 'Artist - Three.mp3'), b'333')
+        os.utime(self.sub, (OLD + 5, OLD + 5))
+        entries = self.scan()
+        self.assertIn(os.path.join('Album', 'Artist - Three.mp3'), entries)
+        self.assertNotIn(os.path.join('Album', 'Artist - Two.flac'), entries)
+        self.assertEqual(entries[os.path.join('Album', 'Artist - Three.mp3')].tokens, ('artist', 'three'))
+
+    def test_racy_directory_is_relisted(self):
+        os.utime(self.lib, None)  # mtime "now": may still change within the same tick
+        self.scan()
+        with mock.patch('os.scandir', wraps=os.scandir) as scandir:
+            self.scan()
+        listed = [os.path.normpath(c.args[0]) for c in scandir.call_args_list]
+        self.assertEqual(listed, [os.path.normpath(self.lib)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from core import library_db
+from core.library import (LibraryIndex, load_library_index, resolve_song, export_usb_logic,
+                          get_playlist_completeness_report)
+
+
+class FuzzyMatchTest(unittest.TestCase):
+    def setUp(self):
+        self.index = LibraryIndex([
+            '/lib/Artist - Song Title Part 1.mp3',
+            '/lib/Beethoven - Symphony No. 5.mp3',
+            '/lib/Band - Track 2009 Remaster.mp3',
+        ])
+
+    def test_different_part_number_is_not_a_match(self):
+        path, _score, is_fuzzy = self.index.find_match('Artist - Song Title Part 2', 0.85)
+        self.assertIsNone(path)
+        self.assertFalse(is_fuzzy)
+
+    def test_different_symphony_number_is_not_a_match(self):
+        path, _score, is_fuzzy = self.index.find_match('Beethoven - Symphony No. 9', 0.85)
+        self.assertIsNone(path)
+        self.assertFalse(is_fuzzy)
+
+    def test_filler_and_year_tokens_may_differ(self):
+        path, score, is_fuzzy = self.index.find_match('Band - Track', 0.85)
+        self.assertEqual(path, '/lib/Band - Track 2009 Remaster.mp3')
+        self.assertTrue(is_fuzzy)
+        self.assertEqual(score, 1.0)
+
+
+
+class FuzzyAliasTest(unittest.TestCase):
+    """An accepted fuzzy hit must be seen by every exact resolver, not only the download check"""
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        base = self.tmp.name
+        self.library = os.path.join(base, 'Music')
+        self.export = os.path.join(base, 'USB_Output')
+        os.makedirs(self.library)
+        for patcher in (mock.patch.object(library_db, 'DB_FILE', os.path.join(base, 'index.db')),
+                        mock.patch('utils.helpers.open_folder', return_value=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.track = os.path.join(self.library, 'Band - Track 2009 Remaster.mp3')
+        with open(self.track, 'wb') as f:
+            f.write(b'audio')
+        os.utime(self.library, (1_600_000_000, 1_600_000_000))
+        self.playlist = os.path.join(base, 'Mix.txt')
+        with open(self.playlist, 'w', encoding='utf-8') as f:
+            f.write('Band - Track\n')
+
+    def test_fuzzy_matched_track_is_exported_and_counted_complete(self):
+        path, _score, is_fuzzy = resolve_song('Band - Track', load_library_index(self.library), 0.85, self.library)
+        self.assertEqual(path, self.track)
+        self.assertTrue(is_fuzzy)
+
+        self.assertEqual(get_playlist_completeness_report([self.playlist], self.library),
+                         {self.playlist: (True, 0, 1)})
+        config = {'library_path': self.library, 'export_path': self.export, 'export_target': ''}
+        self.assertTrue(export_usb_logic(config, [self.playlist], lambda msg: None))
+        self.assertTrue(os.path.exists(os.path.join(self.export, 'Mix', os.path.basename(self.track))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from core import lyrics, lyrics_store
+from core.downloader import download_lyrics
+
+INFO = {'artist': 'Artist', 'title': 'Song', 'album': None, 'duration': 200}
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise lyrics.requests.HTTPError(f"{self.status_code}", response=self)
+
+
+class FakeSession:
+    """Answers /api/get with get_status/get_payload and /api/search with one synced hit"""
+    def __init__(self, get_status=200, get_payload=None):
+        self.get_status = get_status
+        self.get_payload = get_payload
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        endpoint = url.rsplit('/api', 1)[1]
+        self.calls.append(endpoint)
+        if endpoint == '/get':
+            return FakeResponse(self.get_status, self.get_payload)
+        return FakeResponse(200, [{'syncedLyrics': '[00:01.00] from search'}])
+
+
+class LrclibLookupTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.lrc_path = os.path.join(self.tmp.name, 'Artist - Song.lrc')
+        for patcher in (mock.patch.object(lyrics_store, 'DB_FILE', os.path.join(self.tmp.name, 'lyrics.db')),
+                        mock.patch.object(lyrics, 'read_track_info', lambda name, path=None: self.info)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.info = INFO
+
+    def run_lookup(self, session):
+        with mock.patch.object(lyrics, 'get_session', lambda: session):
+            found = download_lyrics('Artist - Song', self.lrc_path, lambda msg: None)
+        with open(self.lrc_path, encoding='utf-8') as f:
+            return found, f.read()
+
+    def test_exact_hit_skips_search(self):
+        session = FakeSession(get_payload={'syncedLyrics': '[00:01.00] exact'})
+        self.assertEqual(self.run_lookup(session), (True, '[00:01.00] exact'))
+        self.assertEqual(session.calls, ['/get'])
+
+    def test_get_miss_falls_back_to_search(self):
+        session = FakeSession(get_status=404, get_payload={'code': 404})
+        self.assertEqual(self.run_lookup(session), (True, '[00:01.00] from search'))
+        self.assertEqual(session.calls, ['/get', '/search'])
+
+    def test_failing_get_falls_back_to_search(self):
+        session = FakeSession(get_status=500)
+        self.assertEqual(self.run_lookup(session), (True, '[00:01.00] from search'))
+        self.assertEqual(session.calls, ['/get', '/search'])
+
+    def test_without_duration_only_search_is_used(self):
+        self.info = None
+        session = FakeSession(get_payload={'syncedLyrics': '[00:01.00] exact'})
+        self.assertEqual(self.run_lookup(session), (True, '[00:01.00] from search'))
+        self.assertEqual(session.calls, ['/search'])
+
+    def test_threaded_fetcher_uses_exact_lookup_first(self):
+        session = FakeSession(get_payload={'syncedLyrics': '[00:01.00] exact'})
+        results = []
+        with mock.patch.object(lyrics, 'get_session', lambda: session):
+            lyrics.ThreadedLyricsFetcher(rate_per_second=50).run(
+                [(0, 'Artist - Song', self.lrc_path, None)],
+                lambda key, name, path, result: results.append(result))
+        self.assertEqual((results[0].text, results[0].source), ('[00:01.00] exact', 'get'))
+        self.assertEqual(session.calls, ['/get'])
+
+
+if __name__ == '__main__':
+    unittest.main()
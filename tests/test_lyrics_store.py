@@ -0,0 +1,52 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from core import lyrics_store
+
+
+class LyricsStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(lyrics_store, 'DB_FILE', os.path.join(self.tmp.name, 'lyrics.db'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_lookup_by_sanitized_stem_finds_entry_stored_under_song_name(self):
+        lyrics_store.store_found('Artist - Song: Title?', '[00:01.00] la', 'get')
+        entries = lyrics_store.get_entries(['Artist - Song Title'])
+        self.assertEqual(entries['Artist - Song Title'][:2], (lyrics_store.STATUS_FOUND, '[00:01.00] la'))
+
+    def test_not_found_miss_expires_after_ttl(self):
+        lyrics_store.store_miss('Artist - Song', checked_at=1000.0)
+        status, _lrc, checked_at = lyrics_store.get_entries(['Artist - Song'])['Artist - Song']
+        self.assertTrue(lyrics_store.is_miss_fresh(status, checked_at, 3600, now=1000.0 + 3599))
+        self.assertFalse(lyrics_store.is_miss_fresh(status, checked_at, 3600, now=1000.0 + 3601))
+
+    def test_error_miss_expires_after_error_ttl(self):
+        lyrics_store.store_miss('Artist - Song', lyrics_store.STATUS_ERROR, checked_at=1000.0)
+        status, _lrc, checked_at = lyrics_store.get_entries(['Artist - Song'])['Artist - Song']
+        now = 1000.0 + lyrics_store.ERROR_TTL_SECONDS + 1
+        self.assertFalse(lyrics_store.is_miss_fresh(status, checked_at, 30 * 86400, now=now))
+
+    def test_found_entry_never_counts_as_fresh_miss(self):
+        self.assertFalse(lyrics_store.is_miss_fresh(lyrics_store.STATUS_FOUND, 1000.0, 3600, now=1001.0))
+
+    def test_rows_keyed_by_raw_name_are_rekeyed(self):
+        os.makedirs(self.tmp.name, exist_ok=True)
+        conn = sqlite3.connect(lyrics_store.DB_FILE)
+        conn.execute("CREATE TABLE lyrics (name TEXT PRIMARY KEY, status TEXT NOT NULL, lrc TEXT, source TEXT, "
+                     "query TEXT, fetched_at REAL, checked_at REAL NOT NULL)")
+        conn.execute("INSERT INTO lyrics (name, status, checked_at) VALUES (?, ?, ?)",
+                     ('Artist - Song', lyrics_store.STATUS_NOT_FOUND, 1000.0))
+        conn.commit()
+        conn.close()
+        entries = lyrics_store.get_entries(['artist - song'])
+        self.assertEqual(entries['artist - song'][0], lyrics_store.STATUS_NOT_FOUND)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from core import scheduler
+from core.scheduler import TokenBucket, DownloadScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(scheduler, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_up_to_capacity_then_refill_rate(self):
+        bucket = TokenBucket(rate_per_minute=60, capacity=3)
+        for _ in range(3):
+            self.assertTrue(bucket.acquire())
+        self.assertEqual(self.clock.now, 1000.0)
+        # One token per second once the burst is spent
+        self.assertTrue(bucket.acquire())
+        self.assertAlmostEqual(self.clock.now, 1001.0)
+
+    def test_refill_never_exceeds_capacity(self):
+        bucket = TokenBucket(rate_per_minute=60, capacity=2)
+        bucket.acquire()
+        bucket.acquire()
+        self.clock.now += 3600
+        bucket.acquire()
+        bucket.acquire()
+        start = self.clock.now
+        bucket.acquire()
+        self.assertAlmostEqual(self.clock.now - start, 1.0)
+
+    def test_stop_event_aborts_wait(self):
+        bucket = TokenBucket(rate_per_minute=1, capacity=1)
+        bucket.acquire()
+        stop = threading.Event()
+        stop.set()
+        self.assertFalse(bucket.acquire(stop))
+
+
+class DownloadSchedulerTest(unittest.TestCase):
+    def test_runs_every_item_and_survives_failing_jobs(self):
+        done = {}
+
+        def job(i, item):
+            if item == 'bad':
+                raise RuntimeError('boom')
+            return item.upper()
+
+        sched = DownloadScheduler(max_workers=3, rate_per_minute=6000, log_func=lambda msg: None)
+        finished = sched.run(['a', 'bad', 'c', 'd'], job,
+                             on_done=lambda i, item, result: done.__setitem__(i, result))
+        self.assertTrue(finished)
+        self.assertEqual(done, {0: 'A', 1: None, 2: 'C', 3: 'D'})
+
+    def test_stop_while_paused_returns_false(self):
+        stop, pause = threading.Event(), threading.Event()  # pause_event cleared = paused
+        threading.Timer(0.1, stop.set).start()
+        sched = DownloadScheduler(max_workers=2, rate_per_minute=6000, stop_event=stop, pause_event=pause)
+        started = []
+        start = time.monotonic()
+        self.assertFalse(sched.run(['a', 'b'], lambda i, item: started.append(item)))
+        self.assertEqual(started, [])
+        self.assertLess(time.monotonic() - start, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from core.library import get_normalized_tokens
+from core.library_db import LibraryEntry
+from core.stats import LibraryStats
+
+
+def entry(name, size, mtime):
+    return LibraryEntry(os.path.join('/lib', name), size, mtime, tuple(get_normalized_tokens(os.path.splitext(name)[0])))
+
+
+class IncrementalStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.entries = [entry(f'Artist - Song {i}.mp3', 1024 * (i + 1), 1_600_000_000 + i) for i in range(8)]
+
+    def playlist(self, name, songs, mtime):
+        path = os.path.join(self.tmp.name, name + '.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(songs))
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def fresh_snapshot(self, entries, pl_files):
+        stats = LibraryStats()
+        stats.sync_entries(entries)
+        stats.sync_playlists(pl_files)
+        return stats.snapshot()
+
+    def test_library_changes_match_a_full_recount(self):
+        stats = LibraryStats()
+        stats.sync_entries(self.entries)
+        changed = self.entries[2:] + [entry('Artist - New.mp3', 4096, 1_700_000_000)]
+        changed[0] = changed[0]._replace(size=99, mtime=1_650_000_000)
+        stats.sync_entries(changed)
+        self.assertEqual(stats.snapshot(), self.fresh_snapshot(changed, []))
+        self.assertEqual(stats.snapshot()['recent_5'][0][0], 'Artist - New.mp3')
+
+    def test_playlist_changes_match_a_full_recount(self):
+        stats = LibraryStats()
+        stats.sync_entries(self.entries)
+        a = self.playlist('A', ['Artist - Song 1', 'Artist - Song 2'], 1000)
+        b = self.playlist('B', ['Artist - Song 1', 'Song 2 - Artist'], 1000)
+        stats.sync_playlists([a, b])
+        snap = stats.snapshot()
+        self.assertEqual((snap['total_playlist_entries'], snap['unique_playlist_entries']), (4, 3))
+        # Song 1 listed twice, Song 2 twice under an equivalent name
+        self.assertEqual(snap['savings_mb'], (2048 + 3072) / (1024 * 1024))
+
+        b = self.playlist('B', ['Artist - Song 3'], 2000)
+        stats.sync_playlists([b])
+        self.assertEqual(stats.snapshot(), self.fresh_snapshot(self.entries, [b]))
+
+    def test_unchanged_playlist_is_not_reparsed(self):
+        stats = LibraryStats()
+        a = self.playlist('A', ['Artist - Song 1'], 1000)
+        stats.sync_playlists([a])
+        parsed = stats.playlists[a]
+        stats.sync_playlists([a])
+        self.assertIs(stats.playlists[a], parsed)
+
+
+if __name__ == '__main__':
+    unittest.main()
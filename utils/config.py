@@ -1,11 +1,24 @@
 import os
 import json
+import atexit
+import hashlib
+import threading
 from tkinter import filedialog, messagebox
+from utils.helpers import write_file_atomic
 
 # Store config in data folder for persistence
 CONFIG_DIR = 'data'
 CONFIG_FILE = os.path.join(CONFIG_DIR, 'config.json')
 
+# save_config only marks the config dirty; writes are coalesced and flushed after this many seconds
+FLUSH_DELAY = 2.0
+
+_state_lock = threading.Lock()
+_write_lock = threading.Lock()
+_pending_config = None
+_flush_timer = None
+_last_written_hash = None
+
 def load_config():
     config = {}
     # Ensure config directory exists
@@ -18,16 +31,33 @@ def load_config():
 
     # Set defaults for missing keys
     defaults = {
-        'audio_format': 'mp3',
+        'audio_format': 'mp3',  # mp3 / flac / m4a, or 'native' to keep the source codec
         'language': 'zh-TW',
         'spotify_urls': [],
         'url_names': {},
         'last_updated': {},
         'enable_retroactive_lyrics': True,  # Allow users to disable lyrics fetching
-        'max_threads': 4,
+        'max_threads': 4,  # Concurrent downloads and lyrics workers
+        'downloads_per_minute': 12,  # Shared rate limit for starting new downloads
+        'transcode_workers': 0,  # Parallel ffmpeg conversions (0 = one per CPU core)
         'setup_completed': False,
-        'retry_failed_lyrics': False,  # Default to skip failed lyrics
-        'lyrics_offsets': {}  # Per-song lyrics timing adjustments
+        'retry_failed_lyrics': False,  # Ignore remembered lyrics misses and look them up again
+        'lyrics_negative_ttl_days': 30,  # Days before a "no lyrics found" result is looked up again
+        'lyrics_concurrency': 8,  # lrclib requests in flight during lyrics backfill
+        'lyrics_requests_per_second': 5,  # Global request rate against lrclib
+        'lrclib_base_url': 'https://lrclib.net',  # lrclib API root (mirror or local stub)
+        'export_workers': 4,  # Parallel file copies during USB export
+        'dedup_workers': 4,  # Parallel hashing when looking for duplicate files
+        'fingerprint_enabled': False,  # Also look for the same recording under different names (needs fpcalc or ffmpeg)
+        'fingerprint_workers': 0,  # Fingerprint worker processes; 0 = one per CPU core
+        'fingerprint_threshold': 0.85,  # Minimum fingerprint similarity to report two files as the same recording
+        'export_mode': 'copy',  # 'copy', or 'link' to reflink/hardlink on the same volume (falls back to copy)
+        'export_sync': True,  # Update the export folder in place instead of wiping and recopying it
+        'export_verify_hash': False,  # Compare contents when size matches but mtime differs
+        'export_target': '',  # Export folder override (e.g. a USB drive); empty = USB_Output
+        'lyrics_offsets': {},  # Per-song lyrics timing adjustments
+        'enable_fuzzy_match': False,  # Resolve near-miss filenames instead of re-downloading
+        'fuzzy_match_threshold': 0.85  # Minimum similarity (0-1) for a fuzzy match
     }
     for key, value in defaults.items():
         config.setdefault(key, value)
@@ -54,18 +84,62 @@ def prompt_and_set_base_path(config):
     if new_path:
         config['base_path'] = new_path
         derive_paths(config)
-        save_config(config)
+        save_config(config, immediate=True)
         messagebox.showinfo(_('base_folder_set_title'), _('base_folder_set_msg', new_path))
         return True
     return False
 
-def save_config(config):
-    # Ensure config directory exists
-    if not os.path.exists(CONFIG_DIR):
-        os.makedirs(CONFIG_DIR)
-    
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=4, ensure_ascii=False)
+def save_config(config, immediate=False):
+    """Marks the config dirty and schedules a debounced flush.
+    Many updates in a row (per scraped URL, per lyrics offset nudge, ...) end up as one write.
+    Pass immediate=True for changes that must hit the disk right away."""
+    global _pending_config, _flush_timer
+    with _state_lock:
+        _pending_config = config
+        if not immediate and _flush_timer is None:
+            _flush_timer = threading.Timer(FLUSH_DELAY, flush_config)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+    if immediate:
+        flush_config()
+
+def flush_config():
+    """Writes pending config changes to disk (atomically). Returns True if the file was written."""
+    global _pending_config, _flush_timer, _last_written_hash
+    with _state_lock:
+        config = _pending_config
+        _pending_config = None
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+    if config is None:
+        return False
+
+    with _write_lock:
+        # The config dict may be mutated by a worker thread while serializing; retry in that case
+        for _ in range(3):
+            try:
+                data = json.dumps(config, indent=4, ensure_ascii=False)
+                break
+            except RuntimeError:
+                continue
+        else:
+            return False
+
+        # Dirty tracking: skip the write if nothing changed since the last flush
+        digest = hashlib.sha256(data.encode('utf-8')).hexdigest()
+        if digest == _last_written_hash:
+            return False
+
+        # Ensure config directory exists
+        if not os.path.exists(CONFIG_DIR):
+            os.makedirs(CONFIG_DIR)
+        write_file_atomic(CONFIG_FILE, data, encoding='utf-8')
+        _last_written_hash = digest
+        return True
+
+# Never lose a pending debounced write on interpreter shutdown
+atexit.register(flush_config)
 
 def ensure_dirs(config):
     if 'base_path' not in config or not config['base_path']:
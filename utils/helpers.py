@@ -1,4 +1,6 @@
+import os
 import re
+import hashlib
 from zhconv import convert
 
 def sanitize_filename(name):
@@ -20,3 +22,44 @@ def normalize_name(name):
     name = re.sub(r"[\(\[【\)\]】]", " ", name)
     # 3. Clean up
     return name.lower().strip().replace('_', ' ').replace('-', ' ').replace(' ', '')
+
+def write_file_atomic(path, content, encoding='utf-8'):
+    """Writes text to a temp file next to path and renames it into place"""
+    data = content.encode(encoding) if isinstance(content, str) else content
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            try: os.remove(tmp_path)
+            except OSError: pass
+
+def write_file_if_changed(path, content, encoding='utf-8'):
+    """Atomically writes content unless the file already holds the same bytes (compared by hash).
+    Returns True if the file was written."""
+    data = content.encode(encoding) if isinstance(content, str) else content
+    try:
+        with open(path, 'rb') as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(data).digest():
+                return False
+    except OSError:
+        pass
+    write_file_atomic(path, data)
+    return True
+
+def open_folder(path):
+    """Opens a folder in the platform's file manager. Returns False if that failed."""
+    import sys
+    import subprocess
+    try:
+        if os.name == 'nt':
+            os.startfile(path)
+        elif sys.platform == 'darwin':
+            subprocess.Popen(['open', path])
+        else:
+            subprocess.Popen(['xdg-open', path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return True
+    except (OSError, AttributeError):
+        return False
@@ -68,12 +68,15 @@ class I18N:
             'json_error': " -> JSON 解析錯誤: {0}",
             'html_fallback': " -> HTML Fallback: 找到 {0} 首歌曲",
             'saved_tracks': " -> 已儲存 {0} 首歌至 {1}",
+            'playlist_unchanged': " -> {0} 內容無變更，略過寫入",
+            'payload_unchanged': " -> {0} 資料未變更，沿用上次解析的曲目",
             'warn_no_tracks': " -> 警告: 找不到歌曲，網頁結構可能已更改",
             'scrape_error': " -> 爬蟲錯誤: {0}",
             'no_pl_files': "Playlists 資料夾中沒有歌單檔案。",
             'scanning_lib': "正在掃描本地音樂庫...",
             'building_index': " -> 正在建立索引以便快速搜尋...",
             'indexed_songs': " -> 已索引 {0} 首歌曲",
+            'fuzzy_match': " -> 近似比對: {0} -> {1} (相似度 {2:.2f})",
             'analyzing_missing': "正在分析需下載歌曲 (共 {0} 個歌單)...",
             'task_stopped': "--- 已停止任務 ---",
             'rename_msg': "  [更名] {0} -> {1}",
@@ -81,7 +84,7 @@ class I18N:
             'stats_complete': "\n統計完成: 共 {0} 首新歌需下載",
             'dl_start': "--- 開始下載流程 ---",
             'dl_progress': "({0}/{1}, 剩 {2}) [{3}] 下載: {4}",
-            'dl_rest': "[休息] 已成功下載 {0} 首，休息 15 秒以避免封鎖...",
+            'ydl_engine_stats': " -> 下載引擎: {0} 個實例處理 {1} 次下載，省下約 {2:.1f} 秒初始化時間",
             'lib_up_to_date': "太棒了! 您的音樂庫已是最新狀態，無需下載。",
             'update_complete': "\n更新完成!",
             'export_start': "\n=== 開始匯出至 USB 資料夾 ===",
@@ -90,12 +93,35 @@ class I18N:
             'copy_error': "  複製錯誤: {0}",
             'exported_count': " -> 已匯出 {0}/{1} 檔案",
             'export_done_open': "\n匯出完成，正在開啟資料夾...",
+            'export_progress': "  📦 已複製 {0:.1f}/{1:.1f} MB ({2:.1f} MB/s)",
+            'export_resume': " -> 偵測到未完成的匯出，繼續上次進度",
+            'export_skipped': " -> 略過 {0} 個已存在的檔案",
+            'export_removed': " -> 移除 {0} 個不再匯出的檔案",
+            'export_target_label': "匯出位置:",
+            'export_link_stats': " -> 連結匯出: {0} 個 reflink, {1} 個硬連結, {2} 個複製",
+            'export_cancelled': "⚠️ 匯出已取消，下次匯出將從中斷處繼續",
             'open_dir_error': "[錯誤] 無法開啟資料夾: {0}",
+            'job_error': "[錯誤] 下載工作失敗 ({0}): {1}",
+            'dedup_btn': "🔍 尋找重複檔案",
+            'dedup_start': "=== 掃描音樂庫中內容相同的檔案 ===",
+            'dedup_none': " -> 沒有找到重複的檔案",
+            'dedup_group': " -> 保留 {0}，重複: {1}",
+            'dedup_found': " -> 共 {0} 個重複檔案，佔用 {1:.1f} MB",
+            'dedup_confirm_title': "合併重複檔案",
+            'dedup_confirm_msg': "找到 {0} 個重複檔案 ({1:.1f} MB)。\n要刪除重複檔並將播放清單指向保留的檔案嗎？",
+            'dedup_merged': "✅ 已移除 {0} 個重複檔案，釋放 {1:.1f} MB，更新 {2} 個播放清單",
+            'dedup_error': "[錯誤] 重複檔案掃描失敗: {0}",
+            'fingerprint_start': "=== 比對音訊指紋 ===",
+            'fingerprint_progress': " -> 已計算 {0}/{1} 個檔案的指紋",
+            'fingerprint_unavailable': " -> [警告] 找不到 fpcalc 或 ffmpeg，略過音訊指紋比對",
+            'fingerprint_match': " -> 可能是同一首錄音: {0} ≈ {1} ({2:.0%})",
+            'fingerprint_none': " -> 沒有找到相同錄音的不同檔案",
             'ytdlp_warn': "[警告] {0}",
             'bot_detect': "[錯誤] YouTube 偵測為機器人或是地區限制。",
             'dl_fail': "[錯誤] {0}",
             'cookie_hint': "[提示] 使用 cookies.txt 協助",
             'searching': "正在搜尋: {0}...",
+            'search_pick': "下載最佳結果: {0}",
             'skip_premiere': "[跳過] 尚未首播。",
             'dl_module_error': "[錯誤] 下載模組異常: {0}",
             'lang_zh': "繁體中文",
@@ -134,6 +160,7 @@ class I18N:
             'player_stop': "停止",
             'player_volume': "音量: {0}%",
             'player_now_playing': "正在播放: {0}",
+            'player_unsupported': "播放器不支援此格式: {0} (可改用 mp3/flac 或 opus)",
             'player_shuffle': "隨機播放",
             'player_no_lyrics': "(無動態歌詞資料)",
         },
@@ -205,12 +232,15 @@ class I18N:
             'json_error': " -> JSON Parse Error: {0}",
             'html_fallback': " -> HTML Fallback: Found {0} songs",
             'saved_tracks': " -> Saved {0} tracks to {1}",
+            'playlist_unchanged': " -> {0} unchanged, skipped writing",
+            'payload_unchanged': " -> {0} payload unchanged, reusing the parsed track list",
             'warn_no_tracks': " -> Warning: No songs found. Structure might have changed.",
             'scrape_error': " -> Scraper Error: {0}",
             'no_pl_files': "No playlist files found in Playlists folder.",
             'scanning_lib': "Scanning local library...",
             'building_index': " -> Building index for fast search...",
             'indexed_songs': " -> Indexed {0} songs",
+            'fuzzy_match': " -> Fuzzy match: {0} -> {1} (similarity {2:.2f})",
             'analyzing_missing': "Analyzing missing songs (total {0} playlists)...",
             'task_stopped': "--- Task Stopped ---",
             'rename_msg': "  [Rename] {0} -> {1}",
@@ -218,7 +248,7 @@ class I18N:
             'stats_complete': "\nScan complete: {0} new songs to download",
             'dl_start': "--- Starting Download Flow ---",
             'dl_progress': "({0}/{1}, {2} left) [{3}] Downloading: {4}",
-            'dl_rest': "[Rest] {0} successful downloads. Resting 15s to avoid blocks...",
+            'ydl_engine_stats': " -> Downloader: {0} instances served {1} jobs, saving ~{2:.1f}s of start-up time",
             'lib_up_to_date': "Awesome! Your library is up to date.",
             'update_complete': "\nUpdate Complete!",
             'export_start': "\n=== Starting USB Export ===",
@@ -227,12 +257,35 @@ class I18N:
             'copy_error': "  Copy Error: {0}",
             'exported_count': " -> Exported {0}/{1} files",
             'export_done_open': "\nExport complete. Opening folder...",
+            'export_progress': "  📦 Copied {0:.1f}/{1:.1f} MB ({2:.1f} MB/s)",
+            'export_resume': " -> Unfinished export found, resuming",
+            'export_skipped': " -> Skipped {0} files already in place",
+            'export_removed': " -> Removed {0} files no longer exported",
+            'export_target_label': "Export to:",
+            'export_link_stats': " -> Linked export: {0} reflinks, {1} hardlinks, {2} copies",
+            'export_cancelled': "⚠️ Export cancelled; the next export resumes where it stopped",
             'open_dir_error': "[Error] Cannot open folder: {0}",
+            'job_error': "[Error] Download job failed ({0}): {1}",
+            'dedup_btn': "🔍 Find Duplicate Files",
+            'dedup_start': "=== Scanning the library for identical files ===",
+            'dedup_none': " -> No duplicate files found",
+            'dedup_group': " -> Keep {0}, duplicates: {1}",
+            'dedup_found': " -> {0} duplicate files using {1:.1f} MB",
+            'dedup_confirm_title': "Merge Duplicates",
+            'dedup_confirm_msg': "Found {0} duplicate files ({1:.1f} MB).\nDelete the duplicates and point playlists at the kept files?",
+            'dedup_merged': "✅ Removed {0} duplicate files, freed {1:.1f} MB, updated {2} playlists",
+            'dedup_error': "[Error] Duplicate scan failed: {0}",
+            'fingerprint_start': "=== Comparing audio fingerprints ===",
+            'fingerprint_progress': " -> Fingerprinted {0}/{1} files",
+            'fingerprint_unavailable': " -> [Warning] Neither fpcalc nor ffmpeg found, skipping fingerprint comparison",
+            'fingerprint_match': " -> Likely the same recording: {0} ≈ {1} ({2:.0%})",
+            'fingerprint_none': " -> No differently named copies of the same recording found",
             'ytdlp_warn': "[Warning] {0}",
             'bot_detect': "[Error] YouTube detected as bot or region restricted.",
             'dl_fail': "[Error] {0}",
             'cookie_hint': "[Notice] Helping with cookies.txt",
             'searching': "Searching: {0}...",
+            'search_pick': "Downloading best match: {0}",
             'skip_premiere': "[Skip] Premiere not started.",
             'dl_module_error': "[Error] Downloader module error: {0}",
             'lang_zh': "繁體中文",
@@ -271,6 +324,7 @@ class I18N:
             'player_stop': "Stop",
             'player_volume': "Volume: {0}%",
             'player_now_playing': "Now Playing: {0}",
+            'player_unsupported': "Format not supported by the player: {0} (use mp3/flac or opus)",
             'player_shuffle': "Shuffle",
             'player_no_lyrics': "(No synced lyrics found)",
         },